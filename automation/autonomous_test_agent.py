@@ -23,12 +23,22 @@ import json
 import time
 import subprocess
 import logging
+import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import asyncio
+from functools import partial
 from dataclasses import dataclass, asdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from change_watcher import ChangeWatcher
+from error_clusters import ErrorClusterIndex
+from error_triage import TriageClassifier, simplify_message
+from impact_analysis import ImpactAnalyzer, Selection, SuiteSpec
+from suite_scheduler import Suite, SuiteOutcome, SuiteScheduler
+from test_history import TestHistory, workspace_fingerprint
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +50,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Clases de error por palabra clave, en orden de prioridad (ver error_triage.py)
+ERROR_TYPES = TriageClassifier([
+    (r"import|module", "import_error"),
+    (r"syntax", "syntax_error"),
+    (r"type", "type_error"),
+    (r"assertion|expect", "assertion_error"),
+    (r"timeout", "timeout_error"),
+    (r"network|connection", "network_error"),
+], flags=re.IGNORECASE)
+
 # ============================================================================
 # DATA MODELS
 # ============================================================================
@@ -54,6 +74,7 @@ class TestResult:
     error_message: Optional[str] = None
     stack_trace: Optional[str] = None
     timestamp: str = None
+    cluster_id: Optional[str] = None
     
     def __post_init__(self):
         if not self.timestamp:
@@ -70,6 +91,7 @@ class ErrorPattern:
     affected_tests: List[str]
     suggested_fix: Optional[str] = None
     auto_fixable: bool = False
+    cluster_id: Optional[str] = None
 
 @dataclass
 class AgentMetrics:
@@ -97,16 +119,26 @@ class AutonomousTestAgent:
         self,
         project_root: str = "/workspaces/v0-crypto-dashboard-design",
         test_interval: int = 300,  # 5 minutos
-        max_fix_attempts: int = 3
+        max_fix_attempts: int = 3,
+        cpu_budget: Optional[int] = None,
+        fail_fast: bool = False,
+        watch: bool = True,
+        retention_days: int = 30
     ):
         self.project_root = Path(project_root)
         self.test_interval = test_interval
         self.max_fix_attempts = max_fix_attempts
+        self.cpu_budget = cpu_budget
+        self.fail_fast = fail_fast
+        # Con watch, un ciclo se dispara por cambios en vez de cada test_interval
+        self.watch = watch
+        self.watcher: Optional[ChangeWatcher] = None
+        # Mapa archivo → suites/tests: tras un cambio solo corre lo afectado
+        self.impact = ImpactAnalyzer(self.project_root, self.SUITE_SPECS)
         
         # Estado del agente
         self.metrics = AgentMetrics()
         self.error_patterns: Dict[str, ErrorPattern] = {}
-        self.test_history: List[TestResult] = []
         self.is_running = False
         self.start_time = None
         
@@ -118,6 +150,13 @@ class AutonomousTestAgent:
         # Crear directorios
         for dir_path in [self.logs_dir, self.reports_dir, self.fixes_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
+        
+        # Historial persistente de resultados (SQLite WAL, ver test_history.py)
+        self.history = TestHistory(self.reports_dir / "test_history.sqlite3")
+        # Clusters de errores casi iguales, con ids estables (ver error_clusters.py)
+        self.clusters = ErrorClusterIndex(self.reports_dir / "test_history.sqlite3")
+        self.retention_days = retention_days
+        self._last_retention = 0.0
     
     async def run(self):
         """Ejecutar agente en loop infinito."""
@@ -125,13 +164,18 @@ class AutonomousTestAgent:
         self.is_running = True
         self.start_time = time.time()
         
+        if self.watch:
+            self.watcher = ChangeWatcher(self.project_root, roots=self.impact.watch_roots()).start()
+        
         try:
+            # Primer ciclo completo; después solo los tests afectados
+            selection = None
             while self.is_running:
                 logger.info("=" * 80)
                 logger.info("🔄 Iniciando ciclo de testing...")
                 
                 # 1. Ejecutar tests
-                test_results = await self._run_all_tests()
+                test_results = await self._run_all_tests(selection)
                 
                 # 2. Analizar resultados
                 errors = self._analyze_results(test_results)
@@ -159,12 +203,18 @@ class AutonomousTestAgent:
                     logger.error(f"⚠️ Problemas críticos detectados: {health['critical_issues']}")
                     await self._handle_critical_issues(health["critical_issues"])
                 
-                logger.info(f"✅ Ciclo completado. Próximo en {self.test_interval}s")
+                if self.watcher is None:
+                    logger.info(f"✅ Ciclo completado. Próximo en {self.test_interval}s")
+                else:
+                    logger.info("✅ Ciclo completado. Esperando cambios...")
                 logger.info(f"📊 Tests: {self.metrics.tests_passed}/{self.metrics.tests_executed} passed")
                 logger.info(f"🔧 Errores corregidos: {self.metrics.errors_fixed}")
                 
                 # Esperar antes del próximo ciclo
-                await asyncio.sleep(self.test_interval)
+                if self.watcher is None:
+                    await asyncio.sleep(self.test_interval)
+                else:
+                    selection = await self._wait_for_affected_tests()
                 
         except KeyboardInterrupt:
             logger.info("🛑 Deteniendo agente...")
@@ -172,54 +222,130 @@ class AutonomousTestAgent:
         except Exception as e:
             logger.error(f"❌ Error fatal en agente: {e}", exc_info=True)
             raise
+        finally:
+            if self.watcher is not None:
+                self.watcher.stop()
+                self.watcher = None
+    
+    async def _wait_for_affected_tests(self) -> Selection:
+        """Espera (sin consumir CPU) un lote de cambios que afecte a algún test."""
+        while True:
+            changed = await self.watcher.next_batch()
+            selection = self.impact.select(changed)
+            if not selection.suites:
+                continue
+            if selection.full_run:
+                logger.info(f"🔁 {selection.reason} → todos los suites")
+            else:
+                detail = [f"{name} ({len(selection.tests[name])} tests)" if name in selection.tests else name
+                          for name in sorted(selection.suites)]
+                logger.info(f"👀 {len(changed)} archivos cambiados → {', '.join(detail)}")
+            return selection
+    
+    # Slots de CPU por suite (jest y playwright usan varios workers)
+    JEST_MAX_WORKERS = 2
+    SUITE_COSTS = {"python": 1, "typescript": JEST_MAX_WORKERS, "e2e": 2}
+    
+    # Qué lee cada suite (ver impact_analysis.py); jest recibe los fuentes
+    # cambiados y busca él mismo los tests relacionados
+    _FRONTEND_SOURCES = ("app/", "components/", "lib/", "hooks/")
+    _FRONTEND_PATHS = _FRONTEND_SOURCES + ("package.json", "tsconfig.json")
+    SUITE_SPECS = {
+        "python": SuiteSpec(paths=("evaluation/datasets/",), entries=("evaluation/test_*.py",)),
+        "typescript": SuiteSpec(paths=("package.json", "tsconfig.json", "jest.config.js", "jest.setup.ts"),
+                                related=_FRONTEND_SOURCES + ("__tests__/",)),
+        "e2e": SuiteSpec(paths=_FRONTEND_PATHS + ("e2e/", "playwright.config.ts")),
+    }
     
-    async def _run_all_tests(self) -> List[TestResult]:
-        """Ejecutar todos los tests del proyecto."""
+    async def _run_all_tests(self, selection: Optional[Selection] = None) -> List[TestResult]:
+        """Ejecutar todos los tests del proyecto (o solo lo que indica `selection`).
+        
+        Los suites corren en paralelo dentro del presupuesto de CPU;
+        los resultados se registran a medida que termina cada uno.
+        """
         logger.info("🧪 Ejecutando suite de tests...")
+        started = time.time()
+        # Huella del código probado: los flips con la misma huella son inestabilidad
+        input_hash = await asyncio.to_thread(workspace_fingerprint, self.project_root)
+        tests = selection.tests_for if selection is not None else (lambda name: None)
+        related = selection.related_for if selection is not None else (lambda name: None)
+        suites = [
+            Suite("python", partial(self._run_python_tests, tests("python")),
+                  cost=self.SUITE_COSTS["python"], failed=self._has_failures),
+            Suite("typescript", partial(self._run_typescript_tests, related("typescript")),
+                  cost=self.SUITE_COSTS["typescript"], failed=self._has_failures),
+            Suite("e2e", self._run_e2e_tests, cost=self.SUITE_COSTS["e2e"],
+                  failed=self._has_failures),
+        ]
+        if selection is not None:
+            suites = [suite for suite in suites if suite.name in selection.suites]
+        scheduler = SuiteScheduler(cpu_budget=self.cpu_budget, fail_fast=self.fail_fast)
+        
+        def report(outcome: SuiteOutcome):
+            if outcome.cancelled:
+                logger.info(f"⏹️ Tests {outcome.name} cancelados (fail-fast)")
+            elif outcome.error is not None:
+                logger.error(f"Error en tests {outcome.name}: {outcome.error}")
+            else:
+                failed = sum(1 for r in outcome.result if r.status != "passed")
+                logger.info(f"{'❌' if failed else '✅'} Tests {outcome.name}: "
+                            f"{len(outcome.result) - failed}/{len(outcome.result)} ({outcome.duration:.1f}s)")
+        
+        outcomes = await scheduler.run(suites, on_outcome=report)
+        
+        # Resultados en orden de declaración, independiente de cuál terminó antes
         results = []
-        
-        # Tests de Python (evaluación)
-        try:
-            python_results = await self._run_python_tests()
-            results.extend(python_results)
-        except Exception as e:
-            logger.error(f"Error en tests Python: {e}")
-        
-        # Tests de TypeScript (Jest)
-        try:
-            ts_results = await self._run_typescript_tests()
-            results.extend(ts_results)
-        except Exception as e:
-            logger.error(f"Error en tests TypeScript: {e}")
-        
-        # Tests E2E (Playwright)
-        try:
-            e2e_results = await self._run_e2e_tests()
-            results.extend(e2e_results)
-        except Exception as e:
-            logger.error(f"Error en tests E2E: {e}")
+        rows = []
+        for name, outcome in outcomes.items():
+            for result in outcome.result or []:
+                results.append(result)
+        
+        # Cluster de cada fallo, en un solo lote
+        failures = [r for r in results if r.status in ("failed", "error") and r.error_message]
+        for result, cluster_id in zip(failures, self.clusters.assign_many(r.error_message for r in failures)):
+            result.cluster_id = cluster_id
+        
+        for name, outcome in outcomes.items():
+            for result in outcome.result or []:
+                rows.append({"suite": name, "test_id": result.test_id, "name": result.name,
+                             "status": result.status, "duration": result.duration,
+                             "error_message": result.error_message, "cluster_id": result.cluster_id})
         
         # Actualizar historial
-        self.test_history.extend(results)
+        self.history.record_run(rows, agent="autonomous_test_agent",
+                                input_hash=input_hash, started=started)
         
         return results
     
-    async def _run_python_tests(self) -> List[TestResult]:
-        """Ejecutar tests de Python (evaluadores)."""
+    @staticmethod
+    def _has_failures(results: List[TestResult]) -> bool:
+        return any(r.status in ["failed", "error"] for r in results)
+    
+    async def _run_command(self, cmd: List[str]) -> tuple:
+        """Ejecuta un comando; si la tarea se cancela, mata el proceso."""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(self.project_root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            return await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+    
+    async def _run_python_tests(self, tests: Optional[List[str]] = None) -> List[TestResult]:
+        """Ejecutar tests de Python (evaluadores): todos o los node ids de `tests`."""
         results = []
         
         # Test de evaluadores
-        cmd = ["python", "-m", "pytest", "evaluation/", "-v", "--json-report", "--json-report-file=automation/reports/pytest.json"]
+        cmd = ["python", "-m", "pytest", *(tests or ["evaluation/"]), "-v", "--json-report",
+               "--json-report-file=automation/reports/pytest.json"]
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                cwd=str(self.project_root),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await self._run_command(cmd)
             
             # Parsear resultados
             report_file = self.reports_dir / "pytest.json"
@@ -240,21 +366,17 @@ class AutonomousTestAgent:
         
         return results
     
-    async def _run_typescript_tests(self) -> List[TestResult]:
-        """Ejecutar tests de TypeScript (Jest)."""
+    async def _run_typescript_tests(self, related: Optional[List[str]] = None) -> List[TestResult]:
+        """Ejecutar tests de TypeScript (Jest): todos o los relacionados con `related`."""
         results = []
         
-        cmd = ["pnpm", "test", "--json", "--outputFile=automation/reports/jest.json"]
+        cmd = ["pnpm", "test", "--json", "--outputFile=automation/reports/jest.json",
+               f"--maxWorkers={self.JEST_MAX_WORKERS}"]
+        if related:
+            cmd += ["--findRelatedTests", *related]
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                cwd=str(self.project_root),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await self._run_command(cmd)
             
             # Parsear resultados Jest
             report_file = self.reports_dir / "jest.json"
@@ -283,14 +405,7 @@ class AutonomousTestAgent:
         cmd = ["pnpm", "test:e2e", "--reporter=json"]
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                cwd=str(self.project_root),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            stdout, stderr = await self._run_command(cmd)
             
             # Parsear resultados Playwright
             # TODO: Implementar parsing de resultados Playwright
@@ -301,37 +416,50 @@ class AutonomousTestAgent:
         return results
     
     def _analyze_results(self, results: List[TestResult]) -> List[TestResult]:
-        """Analizar resultados y extraer errores."""
+        """Analizar resultados y extraer errores.
+        
+        Los tests inestables (pasan y fallan con el mismo código) se reportan
+        aparte: corregir el código no los arregla.
+        """
         errors = [r for r in results if r.status in ["failed", "error"]]
+        flaky = {row["test_id"] for row in self.history.flaky_tests(since=time.time() - 7 * 86400)}
         
         logger.info(f"📊 Análisis: {len(results)} tests, {len(errors)} errores")
         
         for error in errors:
-            logger.warning(f"❌ {error.name}: {error.error_message}")
+            if error.test_id in flaky:
+                logger.warning(f"🎲 {error.name} (inestable): {error.error_message}")
+            else:
+                logger.warning(f"❌ {error.name}: {error.error_message}")
         
-        return errors
+        return [error for error in errors if error.test_id not in flaky]
     
     def _detect_error_patterns(self, errors: List[TestResult]) -> List[ErrorPattern]:
         """Detectar patrones en los errores."""
         patterns = []
         
-        # Agrupar errores similares
+        # Agrupar errores casi iguales por cluster (id estable entre ejecuciones)
         error_groups: Dict[str, List[TestResult]] = {}
         
         for error in errors:
             if not error.error_message:
                 continue
-                
-            # Simplificar mensaje de error para agrupación
-            simplified = self._simplify_error_message(error.error_message)
+            if error.cluster_id is None:
+                error.cluster_id = self.clusters.assign(error.error_message)
             
-            if simplified not in error_groups:
-                error_groups[simplified] = []
-            error_groups[simplified].append(error)
+            if error.cluster_id not in error_groups:
+                error_groups[error.cluster_id] = []
+            error_groups[error.cluster_id].append(error)
         
         # Crear patrones
-        for simplified_msg, error_list in error_groups.items():
-            pattern_id = f"pattern_{hash(simplified_msg) % 10000}"
+        for cluster_id, error_list in error_groups.items():
+            pattern_id = f"pattern_{cluster_id}"
+            # Simplificar mensaje de error para clasificarlo
+            simplified_msg = self._simplify_error_message(error_list[0].error_message)
+            # Primera aparición del cluster en cualquier ejecución anterior
+            cluster = self.clusters.get(cluster_id)
+            first_seen = (datetime.fromtimestamp(cluster["first_seen"]).isoformat()
+                          if cluster else error_list[0].timestamp)
             
             # Determinar si es auto-corregible
             auto_fixable = self._is_auto_fixable(simplified_msg, error_list)
@@ -341,11 +469,12 @@ class AutonomousTestAgent:
                 pattern_id=pattern_id,
                 error_type=self._classify_error(simplified_msg),
                 frequency=len(error_list),
-                first_seen=error_list[0].timestamp,
+                first_seen=first_seen,
                 last_seen=error_list[-1].timestamp,
                 affected_tests=[e.test_id for e in error_list],
                 suggested_fix=suggested_fix,
-                auto_fixable=auto_fixable
+                auto_fixable=auto_fixable,
+                cluster_id=cluster_id
             )
             
             patterns.append(pattern)
@@ -358,31 +487,12 @@ class AutonomousTestAgent:
     
     def _simplify_error_message(self, msg: str) -> str:
         """Simplificar mensaje de error para agrupación."""
-        # Remover números de línea, paths específicos, timestamps
-        import re
-        msg = re.sub(r'\d+', 'N', msg)
-        msg = re.sub(r'/[^\s]+/', '/PATH/', msg)
-        msg = re.sub(r'at \w+\.\w+', 'at FUNC', msg)
-        return msg[:200]  # Primeros 200 caracteres
+        # Remover números de línea, paths específicos, funciones (regex precompiladas)
+        return simplify_message(msg)
     
     def _classify_error(self, msg: str) -> str:
         """Clasificar tipo de error."""
-        msg_lower = msg.lower()
-        
-        if "import" in msg_lower or "module" in msg_lower:
-            return "import_error"
-        elif "syntax" in msg_lower:
-            return "syntax_error"
-        elif "type" in msg_lower:
-            return "type_error"
-        elif "assertion" in msg_lower or "expect" in msg_lower:
-            return "assertion_error"
-        elif "timeout" in msg_lower:
-            return "timeout_error"
-        elif "network" in msg_lower or "connection" in msg_lower:
-            return "network_error"
-        else:
-            return "unknown_error"
+        return ERROR_TYPES.info(msg, "unknown_error")
     
     def _is_auto_fixable(self, simplified_msg: str, errors: List[TestResult]) -> bool:
         """Determinar si el error es auto-corregible."""
@@ -464,29 +574,59 @@ class AutonomousTestAgent:
         """Actualizar métricas del agente."""
         if self.start_time:
             self.metrics.uptime_seconds = time.time() - self.start_time
+            totals = self.history.totals(since=self.start_time)
+            self.metrics.tests_executed = totals["executed"]
+            self.metrics.tests_passed = totals["passed"]
+            self.metrics.tests_failed = totals["failed"]
         
         self.metrics.last_update = datetime.now().isoformat()
+        self._apply_retention()
         
         # Guardar métricas
         metrics_file = self.reports_dir / "agent_metrics.json"
         with open(metrics_file, 'w') as f:
             json.dump(asdict(self.metrics), f, indent=2)
     
+    def _apply_retention(self):
+        """Una vez al día: resume los resultados viejos y compacta la base."""
+        if time.time() - self._last_retention < 86400:
+            return
+        self._last_retention = time.time()
+        removed = self.history.apply_retention(self.retention_days)
+        self.clusters.apply_retention(self.retention_days)
+        self.history.compact()
+        if removed:
+            logger.info(f"🗃️ Historial: {removed} resultados de más de {self.retention_days} días resumidos")
+    
     def _generate_report(self):
-        """Generar reporte de estado."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = self.reports_dir / f"report_{timestamp}.json"
+        """Generar reporte de estado (un solo archivo, reescrito cada ciclo).
+        
+        El historial completo está en test_history.sqlite3.
+        """
+        report_file = self.reports_dir / "agent_report.json"
+        week_ago = time.time() - 7 * 86400
         
         report = {
             "timestamp": datetime.now().isoformat(),
             "metrics": asdict(self.metrics),
             "error_patterns": {k: asdict(v) for k, v in self.error_patterns.items()},
-            "recent_tests": [asdict(t) for t in self.test_history[-50:]],
+            "recent_tests": self.history.recent(50),
+            "trends": {
+                "pass_rate": self.history.pass_rate_trend("day", since=time.time() - 14 * 86400),
+                "slowest": self.history.duration_percentiles(since=week_ago, limit=10),
+                "flaky": self.history.flaky_tests(since=week_ago, limit=20),
+                "error_clusters": [
+                    {**row, "exemplar": (self.clusters.get(row["cluster_id"]) or {}).get("exemplar")}
+                    for row in self.history.top_clusters(since=week_ago, limit=10)
+                ]
+            },
             "system_health": self._check_system_health()
         }
         
-        with open(report_file, 'w') as f:
+        tmp_file = report_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
             json.dump(report, f, indent=2)
+        tmp_file.replace(report_file)
         
         logger.info(f"📄 Reporte generado: {report_file.name}")
     
@@ -527,6 +667,12 @@ class AutonomousTestAgent:
             if health["status"] == "healthy":
                 health["status"] = "warning"
         
+        flaky = self.history.flaky_tests(since=time.time() - 7 * 86400)
+        if flaky:
+            health["warnings"].append(f"{len(flaky)} flaky tests in the last 7 days")
+            if health["status"] == "healthy":
+                health["status"] = "warning"
+        
         return health
     
     async def _handle_critical_issues(self, issues: List[str]):
@@ -22,6 +22,9 @@ import os
 import sys
 import json
 import time
+import asyncio
+import threading
+import itertools
 import subprocess
 import re
 import logging
@@ -32,6 +35,18 @@ from dataclasses import dataclass, field, asdict
 from enum import Enum
 import traceback
 
+# Capa compartida de instantáneas CSV (scripts/carga_tipada.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+from carga_tipada import instantanea
+
+from change_watcher import ChangeWatcher, changed_paths, snapshot
+from error_clusters import ErrorClusterIndex
+from error_triage import TriageClassifier
+from impact_analysis import ImpactAnalyzer, Selection, SuiteSpec, git_changed_files
+from suite_scheduler import Suite, SuiteOutcome, SuiteScheduler
+from test_history import TestHistory, workspace_fingerprint
+from worker_pool import TaskResult, WarmWorkerPool, stop_forkserver
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -71,6 +86,8 @@ class TestResult:
     error_trace: Optional[str] = None
     fix_applied: Optional[str] = None
     retries: int = 0
+    # Cluster de errores casi iguales (ver error_clusters.py)
+    cluster_id: Optional[str] = None
 
 
 @dataclass
@@ -83,6 +100,8 @@ class TestSuite:
     failed: int = 0
     errors: int = 0
     duration: float = 0.0
+    # Solo se ejecutó un subconjunto de tests (ver impact_analysis)
+    partial: bool = False
     
     @property
     def success_rate(self) -> float:
@@ -121,8 +140,32 @@ class AutonomousTestingAgent:
     Agente autónomo para testing, corrección y validación continua.
     """
     
-    def __init__(self, workspace_path: str = "/workspaces/v0-crypto-dashboard-design"):
+    # Slots de CPU por suite: tsc y jest usan varios núcleos
+    JEST_MAX_WORKERS = 2
+    SUITE_COSTS = {"typescript": 2, "jest": JEST_MAX_WORKERS}
+    
+    # Qué lee cada suite: el análisis de impacto decide qué re-ejecutar
+    # tras un cambio (--watch, iteraciones, --since)
+    _FRONTEND_PATHS = ("app/", "components/", "lib/", "hooks/", "package.json", "tsconfig.json")
+    SUITE_SPECS = {
+        "typescript": SuiteSpec(paths=_FRONTEND_PATHS),
+        "evaluation": SuiteSpec(paths=("evaluation/datasets/", "automation/evaluation_tasks.py"),
+                                entries=("evaluation/test_evaluators.py",)),
+        "jest": SuiteSpec(paths=_FRONTEND_PATHS + ("__tests__/", "jest.config.js", "jest.setup.ts")),
+        "data_validation": SuiteSpec(paths=("csv/",), entries=("scripts/carga_tipada.py",),
+                                     csv_tests=True),
+        "business_logic": SuiteSpec(entries=("automation/evaluation_tasks.py::business_logic_suite",)),
+    }
+    # Módulos precargados en el pool: si cambian, el forkserver se reinicia
+    WARM_MODULES = {"automation/evaluation_tasks.py"}
+    # Patrón de error TypeScript
+    TS_ERROR_PATTERN = re.compile(r"([^:\s]+\.tsx?):(\d+):(\d+)\s*-\s*error\s*(TS\d+):\s*(.+)")
+    
+    def __init__(self, workspace_path: str = "/workspaces/v0-crypto-dashboard-design",
+                 cpu_budget: Optional[int] = None, fail_fast: bool = False):
         self.workspace = Path(workspace_path)
+        self.cpu_budget = cpu_budget
+        self.fail_fast = fail_fast
         self.session = AgentSession(
             session_id=f"agent_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
             start_time=datetime.now()
@@ -141,6 +184,24 @@ class AutonomousTestingAgent:
             
         # Patrones de errores conocidos y sus correcciones
         self.error_patterns = self._load_error_patterns()
+        # Todos los patrones en una sola regex, memoizada por mensaje (ver error_triage.py)
+        self.triage = TriageClassifier(self.error_patterns)
+        
+        # Workers Python con los evaluadores ya importados (ver worker_pool.py)
+        self._worker_pool: Optional[WarmWorkerPool] = None
+        # Los suites corren en hilos (asyncio.to_thread) y comparten el pool
+        self._worker_pool_lock = threading.Lock()
+        
+        # Mapa archivo → suites/tests (ver impact_analysis.py)
+        self.impact = ImpactAnalyzer(self.workspace, self.SUITE_SPECS)
+        
+        # Historial persistente compartido con el dashboard (ver test_history.py)
+        self.history = TestHistory(self.reports_dir / "test_history.sqlite3")
+        self.clusters = ErrorClusterIndex(self.reports_dir / "test_history.sqlite3")
+        
+        # Procesos hijos en curso por suite (para cancelarlos con fail-fast)
+        self._processes: Dict[str, set] = {}
+        self._processes_lock = threading.Lock()
         
     def _load_error_patterns(self) -> Dict[str, Dict]:
         """Carga patrones de errores conocidos y sus soluciones."""
@@ -215,6 +276,8 @@ class AutonomousTestingAgent:
         logger.info("🤖 CHRONOS Autonomous Testing Agent - Iniciando")
         logger.info("=" * 70)
         
+        roots = self.impact.watch_roots()
+        test_results = None
         try:
             while self.session.iterations < self.session.max_iterations:
                 self.session.iterations += 1
@@ -222,9 +285,21 @@ class AutonomousTestingAgent:
                 logger.info(f"📍 ITERACIÓN {self.session.iterations}/{self.session.max_iterations}")
                 logger.info(f"{'='*70}")
                 
-                # 1. Ejecutar tests
+                # 1. Ejecutar tests: todos en la primera iteración, después
+                #    solo los afectados por lo que cambió desde la anterior
                 self.session.state = AgentState.TESTING
-                test_results = self._run_all_tests()
+                current = snapshot(self.workspace, roots)
+                if test_results is None:
+                    test_results = self._run_all_tests()
+                else:
+                    changed = changed_paths(self.workspace, previous, current)
+                    selection = self.impact.select(changed)
+                    if selection.suites:
+                        self._log_selection(changed, selection)
+                        test_results = self._merge_results(test_results, self._run_all_tests(selection))
+                    else:
+                        logger.info("♻️ Sin cambios que afecten a los tests: se reutilizan los resultados")
+                previous = current
                 
                 # 2. Analizar resultados
                 self.session.state = AgentState.ANALYZING
@@ -269,45 +344,233 @@ class AutonomousTestingAgent:
             logger.error(f"Error crítico en el agente: {e}")
             logger.error(traceback.format_exc())
             return {"error": str(e), "session": self.session.to_dict()}
+        finally:
+            self._close_worker_pool()
     
-    def _run_all_tests(self) -> Dict[str, TestSuite]:
-        """Ejecuta todos los suites de tests."""
-        results = {}
+    def _get_worker_pool(self) -> WarmWorkerPool:
+        """Pool persistente entre iteraciones; se crea en el primer uso."""
+        with self._worker_pool_lock:
+            if self._worker_pool is None:
+                self._worker_pool = WarmWorkerPool(
+                    workers=2,
+                    preload=["__main__", "evaluation_tasks"],
+                    paths=[str(Path(__file__).resolve().parent)]
+                )
+            return self._worker_pool
+    
+    def _close_worker_pool(self):
+        with self._worker_pool_lock:
+            pool, self._worker_pool = self._worker_pool, None
+        if pool is not None:
+            pool.close()
+    
+    def _task_error(self, suite: TestSuite, name: str, result: TaskResult, timeout_message: str):
+        """Registra en el suite una tarea que no devolvió resultado."""
+        suite.tests.append(TestResult(
+            name=name,
+            status=TestStatus.ERROR,
+            duration=result.duration,
+            error_message=timeout_message if result.timed_out else result.error,
+            error_trace=result.error_trace
+        ))
+        suite.errors = 1
+        suite.total = 1
+    
+    def watch(self):
+        """Modo residente: un ciclo completo y luego solo los tests afectados.
         
-        # 1. Tests de TypeScript/Lint
-        logger.info("\n🔍 Ejecutando verificación de tipos TypeScript...")
-        results["typescript"] = self._run_typescript_check()
+        Espera cambios con ChangeWatcher (inotify vía watchdog), sin consumir
+        CPU mientras no cambie nada. El score se calcula con el último
+        resultado de cada test.
+        """
+        logger.info("👀 CHRONOS Autonomous Testing Agent - Modo watch")
+        latest = self._run_all_tests()
+        self._log_watch_score(latest)
         
-        # 2. Tests de Python Evaluation
-        logger.info("\n🐍 Ejecutando tests de evaluación Python...")
-        results["evaluation"] = self._run_python_evaluation()
+        watcher = ChangeWatcher(self.workspace, roots=self.impact.watch_roots()).start()
+        try:
+            while True:
+                changed = watcher.wait_for_changes()
+                selection = self.impact.select(changed)
+                if not selection.suites:
+                    continue
+                self._log_selection(changed, selection)
+                latest = self._merge_results(latest, self._run_all_tests(selection))
+                self._log_watch_score(latest)
+        except KeyboardInterrupt:
+            logger.info("🛑 Deteniendo modo watch...")
+        finally:
+            watcher.stop()
+            self._close_worker_pool()
+    
+    def verify_changes(self, base: str = "HEAD") -> Dict:
+        """Una sola pasada con los tests afectados por los cambios desde `base`."""
+        changed = git_changed_files(self.workspace, base)
+        selection = self.impact.select(changed)
+        if not selection.suites:
+            logger.info(f"✅ {len(changed)} archivos cambiados desde {base}: ningún suite afectado")
+            return {"final_score": 100.0, "target_achieved": True, "selection": selection.to_dict()}
         
-        # 3. Tests de Jest (si existen)
-        logger.info("\n🧪 Ejecutando tests de Jest...")
-        results["jest"] = self._run_jest_tests()
+        self._log_selection(changed, selection)
+        try:
+            results = self._run_all_tests(selection)
+        finally:
+            self._close_worker_pool()
+        analysis = self._analyze_results(results)
+        logger.info(f"📊 Score de los tests afectados: {analysis['overall_score']:.1f}%")
+        return {
+            "final_score": analysis["overall_score"],
+            "target_achieved": analysis["overall_score"] >= self.target_score,
+            "selection": selection.to_dict(),
+            "issues": analysis["issues"],
+        }
+    
+    def _log_selection(self, changed: set, selection: Selection):
+        if selection.full_run:
+            logger.info(f"\n🔁 {selection.reason} → todos los suites")
+        else:
+            detail = [f"{name} ({len(selection.tests[name])} tests)" if name in selection.tests else name
+                      for name in sorted(selection.suites)]
+            logger.info(f"\n👀 {len(changed)} archivos cambiados → {', '.join(detail)}")
+        # Workers precargados con código viejo
+        if self.WARM_MODULES & selection.modules and self._worker_pool is not None:
+            self._close_worker_pool()
+            stop_forkserver()
+    
+    @staticmethod
+    def _merge_results(latest: Dict[str, TestSuite], results: Dict[str, TestSuite]) -> Dict[str, TestSuite]:
+        """Combina una ejecución parcial con el último resultado de cada test."""
+        merged = dict(latest)
+        for name, suite in results.items():
+            previous = latest.get(name)
+            if not suite.partial or previous is None:
+                merged[name] = suite
+                continue
+            tests = {test.name: test for test in previous.tests}
+            tests.update((test.name, test) for test in suite.tests)
+            combined = TestSuite(name=suite.name, tests=list(tests.values()), duration=suite.duration)
+            combined.total = len(combined.tests)
+            combined.passed = sum(t.status == TestStatus.PASSED for t in combined.tests)
+            combined.failed = sum(t.status == TestStatus.FAILED for t in combined.tests)
+            combined.errors = sum(t.status == TestStatus.ERROR for t in combined.tests)
+            merged[name] = combined
+        return merged
+    
+    def _log_watch_score(self, results: Dict[str, TestSuite]):
+        analysis = self._analyze_results(results)
+        self.session.final_score = analysis["overall_score"]
+        logger.info(f"📊 Score actual: {analysis['overall_score']:.1f}% — esperando cambios...")
+    
+    def _run_all_tests(self, selection: Optional[Selection] = None) -> Dict[str, TestSuite]:
+        """Ejecuta todos los suites de tests (o solo lo que indica `selection`).
+        
+        Los suites son independientes: corren en paralelo dentro del
+        presupuesto de CPU y se registran a medida que terminan. Con
+        fail_fast, el primer suite con fallos cancela el resto.
+        """
+        tests = selection.tests_for if selection is not None else (lambda name: None)
+        suites = [
+            ("typescript", "🔍 Verificación de tipos TypeScript", self._run_typescript_check),
+            ("evaluation", "🐍 Tests de evaluación Python",
+             lambda: self._run_python_evaluation(tests("evaluation"))),
+            ("jest", "🧪 Tests de Jest", self._run_jest_tests),
+            ("data_validation", "📊 Consistencia de datos",
+             lambda: self._run_data_validation(tests("data_validation"))),
+            ("business_logic", "💼 Lógica de negocio", self._run_business_logic_validation),
+        ]
+        if selection is not None:
+            suites = [suite for suite in suites if suite[0] in selection.suites]
+        titles = {name: title for name, title, _ in suites}
+        started = time.time()
+        input_hash = workspace_fingerprint(self.workspace)
+        scheduler = SuiteScheduler(cpu_budget=self.cpu_budget, fail_fast=self.fail_fast)
+        logger.info(f"\n🚀 Ejecutando {len(suites)} suites (presupuesto CPU: {scheduler.cpu_budget})...")
+        
+        def report(outcome: SuiteOutcome):
+            suite = outcome.result
+            if outcome.cancelled:
+                logger.info(f"  ⏹️ {titles[outcome.name]}: cancelado")
+            elif outcome.error is not None:
+                logger.info(f"  ❌ {titles[outcome.name]}: {outcome.error} ({outcome.duration:.1f}s)")
+            else:
+                icon = "❌" if outcome.failed else "✅"
+                logger.info(f"  {icon} {titles[outcome.name]}: {suite.passed}/{suite.total} "
+                            f"({outcome.duration:.1f}s)")
         
-        # 4. Validación de datos
-        logger.info("\n📊 Validando consistencia de datos...")
-        results["data_validation"] = self._run_data_validation()
+        outcomes = asyncio.run(scheduler.run([
+            Suite(
+                name=name,
+                run=func,
+                cost=self.SUITE_COSTS.get(name, 1),
+                failed=lambda suite: suite.failed > 0 or suite.errors > 0,
+                on_cancel=lambda name=name: self._kill_processes(name)
+            )
+            for name, _, func in suites
+        ], on_outcome=report))
+        
+        results = {}
+        for name, outcome in outcomes.items():
+            if outcome.result is not None:
+                results[name] = outcome.result
+                continue
+            suite = TestSuite(name=titles[name], total=1)
+            if outcome.cancelled:
+                suite.tests.append(TestResult(
+                    name=f"{name}-suite",
+                    status=TestStatus.SKIPPED,
+                    error_message="Cancelado por fail-fast"
+                ))
+            else:
+                suite.tests.append(TestResult(
+                    name=f"{name}-suite",
+                    status=TestStatus.ERROR,
+                    duration=outcome.duration,
+                    error_message=str(outcome.error)
+                ))
+                suite.errors = 1
+            results[name] = suite
         
-        # 5. Validación de lógica de negocio
-        logger.info("\n💼 Validando lógica de negocio...")
-        results["business_logic"] = self._run_business_logic_validation()
+        failures = [test for suite in results.values() for test in suite.tests
+                    if test.status in (TestStatus.FAILED, TestStatus.ERROR) and test.error_message]
+        for test, cluster_id in zip(failures, self.clusters.assign_many(t.error_message for t in failures)):
+            test.cluster_id = cluster_id
         
+        self.history.record_run(
+            [{"suite": name, "test_id": f"{name}::{test.name}", "name": test.name,
+              "status": test.status.value, "duration": test.duration,
+              "error_message": test.error_message, "cluster_id": test.cluster_id}
+             for name, suite in results.items() for test in suite.tests],
+            agent="autonomous_testing_agent", input_hash=input_hash, started=started)
         return results
     
+    def _run_command(self, suite_name: str, cmd: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """subprocess.run con registro del proceso para poder cancelarlo."""
+        with subprocess.Popen(cmd, cwd=str(self.workspace), stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, text=True) as process:
+            with self._processes_lock:
+                self._processes.setdefault(suite_name, set()).add(process)
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+            finally:
+                with self._processes_lock:
+                    self._processes[suite_name].discard(process)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+    
+    def _kill_processes(self, suite_name: str):
+        with self._processes_lock:
+            for process in self._processes.get(suite_name, ()):
+                process.kill()
+    
     def _run_typescript_check(self) -> TestSuite:
         """Ejecuta verificación de tipos TypeScript."""
         suite = TestSuite(name="TypeScript Type Check")
         
         try:
-            result = subprocess.run(
-                ["pnpm", "type-check"],
-                cwd=str(self.workspace),
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            result = self._run_command("typescript", ["pnpm", "type-check"], timeout=120)
             
             if result.returncode == 0:
                 suite.tests.append(TestResult(
@@ -355,8 +618,8 @@ class AutonomousTestingAgent:
             
         return suite
     
-    def _run_python_evaluation(self) -> TestSuite:
-        """Ejecuta tests de evaluación Python."""
+    def _run_python_evaluation(self, tests: Optional[List[str]] = None) -> TestSuite:
+        """Ejecuta tests de evaluación Python (todos o los ids de `tests`)."""
         suite = TestSuite(name="Python Evaluation Tests")
         
         eval_dir = self.workspace / "evaluation"
@@ -370,67 +633,35 @@ class AutonomousTestingAgent:
             return suite
             
         try:
-            # Ejecutar test_evaluators.py
-            result = subprocess.run(
-                [sys.executable, "test_evaluators.py"],
-                cwd=str(eval_dir),
-                capture_output=True,
-                text=True,
-                timeout=180
-            )
+            # test_evaluators.TESTS en un worker caliente
+            # ("evaluation/test_evaluators.py::test_x" → "test_x")
+            only = [test.split("::")[-1] for test in tests] if tests is not None else None
+            result = self._get_worker_pool().run("evaluation_tasks:evaluation_suite",
+                                                 timeout=180, only=only)
+            suite.duration = result.duration
             
-            # Parsear resultados
-            output = result.stdout + result.stderr
+            if not result.ok:
+                self._task_error(suite, "evaluation-suite", result, "Timeout ejecutando evaluación")
+                return suite
             
-            # Buscar tests pasados/fallidos
-            passed_match = re.search(r'(\d+)/(\d+) tests passed', output)
-            if passed_match:
-                passed = int(passed_match.group(1))
-                total = int(passed_match.group(2))
-                suite.passed = passed
-                suite.failed = total - passed
-                suite.total = total
-                
-                if passed == total:
-                    suite.tests.append(TestResult(
-                        name="all-evaluators",
-                        status=TestStatus.PASSED
-                    ))
-                else:
-                    # Identificar tests fallidos
-                    failed_tests = re.findall(r'❌ (\w+).*?FAILED', output)
-                    for test_name in failed_tests:
-                        suite.tests.append(TestResult(
-                            name=test_name,
-                            status=TestStatus.FAILED,
-                            error_message=f"Test {test_name} failed"
-                        ))
-            else:
-                # Si no podemos parsear, verificar el código de retorno
-                if result.returncode == 0:
-                    suite.passed = 1
-                    suite.total = 1
-                    suite.tests.append(TestResult(
-                        name="evaluation-suite",
-                        status=TestStatus.PASSED
-                    ))
+            summary = result.value
+            suite.passed = summary["passed"]
+            suite.total = summary["total"]
+            suite.failed = suite.total - suite.passed
+            suite.partial = tests is not None
+            
+            # Un resultado por test, para combinar ejecuciones parciales
+            for test in summary["tests"]:
+                if test["passed"]:
+                    suite.tests.append(TestResult(name=test["name"], status=TestStatus.PASSED))
                 else:
-                    suite.failed = 1
-                    suite.total = 1
                     suite.tests.append(TestResult(
-                        name="evaluation-suite",
+                        name=test["name"],
                         status=TestStatus.FAILED,
-                        error_message=output[:500]
+                        error_message=test["error"] or f"Test {test['name']} failed",
+                        error_trace=test.get("trace")
                     ))
                     
-        except subprocess.TimeoutExpired:
-            suite.tests.append(TestResult(
-                name="evaluation-suite",
-                status=TestStatus.ERROR,
-                error_message="Timeout ejecutando evaluación"
-            ))
-            suite.errors = 1
-            suite.total = 1
         except Exception as e:
             suite.tests.append(TestResult(
                 name="evaluation-suite",
@@ -447,11 +678,10 @@ class AutonomousTestingAgent:
         suite = TestSuite(name="Jest Unit Tests")
         
         try:
-            result = subprocess.run(
-                ["pnpm", "test", "--passWithNoTests", "--json"],
-                cwd=str(self.workspace),
-                capture_output=True,
-                text=True,
+            result = self._run_command(
+                "jest",
+                ["pnpm", "test", "--passWithNoTests", "--json",
+                 f"--maxWorkers={self.JEST_MAX_WORKERS}"],
                 timeout=300
             )
             
@@ -511,33 +741,37 @@ class AutonomousTestingAgent:
             
         return suite
     
-    def _run_data_validation(self) -> TestSuite:
-        """Valida consistencia de datos en el sistema."""
+    def _run_data_validation(self, tests: Optional[List[str]] = None) -> TestSuite:
+        """Valida consistencia de datos en el sistema (todos o los "csv-<nombre>" de `tests`)."""
         suite = TestSuite(name="Data Validation")
         
         # Validar que existen los archivos CSV de datos
         csv_dir = self.workspace / "csv"
         if csv_dir.exists():
             csv_files = list(csv_dir.glob("*.csv"))
+            if tests is not None:
+                selected = [csv_dir / f"{test[len('csv-'):]}.csv" for test in tests]
+                # Un CSV borrado debe desaparecer del resultado: pasada completa
+                if all(f.exists() for f in selected):
+                    csv_files = selected
+                    suite.partial = True
             suite.total = len(csv_files)
             
             for csv_file in csv_files:
                 try:
-                    with open(csv_file, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        if len(lines) > 0:
-                            suite.tests.append(TestResult(
-                                name=f"csv-{csv_file.stem}",
-                                status=TestStatus.PASSED
-                            ))
-                            suite.passed += 1
-                        else:
-                            suite.tests.append(TestResult(
-                                name=f"csv-{csv_file.stem}",
-                                status=TestStatus.FAILED,
-                                error_message="Archivo vacío"
-                            ))
-                            suite.failed += 1
+                    if instantanea(csv_file).num_lineas > 0:
+                        suite.tests.append(TestResult(
+                            name=f"csv-{csv_file.stem}",
+                            status=TestStatus.PASSED
+                        ))
+                        suite.passed += 1
+                    else:
+                        suite.tests.append(TestResult(
+                            name=f"csv-{csv_file.stem}",
+                            status=TestStatus.FAILED,
+                            error_message="Archivo vacío"
+                        ))
+                        suite.failed += 1
                 except Exception as e:
                     suite.tests.append(TestResult(
                         name=f"csv-{csv_file.stem}",
@@ -564,59 +798,29 @@ class AutonomousTestingAgent:
         
         if business_logic_test.exists():
             try:
-                result = subprocess.run(
-                    [sys.executable, "-c", f"""
-import sys
-sys.path.insert(0, '{eval_dir}')
-from evaluators.business_logic import BusinessLogicEvaluator
-
-evaluator = BusinessLogicEvaluator()
-
-# Test distribución de ventas
-test_cases = [
-    {{"precioVenta": 10000, "precioCompra": 6300, "precioFlete": 500, "cantidad": 10}},
-    {{"precioVenta": 15000, "precioCompra": 9000, "precioFlete": 600, "cantidad": 5}},
-    {{"precioVenta": 8000, "precioCompra": 5000, "precioFlete": 400, "cantidad": 20}},
-]
-
-passed = 0
-for tc in test_cases:
-    result = evaluator(
-        operation_type="venta",
-        input_data=tc,
-        output_data={{
-            "distribucion": {{
-                "boveda_monte": tc["precioCompra"] * tc["cantidad"],
-                "fletes": tc["precioFlete"] * tc["cantidad"],
-                "utilidades": (tc["precioVenta"] - tc["precioCompra"] - tc["precioFlete"]) * tc["cantidad"]
-            }},
-            "total": tc["precioVenta"] * tc["cantidad"]
-        }}
-    )
-    if result.get("distribution_accuracy", 0) == 1.0:
-        passed += 1
-
-print(f"Business Logic: {{passed}}/{{len(test_cases)}} tests passed")
-if passed == len(test_cases):
-    print("ALL_PASSED")
-"""],
-                    cwd=str(self.workspace),
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
+                result = self._get_worker_pool().run("evaluation_tasks:business_logic_suite", timeout=60)
+                suite.duration = result.duration
                 
-                if "ALL_PASSED" in result.stdout:
+                if not result.ok:
+                    self._task_error(suite, "business-logic", result,
+                                     "Timeout validando lógica de negocio")
+                    return suite
+                
+                summary = result.value
+                if summary["passed"] == summary["total"]:
                     suite.tests.append(TestResult(
                         name="sales-distribution",
-                        status=TestStatus.PASSED
+                        status=TestStatus.PASSED,
+                        duration=result.duration
                     ))
                     suite.passed = 1
                 else:
+                    failed = [c for c in summary["cases"] if not c["passed"]]
                     suite.tests.append(TestResult(
                         name="sales-distribution",
                         status=TestStatus.FAILED,
-                        error_message=result.stdout + result.stderr
+                        error_message=f"Business Logic: {summary['passed']}/{summary['total']} tests passed",
+                        error_trace=json.dumps(failed, ensure_ascii=False)
                     ))
                     suite.failed = 1
                     
@@ -644,20 +848,17 @@ if passed == len(test_cases):
         """Parsea errores de TypeScript."""
         errors = []
         
-        # Patrón de error TypeScript
-        pattern = r"([^:\s]+\.tsx?):(\d+):(\d+)\s*-\s*error\s*(TS\d+):\s*(.+)"
-        matches = re.findall(pattern, output)
-        
-        for match in matches:
+        # Limitar a 20 errores sin recorrer toda la salida de un build roto
+        for match in itertools.islice(self.TS_ERROR_PATTERN.finditer(output), 20):
             errors.append({
-                "file": match[0],
-                "line": int(match[1]),
-                "column": int(match[2]),
-                "code": match[3],
-                "message": match[4]
+                "file": match[1],
+                "line": int(match[2]),
+                "column": int(match[3]),
+                "code": match[4],
+                "message": match[5]
             })
             
-        return errors[:20]  # Limitar a 20 errores
+        return errors
     
     def _analyze_results(self, results: Dict[str, TestSuite]) -> Dict:
         """Analiza los resultados de todos los tests."""
@@ -691,7 +892,8 @@ if passed == len(test_cases):
                         "test": test.name,
                         "status": test.status.value,
                         "message": test.error_message,
-                        "trace": test.error_trace
+                        "trace": test.error_trace,
+                        "cluster_id": test.cluster_id
                     })
         
         # Calcular score global
@@ -709,20 +911,19 @@ if passed == len(test_cases):
     
     def _generate_recommendation(self, issue: Dict) -> Optional[Dict]:
         """Genera una recomendación para resolver un issue."""
-        message = issue.get("message", "")
+        result = self.triage.classify(issue.get("message") or "")
+        if result is None:
+            return None
         
-        for pattern, fix_info in self.error_patterns.items():
-            match = re.search(pattern, message)
-            if match:
-                return {
-                    "issue": issue["test"],
-                    "type": fix_info["type"],
-                    "fix_type": fix_info["fix"],
-                    "severity": fix_info["severity"],
-                    "match_groups": match.groups() if match.groups() else None
-                }
-                
-        return None
+        fix_info = result.info
+        return {
+            "issue": issue["test"],
+            "type": fix_info["type"],
+            "fix_type": fix_info["fix"],
+            "severity": fix_info["severity"],
+            "match_groups": result.groups or None,
+            "cluster_id": issue.get("cluster_id")
+        }
     
     def _apply_fixes(self, issues: List[Dict]) -> List[Dict]:
         """Aplica correcciones automáticas a los issues encontrados."""
@@ -827,8 +1028,27 @@ def main():
 ╚══════════════════════════════════════════════════════════════════════╝
     """)
     
-    agent = AutonomousTestingAgent()
-    result = agent.run()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="CHRONOS Autonomous Testing Agent")
+    parser.add_argument("--cpu-budget", type=int, default=None,
+                        help="Slots de CPU para suites en paralelo (por defecto: núcleos)")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Cancela los suites restantes al primer fallo")
+    parser.add_argument("--watch", action="store_true",
+                        help="Queda residente y ejecuta solo los tests afectados por cada cambio")
+    parser.add_argument("--since", metavar="REF",
+                        help="Una pasada con los tests afectados por los cambios desde REF (git)")
+    args = parser.parse_args()
+    
+    agent = AutonomousTestingAgent(cpu_budget=args.cpu_budget, fail_fast=args.fail_fast)
+    if args.watch:
+        agent.watch()
+        sys.exit(0)
+    if args.since:
+        result = agent.verify_changes(args.since)
+    else:
+        result = agent.run()
     
     # Código de salida basado en resultado
     if result.get("target_achieved", False):
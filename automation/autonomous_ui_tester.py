@@ -2,37 +2,188 @@
 """
 🤖 AUTONOMOUS UI TESTING AGENT - CHRONOS SYSTEM
 Tests UI components, forms positioning, data display, and auto-fixes issues
+
+- Every test runs in its own browser context (fresh storage, own page), at
+  most UI_POOL_SIZE at a time, so one test's modals or navigation never
+  leak into the next.
+- No fixed sleeps: tests wait for the dashboard to become visible, for
+  dialogs to open/close and their animations to finish, and for tables to
+  stop changing (MutationObserver quiet period).
+- One browser per tester: with UI_TEST_INTERVAL set, the tester keeps it
+  across cycles and only relaunches it if it disconnected.
+- Every page also reports web vitals, long tasks, JS heap, transfer sizes
+  and (3D/canvas tests) frame rate through CDP (see web_perf); a test fails
+  when one is over its budget (UI_PERF_BUDGETS). Each cycle is recorded in
+  the shared test history, metrics included.
+- When BASE_URL is a local address nobody is serving, the app is started
+  from the existing build: `next start` on .next/, or the static export in
+  out/ (UI_SERVE=auto|next|static|off).
+
+    BASE_URL=http://localhost:3000 UI_POOL_SIZE=3 python3 autonomous_ui_tester.py
+    UI_TEST_INTERVAL=300 python3 autonomous_ui_tester.py    # continuous
 """
 
 import os
 import sys
 import json
 import asyncio
+import subprocess
+import threading
+import time
 from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
 
 try:
     from playwright.async_api import async_playwright, Page, Browser
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     import pandas as pd
 except ImportError:
     print("📦 Installing required packages...")
     os.system("pip install playwright pandas")
     os.system("playwright install chromium")
     from playwright.async_api import async_playwright, Page, Browser
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     import pandas as pd
 
+from test_history import TestHistory, workspace_fingerprint
+from web_perf import PerfProbe, check_budgets, load_budgets
+
+PROJECT_ROOT = Path(__file__).parent.parent
+UI_POOL_SIZE = int(os.getenv('UI_POOL_SIZE', '3'))
+VIEWPORT = {'width': 1920, 'height': 1080}
+SPLASH_TIMEOUT_MS = 15000
+UI_TIMEOUT_MS = 5000
+# Tests whose page is sampled for frame rate while the canvases animate
+CANVAS_TESTS = {'dashboard_3d', 'visualizations'}
+FPS_SAMPLE_SECONDS = 2
+
+# Resolves once every finite animation under the element has finished
+ANIMATIONS_DONE_JS = """
+    el => Promise.all(el.getAnimations({subtree: true})
+        .filter(a => a.effect && a.effect.getTiming().iterations !== Infinity)
+        .map(a => a.finished.catch(() => null)))
+"""
+
+# Arms window.__chronosSettled: resolves with the number of `selector` matches
+# once the DOM has been quiet for `quietMs` after the first mutation (or
+# `startMs` without any), capped at `maxMs`
+ARM_SETTLED_JS = """
+    ([selector, quietMs, startMs, maxMs]) => {
+        window.__chronosSettled = new Promise(resolve => {
+            let timer;
+            const done = () => {
+                observer.disconnect();
+                clearTimeout(cap);
+                resolve(document.querySelectorAll(selector).length);
+            };
+            const observer = new MutationObserver(() => {
+                clearTimeout(timer);
+                timer = setTimeout(done, quietMs);
+            });
+            observer.observe(document.body, {childList: true, subtree: true});
+            timer = setTimeout(done, startMs);
+            const cap = setTimeout(done, maxMs);
+        });
+    }
+"""
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LocalAppServer:
+    """Serves the built app when BASE_URL points at a local port nobody listens on"""
+    
+    def __init__(self, base_url: str, mode: str = 'auto'):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 80
+        self.mode = mode
+        self._process: Optional[subprocess.Popen] = None
+        self._httpd: Optional[ThreadingHTTPServer] = None
+    
+    async def _listening(self) -> bool:
+        try:
+            _, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            return False
+        writer.close()
+        return True
+    
+    async def start(self, timeout: float = 60.0) -> bool:
+        """True once something serves BASE_URL (already running or started here)"""
+        if await self._listening():
+            return True
+        if self.mode == 'off' or self.host not in ('localhost', '127.0.0.1'):
+            return False
+        
+        static_dir = PROJECT_ROOT / 'out'
+        if self.mode in ('auto', 'next') and (PROJECT_ROOT / '.next' / 'BUILD_ID').exists():
+            print(f"🚀 Starting `next start` on port {self.port}...")
+            self._process = subprocess.Popen(
+                ['npx', 'next', 'start', '-p', str(self.port)], cwd=str(PROJECT_ROOT),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elif self.mode in ('auto', 'static') and (static_dir / 'index.html').exists():
+            print(f"🚀 Serving static build {static_dir} on port {self.port}...")
+            handler = partial(_QuietHandler, directory=str(static_dir))
+            self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+            threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+            return True
+        else:
+            print("⚠️  No build found (.next/ or out/): run `pnpm build` first")
+            return False
+        
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            if self._process.poll() is not None:
+                print(f"❌ `next start` exited with code {self._process.returncode}")
+                return False
+            if await self._listening():
+                return True
+            await asyncio.sleep(0.25)
+        print("❌ `next start` did not open its port in time")
+        return False
+    
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
 class AutonomousUITester:
     """Autonomous agent that tests and fixes UI issues"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = UI_POOL_SIZE):
         self.base_url = os.getenv('BASE_URL', 'http://localhost:3000')
         self.reports_dir = Path(__file__).parent / 'reports' / 'ui'
         self.reports_dir.mkdir(parents=True, exist_ok=True)
         self.fixes_dir = Path(__file__).parent / 'fixes'
         self.fixes_dir.mkdir(exist_ok=True)
+        self.pool_size = max(1, pool_size)
+        self.budgets = load_budgets()
+        self.history = TestHistory(Path(__file__).parent / 'reports' / 'test_history.sqlite3')
         
-        self.test_results = {
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._app_server = LocalAppServer(self.base_url, os.getenv('UI_SERVE', 'auto'))
+        self.test_results = self._new_results()
+    
+    def _new_results(self) -> Dict[str, Any]:
+        return {
             'timestamp': datetime.now().isoformat(),
             'tests': [],
             'issues_found': [],
@@ -40,6 +191,46 @@ class AutonomousUITester:
             'summary': {}
         }
     
+    async def start(self):
+        """Launches the browser (and the local app if needed); no-op while connected"""
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+            if not await self._app_server.start():
+                print(f"⚠️  Nothing is serving {self.base_url}")
+        self._browser = await self._playwright.chromium.launch(headless=True)
+    
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._app_server.stop()
+    
+    async def __aenter__(self) -> 'AutonomousUITester':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _wait_for_dashboard(self, page: Page, timeout: float = SPLASH_TIMEOUT_MS) -> bool:
+        """Waits out the splash screen; False if the dashboard never showed up"""
+        try:
+            await page.locator('[data-testid="dashboard"]').wait_for(state='visible', timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    async def _click_and_settle(self, page: Page, target: str, selector: str) -> int:
+        """Clicks `target` and returns the count of `selector` once the DOM stops changing"""
+        await page.evaluate(ARM_SETTLED_JS, [selector, 300, 2000, 10000])
+        await page.click(target)
+        return await page.evaluate('window.__chronosSettled')
+    
     async def test_splash_screen(self, page: Page) -> Dict[str, Any]:
         """Test splash screen with CHRONOS particles"""
         result = {
@@ -67,12 +258,11 @@ class AutonomousUITester:
             if particles < 50:
                 result['issues'].append(f"Too few particles: {particles} (expected 50+)")
             
-            # Wait for splash to finish (5.5 seconds)
-            await asyncio.sleep(6)
-            
-            # Check if dashboard is now visible
-            dashboard_visible = await page.locator('[data-testid="dashboard"]').is_visible()
-            if not dashboard_visible:
+            # Wait for splash to finish (5.5 seconds nominal)
+            started = asyncio.get_running_loop().time()
+            if await self._wait_for_dashboard(page):
+                result['metrics']['splash_seconds'] = round(asyncio.get_running_loop().time() - started, 2)
+            else:
                 result['issues'].append("Dashboard not visible after splash")
             
             result['status'] = 'passed' if len(result['issues']) == 0 else 'failed'
@@ -202,10 +392,15 @@ class AutonomousUITester:
             
             # Test Nueva Venta modal
             await page.click('button:has-text("Nueva Venta")')
-            await asyncio.sleep(1)
             
             modal = page.locator('[role="dialog"]').first
-            modal_visible = await modal.is_visible()
+            try:
+                await modal.wait_for(state='visible', timeout=UI_TIMEOUT_MS)
+                # Measure the final position, not a frame of the opening transition
+                await modal.evaluate(ANIMATIONS_DONE_JS)
+                modal_visible = True
+            except PlaywrightTimeoutError:
+                modal_visible = False
             
             if modal_visible:
                 box = await modal.bounding_box()
@@ -260,7 +455,10 @@ class AutonomousUITester:
                 
                 # Close modal
                 await page.keyboard.press('Escape')
-                await asyncio.sleep(0.5)
+                try:
+                    await modal.wait_for(state='hidden', timeout=UI_TIMEOUT_MS)
+                except PlaywrightTimeoutError:
+                    result['issues'].append("Nueva Venta modal does not close on Escape")
             else:
                 result['issues'].append("Nueva Venta modal not visible")
             
@@ -285,11 +483,7 @@ class AutonomousUITester:
             print("📊 Testing Data Display...")
             
             # Check ventas data (96 records expected)
-            await page.click('text=Ventas')
-            await asyncio.sleep(2)
-            
-            # Count table rows
-            rows = await page.locator('table tbody tr').count()
+            rows = await self._click_and_settle(page, 'text=Ventas', 'table tbody tr')
             result['metrics']['ventas_rows_displayed'] = rows
             
             if rows == 0:
@@ -298,10 +492,7 @@ class AutonomousUITester:
                 result['issues'].append(f"Incomplete ventas data: {rows}/96 records")
             
             # Check clientes data
-            await page.click('text=Clientes')
-            await asyncio.sleep(2)
-            
-            cliente_rows = await page.locator('table tbody tr').count()
+            cliente_rows = await self._click_and_settle(page, 'text=Clientes', 'table tbody tr')
             result['metrics']['clientes_rows_displayed'] = cliente_rows
             
             if cliente_rows == 0:
@@ -396,52 +587,110 @@ class AutonomousUITester:
             print(f"  - {fix['component']}: {fix['issue']}")
             print(f"    Fix: {fix['fix']}")
     
+    async def _run_isolated(self, test, slots: asyncio.Semaphore) -> Dict[str, Any]:
+        """Runs one test on a fresh context/page of the shared browser"""
+        name = test.__name__[len('test_'):]
+        async with slots:
+            started = time.monotonic()
+            context = await self._browser.new_context(viewport=VIEWPORT)
+            probe = PerfProbe()
+            try:
+                page = await context.new_page()
+                await probe.attach(context, page)
+                await page.goto(self.base_url, wait_until='load')
+                if name != 'splash_screen':
+                    await self._wait_for_dashboard(page)
+                result = await test(page)
+                
+                try:
+                    result['performance'] = await probe.collect(
+                        page, FPS_SAMPLE_SECONDS if name in CANVAS_TESTS else 0)
+                except Exception as e:
+                    result['performance'] = {}
+                    result['issues'].append(f"Perf metrics unavailable: {str(e)}")
+                violations = check_budgets(result['performance'], self.budgets)
+                if violations:
+                    result['issues'].extend(violations)
+                    if result['status'] == 'passed':
+                        result['status'] = 'failed'
+            except Exception as e:
+                result = {
+                    'test': name,
+                    'status': 'error',
+                    'issues': [f"Error: {str(e)}"],
+                    'metrics': {}
+                }
+            finally:
+                await context.close()
+            result['duration'] = round(time.monotonic() - started, 2)
+            return result
+    
+    def _record_history(self, started: float):
+        """Stores the cycle (with its perf metrics) in the shared test history"""
+        rows = [{
+            'test_id': f"ui::{test['test']}",
+            'suite': 'ui',
+            'name': test['test'],
+            'status': test['status'],
+            'duration': test.get('duration'),
+            'error_message': "\n".join(test['issues']) or None,
+            'metrics': test.get('performance')
+        } for test in self.test_results['tests']]
+        self.test_results['run_id'] = self.history.record_run(
+            rows, agent='autonomous_ui_tester', input_hash=workspace_fingerprint(PROJECT_ROOT),
+            started=started)
+    
     async def run_all_tests(self):
         """Run all UI tests"""
         print("\n" + "="*80)
         print("🤖 STARTING AUTONOMOUS UI TESTING")
         print("="*80 + "\n")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = await context.new_page()
+        self.test_results = self._new_results()
+        cycle_started = time.time()
+        owns_browser = self._browser is None
+        await self.start()
+        
+        try:
+            print(f"🌐 Testing {self.base_url} ({self.pool_size} parallel contexts)...")
+            
+            tests = [
+                self.test_splash_screen,
+                self.test_dashboard_3d,
+                self.test_bento_panels,
+                self.test_forms_positioning,
+                self.test_data_display,
+                self.test_visualizations
+            ]
+            slots = asyncio.Semaphore(self.pool_size)
+            results = await asyncio.gather(*(self._run_isolated(test, slots) for test in tests))
             
-            try:
-                # Navigate to app
-                print(f"🌐 Navigating to {self.base_url}...")
-                await page.goto(self.base_url, wait_until='networkidle')
+            for result in results:
+                self.test_results['tests'].append(result)
                 
-                # Run all tests
-                tests = [
-                    self.test_splash_screen(page),
-                    self.test_dashboard_3d(page),
-                    self.test_bento_panels(page),
-                    self.test_forms_positioning(page),
-                    self.test_data_display(page),
-                    self.test_visualizations(page)
-                ]
+                status_emoji = {
+                    'passed': '✅',
+                    'failed': '❌',
+                    'error': '⚠️'
+                }.get(result['status'], '❓')
                 
-                for test_coro in tests:
-                    result = await test_coro
-                    self.test_results['tests'].append(result)
-                    
-                    status_emoji = {
-                        'passed': '✅',
-                        'failed': '❌',
-                        'error': '⚠️'
-                    }.get(result['status'], '❓')
-                    
-                    print(f"{status_emoji} {result['test']}: {result['status']}")
-                    
-                    if result['issues']:
-                        for issue in result['issues']:
-                            print(f"   - {issue}")
+                print(f"{status_emoji} {result['test']}: {result['status']}")
                 
-            finally:
-                await browser.close()
+                if result['issues']:
+                    for issue in result['issues']:
+                        print(f"   - {issue}")
+                
+                perf = result.get('performance') or {}
+                shown = [f"{key}={perf[key]:g}" for key in ('lcp_ms', 'cls', 'inp_ms', 'total_blocking_ms',
+                                                           'js_heap_mb', 'transfer_kb', 'fps_avg')
+                         if key in perf]
+                if shown:
+                    print(f"   ⏱️  {' '.join(shown)}")
+        finally:
+            if owns_browser:
+                await self.close()
+        
+        self._record_history(cycle_started)
         
         # Generate summary
         total_tests = len(self.test_results['tests'])
@@ -476,9 +725,19 @@ class AutonomousUITester:
         print("="*80 + "\n")
         
         return self.test_results
+    
+    async def run_continuous(self, interval: float):
+        """Runs a cycle every `interval` seconds on one long-lived browser"""
+        async with self:
+            while True:
+                await self.run_all_tests()
+                await asyncio.sleep(interval)
 
 if __name__ == "__main__":
     tester = AutonomousUITester()
+    interval = float(os.getenv('UI_TEST_INTERVAL', '0'))
+    if interval > 0:
+        asyncio.run(tester.run_continuous(interval))
     results = asyncio.run(tester.run_all_tests())
     
     # Exit with error if tests failed
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+🏦 BANK LEDGER - CHRONOS SYSTEM
+Single-pass reconstruction of each bank's balance from the CSV sources.
+
+Sources (explicit mapping, see BANKS and JOURNAL):
+- Each bank's ledger CSV lists its deposits. A counterpart named
+  "Gasto <bank>" is a transfer in from that bank; anything else is income.
+- gastos_abonos.csv is the general journal. An origin "Gasto <bank>" is
+  money leaving that bank: a transfer out when the destination is another
+  bank, an expense otherwise. For banks without a ledger CSV, journal rows
+  whose destination is the bank are its deposits.
+
+capitalActual = ingresos + transfers_in - gastos - transfers_out
+
+Files are streamed row by row, so memory is bounded by the number of banks
+plus the pending inter-bank transfers. The transfer check is a hash join:
+the journal builds a multiset of (date, from, to, amount) and each ledger
+transfer row probes it.
+"""
+
+import csv
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+EXPENSE_PREFIX = 'gasto '
+
+TransferKey = Tuple[str, str, str, int]  # (date, from bank, to bank, amount in cents)
+
+
+@dataclass(frozen=True)
+class BankSource:
+    """How one bank appears in the CSV files"""
+    bank: str                     # canonical id
+    name: str                     # name used in counterpart/journal columns
+    ledger: Optional[str] = None  # deposits CSV, if the bank has one
+    amount: str = 'ingreso'
+    counterpart: str = 'cliente'
+    date: str = 'fecha'
+    date_format: str = '%d/%m/%Y'
+
+
+@dataclass(frozen=True)
+class JournalSource:
+    file: str = 'gastos_abonos.csv'
+    amount: str = 'valor'
+    origin: str = 'origen'
+    destination: str = 'destino'
+    date: str = 'fecha'
+    date_format: str = '%Y-%m-%d'
+
+
+BANKS = (
+    BankSource('boveda_monte', 'Bóveda Monte', 'boveda_monte.csv'),
+    BankSource('boveda_usa', 'Bóveda USA', 'boveda_usa.csv'),
+    BankSource('profit', 'Profit', 'bancos_profit.csv'),
+    BankSource('leftie', 'Leftie', 'bancos_leftie.csv'),
+    BankSource('azteca', 'Azteca', 'bancos_azteca.csv'),
+    BankSource('utilidades', 'Utilidades', 'utilidades.csv'),
+    # No deposits CSV: deposits come from the journal
+    BankSource('flete_sur', 'Flete Sur'),
+)
+
+JOURNAL = JournalSource()
+
+
+def _normalize(name: Optional[str]) -> str:
+    """'Bóveda Usa ' -> 'boveda usa'"""
+    text = unicodedata.normalize('NFKD', (name or '').strip().lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def _amount(raw: Optional[str]) -> Optional[float]:
+    try:
+        return float((raw or '').replace(',', '').strip() or 0)
+    except ValueError:
+        return None
+
+
+def _date(raw: Optional[str], date_format: str) -> str:
+    try:
+        return datetime.strptime((raw or '').strip(), date_format).date().isoformat()
+    except ValueError:
+        return (raw or '').strip()
+
+
+def _rows(path: Path) -> Iterator[Dict[str, str]]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+@dataclass
+class BankTotals:
+    ingresos: float = 0.0
+    gastos: float = 0.0
+    transfers_in: float = 0.0
+    transfers_out: float = 0.0
+    rows: int = 0
+    invalid_rows: int = 0
+
+    @property
+    def capital_actual(self) -> float:
+        return self.ingresos + self.transfers_in - self.gastos - self.transfers_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ingresos': round(self.ingresos, 2),
+            'gastos': round(self.gastos, 2),
+            'transfersIn': round(self.transfers_in, 2),
+            'transfersOut': round(self.transfers_out, 2),
+            'capitalActual': round(self.capital_actual, 2),
+            'rows': self.rows,
+            'invalidRows': self.invalid_rows,
+        }
+
+
+@dataclass
+class Reconciliation:
+    totals: Dict[str, BankTotals] = field(default_factory=dict)
+    # (from, to) -> [matched count, matched amount]
+    transfer_pairs: Dict[Tuple[str, str], List[float]] = field(default_factory=dict)
+    # Journal transfers without a ledger deposit, and the reverse
+    unmatched_out: List[TransferKey] = field(default_factory=list)
+    unmatched_in: List[TransferKey] = field(default_factory=list)
+    unknown_banks: Counter = field(default_factory=Counter)
+    missing_files: List[str] = field(default_factory=list)
+
+    @property
+    def capital_total(self) -> float:
+        return sum(t.capital_actual for t in self.totals.values())
+
+    @property
+    def transfers_balanced(self) -> bool:
+        return not (self.unmatched_out or self.unmatched_in)
+
+
+def reconcile(csv_dir: Path, banks=BANKS, journal: JournalSource = JOURNAL) -> Reconciliation:
+    """Streams the journal, then each ledger, once"""
+    csv_dir = Path(csv_dir)
+    by_name = {_normalize(b.name): b for b in banks}
+    result = Reconciliation(totals={b.bank: BankTotals() for b in banks})
+    totals = result.totals
+
+    def resolve(name: str) -> Optional[BankSource]:
+        return by_name.get(_normalize(name))
+
+    def paired(key: TransferKey):
+        pair = result.transfer_pairs.setdefault((key[1], key[2]), [0, 0.0])
+        pair[0] += 1
+        pair[1] += key[3] / 100
+
+    # Build side: transfers out recorded in the journal
+    pending: Counter = Counter()
+    journal_path = csv_dir / journal.file
+    if journal_path.exists():
+        for row in _rows(journal_path):
+            origin = _normalize(row.get(journal.origin))
+            destination = resolve(row.get(journal.destination))
+            amount = _amount(row.get(journal.amount))
+
+            if not origin.startswith(EXPENSE_PREFIX):
+                # Deposit: only counted here for banks without their own ledger
+                if destination is not None and destination.ledger is None:
+                    if amount is None:
+                        totals[destination.bank].invalid_rows += 1
+                        continue
+                    totals[destination.bank].ingresos += amount
+                    totals[destination.bank].rows += 1
+                continue
+
+            source = resolve(origin[len(EXPENSE_PREFIX):])
+            if source is None:
+                result.unknown_banks[row.get(journal.origin, '').strip()] += 1
+                continue
+            bank = totals[source.bank]
+            if amount is None:
+                bank.invalid_rows += 1
+                continue
+            bank.rows += 1
+            if destination is None or destination.bank == source.bank:
+                bank.gastos += amount
+                continue
+
+            bank.transfers_out += amount
+            key = (_date(row.get(journal.date), journal.date_format),
+                   source.bank, destination.bank, round(amount * 100))
+            if destination.ledger is None:
+                # The journal is the only record of the deposit
+                totals[destination.bank].transfers_in += amount
+                paired(key)
+            else:
+                pending[key] += 1
+    else:
+        result.missing_files.append(journal.file)
+
+    # Probe side: deposits in each ledger
+    for source in banks:
+        if source.ledger is None:
+            continue
+        path = csv_dir / source.ledger
+        if not path.exists():
+            result.missing_files.append(source.ledger)
+            continue
+        bank = totals[source.bank]
+        for row in _rows(path):
+            amount = _amount(row.get(source.amount))
+            if amount is None:
+                bank.invalid_rows += 1
+                continue
+            bank.rows += 1
+            counterpart = _normalize(row.get(source.counterpart))
+            origin = (resolve(counterpart[len(EXPENSE_PREFIX):])
+                      if counterpart.startswith(EXPENSE_PREFIX) else None)
+            if origin is None:
+                bank.ingresos += amount
+                continue
+
+            bank.transfers_in += amount
+            key = (_date(row.get(source.date), source.date_format),
+                   origin.bank, source.bank, round(amount * 100))
+            if pending[key] > 0:
+                pending[key] -= 1
+                paired(key)
+            else:
+                result.unmatched_in.append(key)
+
+    result.unmatched_out = sorted(k for k, n in pending.items() for _ in range(n))
+    return result
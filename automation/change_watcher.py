@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+👀 CHANGE WATCHER - CHRONOS SYSTEM
+Event-driven file watching for the autonomous agents.
+
+- watchdog's native observer (inotify on Linux) reports changes under the
+  watched roots; the consumer blocks on an Event, so an idle agent uses no
+  CPU. Without watchdog, a slow mtime poll is used instead.
+- Events are coalesced into a set of workspace-relative paths and released
+  once no new event has arrived for `debounce` seconds (or after
+  `max_delay`, so a constant stream of writes cannot starve the agent).
+- affected_suites() maps a batch of paths to the suites that read them,
+  given {suite: path prefixes} (see impact_analysis for the finer map).
+- snapshot()/changed_paths() give the same batches between two points in
+  time, without a watcher.
+
+    watcher = ChangeWatcher(workspace, roots=['evaluation', 'csv'])
+    watcher.start()
+    changed = watcher.wait_for_changes()       # blocking
+    changed = await watcher.next_batch()       # asyncio
+"""
+
+import asyncio
+import fnmatch
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Set
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+IGNORED_DIRS = {'.git', 'node_modules', '.next', '__pycache__', '.pytest_cache', 'coverage'}
+# Agent output: writing reports must not trigger another run
+IGNORED_PREFIXES = ('automation/logs/', 'automation/reports/', 'automation/fixes/',
+                    'analysis_output/')
+IGNORED_PATTERNS = ('*.pyc', '*.log', '*.swp', '*.tmp', '*~', '.#*', '*.json.gz')
+
+
+def relative_path(workspace: Path, path: str) -> Optional[str]:
+    """Workspace-relative posix path, or None for ignored/outside paths"""
+    try:
+        rel = Path(path).resolve().relative_to(workspace)
+    except ValueError:
+        return None
+    if any(part in IGNORED_DIRS for part in rel.parts[:-1]):
+        return None
+    if rel.as_posix().startswith(IGNORED_PREFIXES):
+        return None
+    if any(fnmatch.fnmatch(rel.name, p) for p in IGNORED_PATTERNS):
+        return None
+    return rel.as_posix()
+
+
+def snapshot(workspace: Path, roots: Sequence[str]) -> Dict[str, int]:
+    """{absolute path: mtime_ns} of the files under `roots` ('.' is not recursive)"""
+    files = {}
+    for root in roots:
+        base = Path(workspace) / root
+        recursive = root not in ('.', '')
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS] if recursive else []
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    files[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+    return files
+
+
+def changed_paths(workspace: Path, before: Dict[str, int], after: Dict[str, int]) -> Set[str]:
+    """Relative paths created, deleted or modified between two snapshots"""
+    workspace = Path(workspace).resolve()
+    paths = set(before) ^ set(after)
+    paths.update(path for path, mtime in after.items() if before.get(path, mtime) != mtime)
+    return {rel for rel in (relative_path(workspace, p) for p in paths) if rel is not None}
+
+
+def affected_suites(paths: Iterable[str], suite_paths: Dict[str, Sequence[str]]) -> Set[str]:
+    """Suites with a path prefix matching any changed path"""
+    affected = set()
+    for path in paths:
+        for suite, prefixes in suite_paths.items():
+            if any(path == p or path.startswith(p) for p in prefixes):
+                affected.add(suite)
+    return affected
+
+
+def roots_for(suite_paths: Dict[str, Sequence[str]]) -> list:
+    """Directories to watch for a {suite: prefixes} map ('.' for root files)"""
+    roots = []
+    for prefixes in suite_paths.values():
+        for prefix in prefixes:
+            root = prefix.split('/', 1)[0] if '/' in prefix else '.'
+            if root not in roots:
+                roots.append(root)
+    return roots
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher: 'ChangeWatcher'):
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self._watcher._record(event.src_path)
+        dest = getattr(event, 'dest_path', None)
+        if dest:
+            self._watcher._record(dest)
+
+
+class ChangeWatcher:
+    """Debounced, coalescing watcher over a few roots of the workspace"""
+
+    def __init__(self, workspace: Path, roots: Sequence[str] = ('.',),
+                 debounce: float = 1.0, max_delay: float = 10.0, poll_interval: float = 5.0):
+        self.workspace = Path(workspace).resolve()
+        self.roots = [r for r in roots if (self.workspace / r).exists()]
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        self._pending: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._observer = None
+        self._poller: Optional[threading.Thread] = None
+
+    def _record(self, path: str):
+        rel = relative_path(self.workspace, path)
+        if rel is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending:
+                self._first_event = now
+            self._pending.add(rel)
+            self._last_event = now
+        self._changed.set()
+
+    def start(self) -> 'ChangeWatcher':
+        if WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            handler = _Handler(self)
+            for root in self.roots:
+                path = self.workspace / root
+                # Files at the workspace root (package.json, tsconfig) without
+                # recursing into node_modules and friends
+                self._observer.schedule(handler, str(path), recursive=root not in ('.', ''))
+            self._observer.start()
+        else:
+            print("⚠️  watchdog no instalado: usando polling cada "
+                  f"{self.poll_interval:g}s (pip install watchdog)")
+            self._poller = threading.Thread(target=self._poll, daemon=True)
+            self._poller.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._poller is not None:
+            self._poller.join()
+            self._poller = None
+
+    def _poll(self):
+        previous = snapshot(self.workspace, self.roots)
+        while not self._stop.wait(self.poll_interval):
+            current = snapshot(self.workspace, self.roots)
+            for path in set(previous) ^ set(current):
+                self._record(path)
+            for path, mtime in current.items():
+                if previous.get(path, mtime) != mtime:
+                    self._record(path)
+            previous = current
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Blocks until a debounced batch is ready; empty set on timeout/stop"""
+        if not self._changed.wait(timeout):
+            return set()
+        while not self._stop.is_set():
+            with self._lock:
+                now = time.monotonic()
+                quiet_until = self._last_event + self.debounce
+                deadline = self._first_event + self.max_delay
+                if now >= quiet_until or now >= deadline:
+                    batch, self._pending = self._pending, set()
+                    self._changed.clear()
+                    return batch
+                remaining = min(quiet_until, deadline) - now
+            time.sleep(remaining)
+        return set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> Set[str]:
+        return await asyncio.to_thread(self.wait_for_changes, timeout)
+
+    def __enter__(self) -> 'ChangeWatcher':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -12,51 +12,134 @@ import csv
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
-from collections import defaultdict
 
 # Try to import required libraries
 try:
-    import pandas as pd
-    import firebase_admin
-    from firebase_admin import credentials, firestore
     from dotenv import load_dotenv
 except ImportError as e:
     print(f"⚠️  Missing dependencies: {e}")
     print("Installing required packages...")
     os.system("pip install pandas firebase-admin python-dotenv")
-    import pandas as pd
-    import firebase_admin
-    from firebase_admin import credentials, firestore
     from dotenv import load_dotenv
 
+# Capa compartida de instantáneas CSV (scripts/carga_tipada.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+from carga_tipada import instantanea
+
+from validation_rules import Allowed, Formula, Numeric, Required, RuleSet
+from firestore_access import (DEFAULT_MAX_WORKERS, count_documents,
+                              create_firestore_client, read_collections,
+                              stream_documents)
+from record_diff import HashIndex, diff_indexes
+
+# Firestore's name for the document id, usable as a `firestore_fields` target
+DOC_ID = '__name__'
+
 # Load environment variables
 load_dotenv()
 
-# Initialize Firebase Admin
-if not firebase_admin._apps:
-    try:
-        # Try to load from service account file
-        service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH', 
-                                        './chronos-176d8-firebase-adminsdk.json')
-        if os.path.exists(service_account_path):
-            cred = credentials.Certificate(service_account_path)
-        else:
-            # Use default credentials
-            cred = credentials.ApplicationDefault()
-        
-        firebase_admin.initialize_app(cred)
-        print("✅ Firebase Admin initialized")
-    except Exception as e:
-        print(f"⚠️  Firebase initialization warning: {e}")
-        print("Using Firestore emulator or default config")
+# Row rules per file (see validation_rules.py). Numeric lets blanks through,
+# so integer counts also get a Required rule (int() rejected them before).
+VALID_ESTADOS = ('Pendiente', 'Pagado', 'Parcial', 'completo', 'pendiente', 'parcial')
+
+VENTA_RULES = [
+    Numeric('precioVenta', gt=0,
+            invalid="Precio venta inválido: {value}",
+            not_numeric="Precio venta no numérico: {raw}"),
+    Required('cantidad'),
+    Numeric('cantidad', gt=0, integer=True,
+            invalid="Cantidad inválida: {value}",
+            not_numeric="Cantidad no numérica: {raw}"),
+    Allowed('estatus', VALID_ESTADOS, message="Estado pago inválido: {value}"),
+    # utilidad = precioVenta * cantidad, 5% tolerance for rounding
+    Formula('utilidad', 'precioVenta * cantidad', abs_tol=0, rel_tol=0.05,
+            message="Utilidad no coincide: calc={calc}, reg={reg}"),
+]
+
+CLIENTE_RULES = [
+    Numeric('deuda', ge=0,
+            invalid="Deuda negativa: {value}",
+            not_numeric="Deuda no numérica: {raw}"),
+    # deuda = pendiente + actual - abonos
+    Formula('deuda', 'pendiente + actual - abonos',
+            message="Deuda no coincide: calc={calc}, reg={reg}"),
+]
+
+DISTRIBUIDOR_RULES = [
+    Required('Cantidad'),
+    Numeric('Cantidad', gt=0, integer=True,
+            invalid="Cantidad inválida: {value}",
+            not_numeric="Cantidad no numérica: {raw}"),
+]
 
-# Initialize Firestore
-db = firestore.client()
+ORDEN_COMPRA_RULES = [
+    Formula('Costo Por Unidad', '`Costo Distribuidor` + `Costo Transporte`',
+            message="Costo por unidad no coincide: calc={calc}, reg={reg}"),
+    Formula('Costo Total', '`Costo Por Unidad` * Cantidad',
+            message="Costo total no coincide: calc={calc}, reg={reg}"),
+    Formula('Deuda', '`Costo Total` - `Pago a Distribuidor`',
+            message="Deuda no coincide: calc={calc}, reg={reg}"),
+]
+
+ALMACEN_RULES = [
+    Required('stockActual'),
+    Numeric('stockActual', ge=0, integer=True,
+            invalid="Stock negativo: {value}",
+            not_numeric="Stock no numérico: {raw}"),
+]
+
+BANCO_RULES = [
+    Numeric('Monto', not_numeric="Monto no numérico: {raw}"),
+]
+
+# Value rewrites of migrate-csv-to-firestore.ts, per CSV column (`firestore_values`)
+VENTA_VALUES = {
+    'flete': lambda value: 'Aplica' if value == 'Aplica' else 'NoAplica',
+    'estatus': lambda value: value or 'Pendiente',
+}
+
+def as_stored_values(row: Dict[str, Any], value_map: Dict[str, Any]) -> Dict[str, Any]:
+    """CSV row with the migrator's value rewrites applied (see `firestore_values`)"""
+    if not value_map:
+        return row
+    return {**row, **{column: rewrite(row.get(column)) for column, rewrite in value_map.items()
+                      if column in row}}
+
+def as_csv_record(doc, field_map: Dict[str, str]) -> Dict[str, Any]:
+    """Document data keyed by CSV column (see `firestore_fields`)"""
+    data = doc.to_dict()
+    data[DOC_ID] = doc.id
+    for column, stored_as in field_map.items():
+        data[column] = data.get(stored_as)
+    return data
 
 class ComprehensiveDataValidator:
-    """Validates all data integrity in CHRONOS system"""
+    """Validates all data integrity in CHRONOS system
+    
+    Mapping entries may declare `key_fields` (natural key used to match CSV
+    rows with documents for field-level diffs); without it records are
+    matched by content. `firestore_fields` maps CSV columns to the fields
+    scripts/migrate-csv-to-firestore.ts stores them under (DOC_ID for the
+    document id); unmapped columns keep their name. `firestore_values`
+    holds the migrator's value rewrites per column (e.g. 'No Aplica' ->
+    'NoAplica'), applied to the CSV side before hashing.
+    
+    `db` is any Firestore-compatible client (real, emulator or
+    firestore_fake.FakeFirestoreClient); by default one is created from the
+    environment (see firestore_access.create_firestore_client).
+    """
     
-    def __init__(self):
+    def __init__(self, db=None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 compare_records: bool = True):
+        self.db = db if db is not None else create_firestore_client()
+        self.max_workers = max_workers
+        self.compare_records = compare_records
+        # collection -> (count, error), filled by prefetch_counts()
+        self._counts: Dict[str, Tuple[Any, Any]] = {}
+        # collection -> (HashIndex, error), filled by prefetch_record_indexes()
+        self._firestore_indexes: Dict[str, Tuple[Any, Any]] = {}
+        # csv_file -> (snapshot key, HashIndex); rebuilt only when the file changes
+        self._csv_indexes: Dict[str, Tuple[Any, HashIndex]] = {}
         self.csv_dir = Path(__file__).parent.parent / 'csv'
         self.reports_dir = Path(__file__).parent / 'reports'
         self.reports_dir.mkdir(exist_ok=True)
@@ -69,244 +152,87 @@ class ComprehensiveDataValidator:
             'summary': {}
         }
         
-        # Expected CSV files and their Firestore collections
+        # Expected CSV files, their Firestore collections and row rules
         self.data_mapping = {
             'ventas.csv': {
                 'collection': 'ventas',
                 'expected_records': 96,
                 'required_fields': ['fecha', 'cantidad', 'cliente', 'precioVenta'],
-                'validation_rules': self.validate_venta
+                'firestore_values': VENTA_VALUES,
+                'validation_rules': VENTA_RULES
             },
             'clientes.csv': {
                 'collection': 'clientes',
                 'expected_records': 31,
+                'key_fields': ['cliente'],
+                'firestore_fields': {'cliente': 'nombre'},
                 'required_fields': ['cliente', 'deuda', 'abonos'],
-                'validation_rules': self.validate_cliente
+                'validation_rules': CLIENTE_RULES
             },
             'distribuidores_clean.csv': {
                 'collection': 'distribuidores',
                 'expected_records': 16,
                 'required_fields': ['OC', 'Origen', 'Cantidad'],
-                'validation_rules': self.validate_distribuidor
+                'validation_rules': DISTRIBUIDOR_RULES
             },
             'ordenes_compra_clean.csv': {
                 'collection': 'ordenes_compra',
                 'expected_records': 9,
+                'key_fields': ['id'],
+                'firestore_fields': {'id': DOC_ID},
                 'required_fields': ['OC', 'Fecha', 'Origen', 'Cantidad'],
-                'validation_rules': self.validate_orden_compra
+                'validation_rules': ORDEN_COMPRA_RULES
             },
             'almacen.csv': {
                 'collection': 'almacen',
                 'expected_records': 9,
                 'required_fields': ['producto', 'stockActual'],
-                'validation_rules': self.validate_almacen
+                'validation_rules': ALMACEN_RULES
             },
             'boveda_monte.csv': {
                 'collection': 'boveda_monte',
                 'expected_records': 69,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'boveda_usa.csv': {
                 'collection': 'boveda_usa',
                 'expected_records': 17,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'bancos_profit.csv': {
                 'collection': 'profit',
                 'expected_records': 55,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'bancos_leftie.csv': {
                 'collection': 'leftie',
                 'expected_records': 11,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'bancos_azteca.csv': {
                 'collection': 'azteca',
                 'expected_records': 6,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'flete_sur.csv': {
                 'collection': 'flete_sur',
                 'expected_records': 101,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             },
             'utilidades.csv': {
                 'collection': 'utilidades',
                 'expected_records': 51,
                 'required_fields': ['Fecha', 'Concepto', 'Monto'],
-                'validation_rules': self.validate_banco
+                'validation_rules': BANCO_RULES
             }
         }
     
-    def validate_venta(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate venta record according to business logic"""
-        errors = []
-        
-        # Check precio venta > 0
-        if 'precioVenta' in record:
-            try:
-                precio = float(record['precioVenta'])
-                if precio <= 0:
-                    errors.append(f"Precio venta inválido: {precio}")
-            except ValueError:
-                errors.append(f"Precio venta no numérico: {record['precioVenta']}")
-        
-        # Check cantidad > 0
-        if 'cantidad' in record:
-            try:
-                cantidad = int(record['cantidad'])
-                if cantidad <= 0:
-                    errors.append(f"Cantidad inválida: {cantidad}")
-            except ValueError:
-                errors.append(f"Cantidad no numérica: {record['cantidad']}")
-        
-        # Check estado pago
-        if 'estatus' in record:
-            valid_estados = ['Pendiente', 'Pagado', 'Parcial', 'completo', 'pendiente', 'parcial']
-            if record['estatus'] not in valid_estados:
-                errors.append(f"Estado pago inválido: {record['estatus']}")
-        
-        # Check fórmula: utilidad = (precioVenta - precioCompra - flete) * cantidad
-        if all(k in record for k in ['precioVenta', 'cantidad', 'utilidad']):
-            try:
-                precio_venta = float(record['precioVenta'])
-                cantidad = int(record['cantidad'])
-                utilidad_calculada = precio_venta * cantidad
-                utilidad_registro = float(record.get('utilidad', 0))
-                
-                # Allow 5% tolerance for rounding
-                if abs(utilidad_calculada - utilidad_registro) > utilidad_calculada * 0.05:
-                    errors.append(f"Utilidad no coincide: calc={utilidad_calculada}, reg={utilidad_registro}")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Error calculando utilidad: {e}")
-        
-        return len(errors) == 0, errors
-    
-    def validate_cliente(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate cliente record"""
-        errors = []
-        
-        # Check deuda >= 0
-        if 'deuda' in record:
-            try:
-                deuda = float(record['deuda'])
-                if deuda < 0:
-                    errors.append(f"Deuda negativa: {deuda}")
-            except ValueError:
-                errors.append(f"Deuda no numérica: {record['deuda']}")
-        
-        # Check fórmula: deuda = pendiente + actual - abonos
-        if all(k in record for k in ['deuda', 'abonos', 'pendiente', 'actual']):
-            try:
-                deuda = float(record['deuda'])
-                abonos = float(record['abonos'])
-                pendiente = float(record['pendiente'])
-                actual = float(record['actual'])
-                
-                # Verify math
-                deuda_calculada = pendiente + actual - abonos
-                if abs(deuda - deuda_calculada) > 0.01:
-                    errors.append(f"Deuda no coincide: calc={deuda_calculada}, reg={deuda}")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Error calculando deuda: {e}")
-        
-        return len(errors) == 0, errors
-    
-    def validate_distribuidor(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate distribuidor record"""
-        errors = []
-        
-        # Check cantidad > 0
-        if 'Cantidad' in record:
-            try:
-                cantidad = int(record['Cantidad'])
-                if cantidad <= 0:
-                    errors.append(f"Cantidad inválida: {cantidad}")
-            except ValueError:
-                errors.append(f"Cantidad no numérica: {record['Cantidad']}")
-        
-        return len(errors) == 0, errors
-    
-    def validate_orden_compra(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate orden de compra according to formulas"""
-        errors = []
-        
-        # Check formula: costoPorUnidad = costoDistribuidor + costoTransporte
-        if all(k in record for k in ['Costo Distribuidor', 'Costo Transporte', 'Costo Por Unidad']):
-            try:
-                costo_dist = float(record['Costo Distribuidor'])
-                costo_trans = float(record['Costo Transporte'])
-                costo_unidad_reg = float(record['Costo Por Unidad'])
-                costo_unidad_calc = costo_dist + costo_trans
-                
-                if abs(costo_unidad_calc - costo_unidad_reg) > 0.01:
-                    errors.append(f"Costo por unidad no coincide: calc={costo_unidad_calc}, reg={costo_unidad_reg}")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Error validando costos: {e}")
-        
-        # Check formula: costoTotal = costoPorUnidad * cantidad
-        if all(k in record for k in ['Costo Por Unidad', 'Cantidad', 'Costo Total']):
-            try:
-                costo_unidad = float(record['Costo Por Unidad'])
-                cantidad = int(record['Cantidad'])
-                costo_total_reg = float(record['Costo Total'])
-                costo_total_calc = costo_unidad * cantidad
-                
-                if abs(costo_total_calc - costo_total_reg) > 0.01:
-                    errors.append(f"Costo total no coincide: calc={costo_total_calc}, reg={costo_total_reg}")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Error validando costo total: {e}")
-        
-        # Check formula: deuda = costoTotal - pagoDistribuidor
-        if all(k in record for k in ['Costo Total', 'Pago a Distribuidor', 'Deuda']):
-            try:
-                costo_total = float(record['Costo Total'])
-                pago = float(record['Pago a Distribuidor'])
-                deuda_reg = float(record['Deuda'])
-                deuda_calc = costo_total - pago
-                
-                if abs(deuda_calc - deuda_reg) > 0.01:
-                    errors.append(f"Deuda no coincide: calc={deuda_calc}, reg={deuda_reg}")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Error validando deuda: {e}")
-        
-        return len(errors) == 0, errors
-    
-    def validate_almacen(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate almacen record"""
-        errors = []
-        
-        # Check stock >= 0
-        if 'stockActual' in record:
-            try:
-                stock = int(record['stockActual'])
-                if stock < 0:
-                    errors.append(f"Stock negativo: {stock}")
-            except ValueError:
-                errors.append(f"Stock no numérico: {record['stockActual']}")
-        
-        return len(errors) == 0, errors
-    
-    def validate_banco(self, record: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate banco record"""
-        errors = []
-        
-        # Check monto is numeric
-        if 'Monto' in record:
-            try:
-                monto = float(record['Monto'])
-            except ValueError:
-                errors.append(f"Monto no numérico: {record['Monto']}")
-        
-        return len(errors) == 0, errors
-    
     def validate_csv_structure(self, csv_file: str) -> Dict[str, Any]:
         """Validate CSV file structure and data"""
         result = {
@@ -330,8 +256,8 @@ class ComprehensiveDataValidator:
         result['expected_count'] = mapping.get('expected_records', 0)
         
         try:
-            # Read CSV
-            df = pd.read_csv(csv_path)
+            # Read CSV (shared snapshot, parsed once per file version)
+            df = instantanea(csv_path).inferido
             result['record_count'] = len(df)
             result['match'] = result['record_count'] == result['expected_count']
             
@@ -340,25 +266,40 @@ class ComprehensiveDataValidator:
                     f"Record count mismatch: expected {result['expected_count']}, got {result['record_count']}"
                 )
             
-            # Check required fields
-            required_fields = mapping.get('required_fields', [])
-            missing_fields = [f for f in required_fields if f not in df.columns]
-            if missing_fields:
-                result['errors'].append(f"Missing required fields: {missing_fields}")
+            # Check required fields and row rules (vectorized over the frame)
+            rule_set = RuleSet(mapping.get('validation_rules', []),
+                               mapping.get('required_fields', []))
+            report = rule_set.evaluate(df)
+            if report.missing_columns:
+                result['errors'].append(f"Missing required fields: {report.missing_columns}")
             
-            # Validate each record
-            validation_func = mapping.get('validation_rules')
-            if validation_func:
-                for idx, row in df.iterrows():
-                    is_valid, errors = validation_func(row.to_dict())
-                    if not is_valid:
-                        result['errors'].append(f"Row {idx + 2}: {', '.join(errors)}")
+            result['failed_rows'] = report.failed_rows
+            for idx, errors in report.failures.items():
+                result['errors'].append(f"Row {idx + 2}: {', '.join(errors)}")
             
         except Exception as e:
             result['errors'].append(f"Error reading CSV: {e}")
         
         return result
     
+    def prefetch_counts(self, collection_names: List[str] = None):
+        """Counts every mapped collection concurrently (one aggregation query each)"""
+        if collection_names is None:
+            collection_names = [m['collection'] for m in self.data_mapping.values()]
+        self._counts.update(read_collections(
+            lambda name: count_documents(self.db, name),
+            collection_names, max_workers=self.max_workers
+        ))
+    
+    def get_collection_count(self, collection_name: str) -> int:
+        """Document count, reusing the prefetched value when available"""
+        if collection_name not in self._counts:
+            self.prefetch_counts([collection_name])
+        count, error = self._counts[collection_name]
+        if error is not None:
+            raise error
+        return count
+    
     def validate_firestore_collection(self, collection_name: str, expected_count: int) -> Dict[str, Any]:
         """Validate Firestore collection data"""
         result = {
@@ -372,14 +313,12 @@ class ComprehensiveDataValidator:
         }
         
         try:
-            # Check if collection exists and count documents
-            docs = db.collection(collection_name).limit(1).get()
-            result['exists'] = len(docs) > 0
+            # Server-side count; a collection exists while it has documents
+            count = self.get_collection_count(collection_name)
+            result['exists'] = count > 0
             
             if result['exists']:
-                # Count all documents
-                all_docs = db.collection(collection_name).get()
-                result['record_count'] = len(all_docs)
+                result['record_count'] = count
                 result['match'] = result['record_count'] == expected_count
                 
                 if not result['match']:
@@ -391,6 +330,61 @@ class ComprehensiveDataValidator:
         
         return result
     
+    def csv_record_index(self, csv_file: str) -> HashIndex:
+        """Hash index of the CSV rows, cached until the file changes"""
+        snapshot = instantanea(self.csv_dir / csv_file)
+        cached = self._csv_indexes.get(csv_file)
+        if cached is None or cached[0] != snapshot.clave:
+            mapping = self.data_mapping.get(csv_file, {})
+            # Blank numbers are stored as 0 by the migrator
+            numeric = snapshot.inferido.select_dtypes('number').columns
+            value_map = mapping.get('firestore_values', {})
+            index = HashIndex.build((as_stored_values(row, value_map) for row in snapshot.filas),
+                                    snapshot.columnas,
+                                    key_fields=mapping.get('key_fields'),
+                                    numeric_fields=numeric)
+            cached = self._csv_indexes[csv_file] = (snapshot.clave, index)
+        return cached[1]
+    
+    def prefetch_record_indexes(self, csv_files: List[str] = None):
+        """Streams every mapped collection concurrently into a hash index.
+        
+        Only the CSV columns are hashed, so extra Firestore fields (ids,
+        timestamps) do not count as drift. Documents are read back under
+        their CSV column names through the mapping's `firestore_fields`.
+        """
+        if csv_files is None:
+            csv_files = list(self.data_mapping)
+        by_collection = {}
+        for csv_file in csv_files:
+            mapping = self.data_mapping.get(csv_file, {})
+            if mapping.get('collection') and (self.csv_dir / csv_file).exists():
+                by_collection[mapping['collection']] = csv_file
+        
+        def build(collection_name: str) -> HashIndex:
+            csv_file = by_collection[collection_name]
+            csv_index = self.csv_record_index(csv_file)
+            field_map = self.data_mapping[csv_file].get('firestore_fields', {})
+            return HashIndex.build(
+                (as_csv_record(doc, field_map) for doc in stream_documents(self.db, collection_name)),
+                csv_index.fields, key_fields=csv_index.key_fields,
+                n_buckets=csv_index.n_buckets, numeric_fields=csv_index.numeric_fields
+            )
+        
+        self._firestore_indexes.update(read_collections(
+            build, by_collection, max_workers=self.max_workers
+        ))
+    
+    def get_firestore_index(self, csv_file: str) -> HashIndex:
+        """Firestore hash index, reusing the prefetched one when available"""
+        collection_name = self.data_mapping[csv_file]['collection']
+        if collection_name not in self._firestore_indexes:
+            self.prefetch_record_indexes([csv_file])
+        index, error = self._firestore_indexes[collection_name]
+        if error is not None:
+            raise error
+        return index
+    
     def compare_csv_firestore(self, csv_file: str) -> Dict[str, Any]:
         """Compare CSV data with Firestore collection"""
         mapping = self.data_mapping.get(csv_file, {})
@@ -415,12 +409,10 @@ class ComprehensiveDataValidator:
                 result['errors'].append(f"CSV file not found: {csv_path}")
                 return result
             
-            df = pd.read_csv(csv_path)
-            csv_count = len(df)
+            csv_count = len(instantanea(csv_path).inferido)
             
-            # Count Firestore documents
-            firestore_docs = db.collection(collection_name).get()
-            firestore_count = len(firestore_docs)
+            # Count Firestore documents (shared with validate_firestore_collection)
+            firestore_count = self.get_collection_count(collection_name)
             
             # Compare counts
             if csv_count != firestore_count:
@@ -431,6 +423,23 @@ class ComprehensiveDataValidator:
             else:
                 result['sync_status'] = 'in_sync'
             
+            # Compare content: equal counts can still hide drifted records
+            if self.compare_records:
+                diff = diff_indexes(self.csv_record_index(csv_file),
+                                    self.get_firestore_index(csv_file))
+                result['record_diff'] = diff.summary()
+                if not diff.in_sync:
+                    result['differences'].append(
+                        f"Record drift: {len(diff.added)} missing in Firestore, "
+                        f"{len(diff.removed)} extra in Firestore, {len(diff.changed)} changed"
+                    )
+                    if diff.source_duplicates or diff.target_duplicates:
+                        result['differences'].append(
+                            f"Duplicate keys {mapping.get('key_fields')}: "
+                            f"CSV={diff.source_duplicates}, Firestore={diff.target_duplicates}"
+                        )
+                    result['sync_status'] = 'out_of_sync'
+            
         except Exception as e:
             result['errors'].append(f"Error comparing data: {e}")
             result['sync_status'] = 'error'
@@ -447,6 +456,13 @@ class ComprehensiveDataValidator:
         firestore_validations = []
         comparisons = []
         
+        # Count all collections up front, in parallel
+        print(f"🔥 Counting {len(self.data_mapping)} Firestore collections...")
+        self.prefetch_counts()
+        if self.compare_records:
+            print(f"🧬 Indexing Firestore records...")
+            self.prefetch_record_indexes()
+        
         # Validate each CSV file
         for csv_file, mapping in self.data_mapping.items():
             print(f"📄 Validating {csv_file}...")
@@ -512,7 +528,39 @@ class ComprehensiveDataValidator:
         return self.results
 
 if __name__ == "__main__":
-    validator = ComprehensiveDataValidator()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='CHRONOS comprehensive data validator')
+    parser.add_argument('--emulator', nargs='?', const='localhost:8080',
+                        help='Use the Firestore emulator (default host localhost:8080)')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use an in-process fake Firestore seeded from the CSV files')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help='Concurrent Firestore reads')
+    parser.add_argument('--counts-only', action='store_true',
+                        help='Skip the record-level CSV/Firestore diff')
+    args = parser.parse_args()
+    
+    if args.emulator:
+        os.environ['FIRESTORE_EMULATOR_HOST'] = args.emulator
+    
+    if args.fake:
+        from firestore_fake import FakeFirestoreClient
+        validator = ComprehensiveDataValidator(db=FakeFirestoreClient(), max_workers=args.workers,
+                                               compare_records=not args.counts_only)
+        # Seed one collection per mapped CSV, laid out as the migrator writes it
+        validator.db = FakeFirestoreClient.from_csv_dir(validator.csv_dir, {
+            csv_file: m['collection'] for csv_file, m in validator.data_mapping.items()
+        }, fields={
+            csv_file: m['firestore_fields'] for csv_file, m in validator.data_mapping.items()
+            if 'firestore_fields' in m
+        }, transform={
+            csv_file: lambda row, m=m: as_stored_values(row, m['firestore_values'])
+            for csv_file, m in validator.data_mapping.items() if 'firestore_values' in m
+        })
+    else:
+        validator = ComprehensiveDataValidator(max_workers=args.workers,
+                                               compare_records=not args.counts_only)
     results = validator.run_comprehensive_validation()
     
     # Exit with error code if validation failed
@@ -1,32 +1,450 @@
 #!/usr/bin/env python3
 """
 🌐 Dashboard Server - Servidor HTTP para el dashboard de monitoreo
+
+- ThreadingHTTPServer: cada conexión en su hilo, así un stream SSE abierto
+  no bloquea al resto de peticiones.
+- Archivos: ETag/Last-Modified con respuestas 304 y compresión gzip (brotli
+  si está instalado) según Accept-Encoding; las versiones comprimidas se
+  cachean por mtime.
+- API JSON de solo lectura sobre el historial (test_history.sqlite3),
+  paginada por cursor (`before`): /api/summary, /api/runs, /api/results,
+  /api/trend, /api/flaky, /api/clusters y /api/perf. Cada respuesta lleva
+  ETag, así que un sondeo sin cambios se contesta con 304.
+- /api/events: Server-Sent Events. Un único hilo vigila el historial
+  (PRAGMA data_version, sin leer tablas) y agent_metrics.json (mtime) y
+  reparte cada cambio a todos los clientes: N pestañas abiertas cuestan una
+  lectura por cambio, no N sondeos. Last-Event-ID reenvía lo perdido.
+
+    python3 dashboard_server.py [puerto]
 """
 
+import gzip
+import hashlib
 import http.server
-import socketserver
+import json
 import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
 
-PORT = 8080
+from test_history import BUCKETS, TestHistory
+
+PORT = int(os.getenv('DASHBOARD_PORT', '8080'))
 DIRECTORY = Path(__file__).parent
+REPORTS_DIR = DIRECTORY / 'reports'
+HISTORY_PATH = REPORTS_DIR / 'test_history.sqlite3'
+METRICS_PATH = REPORTS_DIR / 'agent_metrics.json'
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+MIN_COMPRESS_BYTES = 1024
+FILE_CACHE_SIZE = 64
+MAX_PAGE_SIZE = 500
+WATCH_INTERVAL = 1.0
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE = 100
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br', 'gzip' or None, honouring q=0"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if BROTLI_AVAILABLE and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: Optional[str], static: bool = False) -> bytes:
+    if encoding == 'br':
+        # Static files are compressed once per mtime: spend the time on ratio
+        return brotli.compress(data, quality=11 if static else 5)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9 if static else 6, mtime=0)
+    return data
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+class HistoryReader:
+    """Read-only TestHistory, opened once the agent has created the file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._history: Optional[TestHistory] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[TestHistory]:
+        with self._lock:
+            if self._history is None and self.path.exists():
+                try:
+                    self._history = TestHistory(self.path, readonly=True)
+                except sqlite3.Error as e:
+                    print(f"⚠️  Historial no disponible: {e}")
+            return self._history
+
+
+def read_metrics() -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(METRICS_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class EventHub:
+    """One watcher thread for the history and the metrics file; fan-out to SSE clients"""
+
+    def __init__(self, reader: HistoryReader, interval: float = WATCH_INTERVAL):
+        self.reader = reader
+        self.interval = interval
+        self.last_run_id: Optional[int] = None
+        self._version: Optional[int] = None
+        self._metrics_mtime: Optional[int] = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    def start(self):
+        # New clients get a snapshot on connect: only later changes are events
+        self._metrics_mtime = self._metrics_stamp()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def is_subscribed(self, q: queue.Queue) -> bool:
+        with self._lock:
+            return q in self._subscribers
+
+    def publish(self, event: str, data: Any, event_id: Optional[int] = None):
+        with self._lock:
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait((event, data, event_id))
+                except queue.Full:
+                    # A client this far behind is dropped; EventSource reconnects with Last-Event-ID
+                    self._subscribers.discard(q)
+
+    @staticmethod
+    def _metrics_stamp() -> Optional[int]:
+        try:
+            return METRICS_PATH.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except sqlite3.Error as e:
+                print(f"⚠️  Error leyendo el historial: {e}")
+
+    def poll(self):
+        history = self.reader.get()
+        if history is not None:
+            version = history.data_version()
+            if version != self._version:
+                self._version = version
+                if self.last_run_id is None:
+                    latest = history.runs(limit=1)
+                    self.last_run_id = latest[0]['run_id'] if latest else 0
+                for run in reversed(history.runs(limit=50, after_id=self.last_run_id)):
+                    self.publish('run', run, run['run_id'])
+                    self.last_run_id = run['run_id']
+
+        mtime = self._metrics_stamp()
+        if mtime != self._metrics_mtime:
+            self._metrics_mtime = mtime
+            metrics = read_metrics()
+            if metrics is not None:
+                self.publish('metrics', metrics)
+
+
+class DashboardServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.reader = HistoryReader(HISTORY_PATH)
+        self.hub = EventHub(self.reader)
+        self.file_cache: 'OrderedDict[tuple, bytes]' = OrderedDict()
+        self.file_cache_lock = threading.Lock()
+
 
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: DashboardServer
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(DIRECTORY), **kwargs)
-    
+
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
         super().end_headers()
 
-if __name__ == "__main__":
-    with socketserver.TCPServer(("", PORT), CustomHTTPRequestHandler) as httpd:
-        print(f"🌐 Dashboard server running at http://localhost:{PORT}")
-        print(f"📊 Open http://localhost:{PORT}/dashboard.html")
-        print("Press Ctrl+C to stop")
-        
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch(head_only=False)
+
+    def do_HEAD(self):
+        self._dispatch(head_only=True)
+
+    def _dispatch(self, head_only: bool):
+        url = urlparse(self.path)
+        try:
+            if url.path == '/api/events':
+                return self._serve_events()
+            if url.path.startswith('/api/'):
+                return self._serve_api(url.path, parse_qs(url.query), head_only)
+            if url.path in ('', '/'):
+                self.send_response(302)
+                self.send_header('Location', '/dashboard.html')
+                self.send_header('Content-Length', '0')
+                return self.end_headers()
+            return self._serve_file(url.path, head_only)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    # ------------------------------------------------------------------ responses
+
+    def _send_body(self, status: int, body: bytes, content_type: str, etag: str, encoding: Optional[str],
+                   head_only: bool, last_modified: Optional[str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        # Always revalidate, but a 304 costs no body
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)) if status != 304 else '0')
+        self.end_headers()
+        if not head_only and status != 304:
+            self.wfile.write(body)
+
+    def _serve_file(self, path: str, head_only: bool):
+        file_path = Path(self.translate_path(path))
+        try:
+            inside = file_path.resolve().is_relative_to(DIRECTORY.resolve())
+        except OSError:
+            inside = False
+        if not inside or not file_path.is_file():
+            return self.send_error(404, "Archivo no encontrado")
+
+        stat = file_path.stat()
+        content_type = self.guess_type(str(file_path))
+        encoding = None
+        if content_type.startswith(COMPRESSIBLE_TYPES) and stat.st_size >= MIN_COMPRESS_BYTES:
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'))
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if self._not_modified(etag, stat.st_mtime):
+            return self._send_body(304, b'', content_type, etag, encoding, head_only, last_modified)
+
+        key = (str(file_path), stat.st_mtime_ns, encoding)
+        cache = self.server.file_cache
+        with self.server.file_cache_lock:
+            body = cache.get(key)
+            if body is not None:
+                cache.move_to_end(key)
+        if body is None:
+            body = compress(file_path.read_bytes(), encoding, static=True)
+            with self.server.file_cache_lock:
+                cache[key] = body
+                while len(cache) > FILE_CACHE_SIZE:
+                    cache.popitem(last=False)
+        self._send_body(200, body, content_type, etag, encoding, head_only, last_modified)
+
+    def _not_modified(self, etag: str, mtime: Optional[float] = None) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        since = self.headers.get('If-Modified-Since')
+        if since and mtime is not None:
+            try:
+                return int(mtime) <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_json(self, data: Any, head_only: bool = False, status: int = 200):
+        raw = json.dumps(data, default=str).encode()
+        encoding = choose_encoding(self.headers.get('Accept-Encoding')) if len(raw) >= MIN_COMPRESS_BYTES else None
+        etag = f'"{hashlib.blake2b(raw, digest_size=16).hexdigest()}{"-" + encoding if encoding else ""}"'
+        if status == 200 and self._not_modified(etag):
+            return self._send_body(304, b'', 'application/json', etag, encoding, head_only)
+        self._send_body(status, compress(raw, encoding), 'application/json; charset=utf-8', etag, encoding,
+                        head_only)
+
+    # ------------------------------------------------------------------ API
+
+    def _serve_api(self, path: str, params: Dict[str, list], head_only: bool):
+        def arg(name, default=None):
+            return params.get(name, [default])[0]
+
+        def int_arg(name, default, low=1, high=MAX_PAGE_SIZE):
+            value = arg(name)
+            if value is None:
+                return default
+            return max(low, min(high, int(value)))
+
+        def since_days(default=7):
+            return time.time() - float(arg('days', default)) * 86400
+
+        if path == '/api/summary':
+            history = self.server.reader.get()
+            latest = history.runs(limit=1) if history else []
+            return self._send_json({
+                'metrics': read_metrics(),
+                'totals_24h': history.totals(since=time.time() - 86400) if history else None,
+                'last_run': latest[0] if latest else None,
+            }, head_only)
+
+        history = self.server.reader.get()
+        if history is None:
+            return self._send_json({'error': 'Historial no disponible todavía'}, head_only, status=503)
+
         try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n🛑 Server stopped")
+            if path == '/api/runs':
+                limit = int_arg('limit', 20)
+                items = history.runs(limit=limit, before_id=int_arg('before', None, low=0, high=sys.maxsize))
+                data = {'items': items, 'next': items[-1]['run_id'] if len(items) == limit else None}
+            elif path == '/api/results':
+                limit = int_arg('limit', 50)
+                items = history.recent(limit=limit, test_id=arg('test_id'),
+                                       before_id=int_arg('before', None, low=0, high=sys.maxsize))
+                data = {'items': items, 'next': items[-1]['id'] if len(items) == limit else None}
+            elif path == '/api/trend':
+                bucket = arg('bucket', 'day')
+                if bucket not in BUCKETS:
+                    raise ValueError(f"bucket debe ser uno de {sorted(BUCKETS)}")
+                data = {'items': history.pass_rate_trend(bucket=bucket, since=since_days(30),
+                                                         test_id=arg('test_id'), suite=arg('suite'))}
+            elif path == '/api/flaky':
+                data = {'items': history.flaky_tests(since=since_days(), limit=int_arg('limit', 50))}
+            elif path == '/api/clusters':
+                data = {'items': history.top_clusters(since=since_days(), limit=int_arg('limit', 20))}
+            elif path == '/api/perf':
+                metric, bucket = arg('metric'), arg('bucket', 'day')
+                if not metric or bucket not in BUCKETS:
+                    raise ValueError("se requiere metric y un bucket válido")
+                data = {'items': history.metric_trend(metric, test_id=arg('test_id'), bucket=bucket,
+                                                      since=since_days(30))}
+            else:
+                return self._send_json({'error': 'Endpoint no encontrado'}, head_only, status=404)
+        except ValueError as e:
+            return self._send_json({'error': str(e)}, head_only, status=400)
+        except sqlite3.Error as e:
+            return self._send_json({'error': f"Error del historial: {e}"}, head_only, status=500)
+        self._send_json(data, head_only)
+
+    # ------------------------------------------------------------------ SSE
+
+    def _write_event(self, event: Optional[str], data: Any = None, event_id: Optional[int] = None):
+        if event is None:
+            chunk = ': ping\n\n'
+        else:
+            chunk = (f"id: {event_id}\n" if event_id is not None else '') + \
+                    f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        self.wfile.write(chunk.encode())
+        self.wfile.flush()
+
+    def _serve_events(self):
+        hub = self.server.hub
+        # The stream has no length: the connection ends with it
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+
+        q = hub.subscribe()
+        try:
+            self.wfile.write(b'retry: 3000\n\n')
+            last_id = self.headers.get('Last-Event-ID', '')
+            history = self.server.reader.get()
+            if last_id.isdigit() and history is not None:
+                for run in reversed(history.runs(limit=50, after_id=int(last_id))):
+                    self._write_event('run', run, run['run_id'])
+            metrics = read_metrics()
+            if metrics is not None:
+                self._write_event('metrics', metrics)
+
+            while not hub.closed and hub.is_subscribed(q):
+                try:
+                    event, data, event_id = q.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Keeps proxies from closing the stream and detects gone clients
+                    self._write_event(None)
+                    continue
+                self._write_event(event, data, event_id)
+        finally:
+            hub.unsubscribe(q)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    httpd = DashboardServer(("", port), CustomHTTPRequestHandler)
+    httpd.hub.start()
+    print(f"🌐 Dashboard server running at http://localhost:{port}")
+    print(f"📊 Open http://localhost:{port}/dashboard.html")
+    print(f"🗜️  Compresión: {'brotli + gzip' if BROTLI_AVAILABLE else 'gzip'} · 📡 Eventos: /api/events")
+    print("Press Ctrl+C to stop")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped")
+    finally:
+        httpd.hub.stop()
+        httpd.server_close()
@@ -15,12 +15,26 @@ a través de todo el sistema.
 
 import os
 import json
-import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 import re
+import sys
+
+# Capa compartida de instantáneas CSV (scripts/carga_tipada.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+import carga_tipada
+from carga_tipada import instantanea
+
+import bank_ledger
+from bank_ledger import BANKS, JOURNAL, reconcile
+
+# Código del que dependen los checks: editarlo invalida la caché de resultados
+CODE_DEPENDENCIES = (Path(__file__), Path(bank_ledger.__file__), Path(carga_tipada.__file__))
 
 
 @dataclass
@@ -42,6 +56,9 @@ class ConsistencyReport:
     failed: int = 0
     warnings: int = 0
     results: List[ValidationResult] = field(default_factory=list)
+    # check -> segundos de ejecución; `reused`: checks tomados de la caché
+    durations: Dict[str, float] = field(default_factory=dict)
+    reused: List[str] = field(default_factory=list)
     
     @property
     def success_rate(self) -> float:
@@ -64,10 +81,21 @@ class ConsistencyReport:
                     "details": r.details
                 }
                 for r in self.results
-            ]
+            ],
+            "durations": self.durations,
+            "reused_checks": self.reused
         }
 
 
+@dataclass(frozen=True)
+class ConsistencyCheck:
+    """Validación registrada: método del validador y archivos que lee."""
+    name: str
+    title: str
+    method: str
+    inputs: Tuple[str, ...]  # patrones glob relativos al workspace
+
+
 class DataConsistencyValidator:
     """
     Validador de consistencia de datos del sistema CHRONOS.
@@ -90,39 +118,83 @@ class DataConsistencyValidator:
         "deuda_cliente": "totalVentas - totalPagado"
     }
     
-    def __init__(self, workspace_path: str = "/workspaces/v0-crypto-dashboard-design"):
+    # Validaciones en orden de reporte, con los archivos que lee cada una
+    CHECKS = (
+        ConsistencyCheck("csv_structure", "📁 Validando archivos CSV...",
+                         "_validate_csv_structure",
+                         ("csv/ventas.csv", "csv/clientes.csv", "csv/bancos_azteca.csv",
+                          "csv/bancos_leftie.csv", "csv/bancos_profit.csv",
+                          "csv/boveda_monte.csv", "csv/boveda_usa.csv",
+                          "csv/ordenes_compra.csv", "csv/almacen.csv")),
+        ConsistencyCheck("ventas_data", "💰 Validando datos de ventas...",
+                         "_validate_ventas_data", ("csv/ventas.csv",)),
+        ConsistencyCheck("bancos_consistency", "🏦 Validando consistencia de bancos...",
+                         "_validate_bancos_consistency",
+                         tuple(f"csv/{b.ledger}" for b in BANKS if b.ledger)
+                         + (f"csv/{JOURNAL.file}",)),
+        ConsistencyCheck("distribution_logic", "📊 Validando lógica de distribución...",
+                         "_validate_distribution_logic",
+                         ("FORMULAS_CORRECTAS_VENTAS_Version2.md",
+                          "app/lib/services/ventas-transaction.service.ts")),
+        ConsistencyCheck("clientes_consistency", "👥 Validando clientes y deudas...",
+                         "_validate_clientes_consistency", ("csv/clientes.csv",)),
+        ConsistencyCheck("type_schemas", "📝 Validando schemas de tipos...",
+                         "_validate_type_schemas",
+                         ("app/types/index.ts", "app/lib/schemas/*.ts")),
+    )
+    
+    def __init__(self, workspace_path: str = "/workspaces/v0-crypto-dashboard-design",
+                 max_workers: int = 6, use_cache: bool = True):
         self.workspace = Path(workspace_path)
         self.csv_dir = self.workspace / "csv"
         self.report = ConsistencyReport(timestamp=datetime.now().isoformat())
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.cache_path = self.workspace / "analysis_output" / ".cache" / "consistency_checks.json"
+        # Resultados del check en curso, uno por hilo del pool
+        self._local = threading.local()
         
     def validate_all(self) -> ConsistencyReport:
-        """Ejecuta todas las validaciones."""
+        """Ejecuta todas las validaciones.
+        
+        Los checks corren en paralelo en un pool de hilos (son de E/S y
+        comparten las instantáneas CSV); sus resultados se fusionan en el
+        orden de CHECKS, así que el reporte no depende de la planificación.
+        Con caché, un check solo se vuelve a ejecutar si cambió alguno de
+        sus archivos de entrada.
+        """
         print("🔍 CHRONOS Data Consistency Validator")
         print("=" * 60)
         
-        # 1. Validar estructura de CSVs
-        print("\n📁 Validando archivos CSV...")
-        self._validate_csv_structure()
-        
-        # 2. Validar datos de ventas
-        print("\n💰 Validando datos de ventas...")
-        self._validate_ventas_data()
-        
-        # 3. Validar consistencia de bancos
-        print("\n🏦 Validando consistencia de bancos...")
-        self._validate_bancos_consistency()
+        cache = self._load_cache() if self.use_cache else {}
+        fingerprints = {c.name: self._input_fingerprint(c) for c in self.CHECKS}
+        pending = [c for c in self.CHECKS
+                   if cache.get(c.name, {}).get("fingerprint") != fingerprints[c.name]]
         
-        # 4. Validar lógica de distribución
-        print("\n📊 Validando lógica de distribución...")
-        self._validate_distribution_logic()
+        outcomes = {}
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as pool:
+                futures = {c.name: pool.submit(self._run_check, c) for c in pending}
+                outcomes = {name: future.result() for name, future in futures.items()}
         
-        # 5. Validar clientes y deudas
-        print("\n👥 Validando clientes y deudas...")
-        self._validate_clientes_consistency()
+        for check in self.CHECKS:
+            if check.name in outcomes:
+                results, duration = outcomes[check.name]
+                self.report.durations[check.name] = round(duration, 4)
+                cache[check.name] = {
+                    "fingerprint": fingerprints[check.name],
+                    "results": [asdict(r) for r in results]
+                }
+                print(f"\n{check.title}")
+            else:
+                results = [ValidationResult(**r) for r in cache[check.name]["results"]]
+                self.report.reused.append(check.name)
+                print(f"\n{check.title} (sin cambios)")
+            for result in results:
+                self._merge_result(result)
         
-        # 6. Validar schemas TypeScript
-        print("\n📝 Validando schemas de tipos...")
-        self._validate_type_schemas()
+        if self.use_cache:
+            self._save_cache(cache)
         
         # Resumen
         print("\n" + "=" * 60)
@@ -137,8 +209,62 @@ class DataConsistencyValidator:
         
         return self.report
     
+    def _run_check(self, check: ConsistencyCheck) -> Tuple[List[ValidationResult], float]:
+        """Ejecuta un check en el hilo actual y devuelve sus resultados y duración."""
+        self._local.results = []
+        start = time.perf_counter()
+        try:
+            getattr(self, check.method)()
+        except Exception as e:
+            self._local.results.append(ValidationResult(
+                name=check.name,
+                passed=False,
+                message=f"Error en validación: {e}",
+                severity="high"
+            ))
+        finally:
+            results, self._local.results = self._local.results, None
+        return results, time.perf_counter() - start
+    
+    def _input_fingerprint(self, check: ConsistencyCheck) -> List[Any]:
+        """Huella del código y de los archivos de entrada: existencia, mtime y tamaño."""
+        entries = [["__code__", [[path.name, path.stat().st_mtime_ns, path.stat().st_size]
+                                 for path in CODE_DEPENDENCIES]]]
+        for pattern in check.inputs:
+            matches = []
+            for path in sorted(self.workspace.glob(pattern)):
+                stat = path.stat()
+                matches.append([str(path.relative_to(self.workspace)), stat.st_mtime_ns, stat.st_size])
+            # La existencia del directorio también cambia el resultado
+            entries.append([pattern, (self.workspace / pattern).parent.is_dir(), matches])
+        return entries
+    
+    def _load_cache(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache: Dict[str, Any]):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, default=str)
+        except OSError as e:
+            print(f"  ⚠️ No se pudo guardar la caché de validaciones: {e}")
+    
     def _add_result(self, result: ValidationResult):
         """Agrega un resultado de validación."""
+        pending = getattr(self._local, 'results', None)
+        if pending is not None:
+            # Dentro de un check del pool: se fusiona después, en orden
+            pending.append(result)
+            return
+        self._merge_result(result)
+    
+    def _merge_result(self, result: ValidationResult):
+        """Incorpora un resultado al reporte."""
         self.report.results.append(result)
         self.report.total_checks += 1
         
@@ -188,29 +314,28 @@ class DataConsistencyValidator:
                 continue
                 
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-                    columns = reader.fieldnames or []
-                    
-                    # Verificar columnas requeridas
-                    missing_cols = [c for c in required_columns if c not in columns]
-                    
-                    if missing_cols:
-                        self._add_result(ValidationResult(
-                            name=f"csv_{filename}",
-                            passed=False,
-                            message=f"Columnas faltantes: {missing_cols}",
-                            details={"columns": columns, "missing": missing_cols},
-                            severity="medium"
-                        ))
-                    else:
-                        self._add_result(ValidationResult(
-                            name=f"csv_{filename}",
-                            passed=True,
-                            message=f"{len(rows)} registros, {len(columns)} columnas",
-                            details={"rows": len(rows), "columns": len(columns)}
-                        ))
+                snapshot = instantanea(filepath)
+                rows = snapshot.filas
+                columns = snapshot.columnas
+                
+                # Verificar columnas requeridas
+                missing_cols = [c for c in required_columns if c not in columns]
+                
+                if missing_cols:
+                    self._add_result(ValidationResult(
+                        name=f"csv_{filename}",
+                        passed=False,
+                        message=f"Columnas faltantes: {missing_cols}",
+                        details={"columns": columns, "missing": missing_cols},
+                        severity="medium"
+                    ))
+                else:
+                    self._add_result(ValidationResult(
+                        name=f"csv_{filename}",
+                        passed=True,
+                        message=f"{len(rows)} registros, {len(columns)} columnas",
+                        details={"rows": len(rows), "columns": len(columns)}
+                    ))
                         
             except Exception as e:
                 self._add_result(ValidationResult(
@@ -228,9 +353,7 @@ class DataConsistencyValidator:
             return
             
         try:
-            with open(ventas_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                ventas = list(reader)
+            ventas = instantanea(ventas_file).filas
                 
             if not ventas:
                 self._add_result(ValidationResult(
@@ -276,11 +399,13 @@ class DataConsistencyValidator:
             ))
     
     def _validate_bancos_consistency(self):
-        """Valida la consistencia de datos bancarios."""
-        banco_files = [f for f in self.csv_dir.glob("*.csv") 
-                      if any(b in f.stem for b in ["banco", "boveda", "profit", "leftie", "azteca", "utilidades", "flete"])]
+        """Reconstruye el capital de cada banco y cruza las transferencias.
         
-        if not banco_files:
+        Ver bank_ledger.py: mapeo explícito de columnas por banco y una sola
+        pasada por archivo.
+        """
+        ledger_files = [b.ledger for b in BANKS if b.ledger]
+        if not any((self.csv_dir / f).exists() for f in ledger_files):
             self._add_result(ValidationResult(
                 name="bancos_files",
                 passed=False,
@@ -289,40 +414,37 @@ class DataConsistencyValidator:
             ))
             return
             
-        total_capital = 0
-        banco_details = {}
+        conciliacion = reconcile(self.csv_dir)
         
-        for banco_file in banco_files:
-            try:
-                with open(banco_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-                    
-                    # Buscar columnas de monto/saldo
-                    if rows:
-                        sample = rows[0]
-                        monto_col = None
-                        for col in ['monto', 'saldo', 'capital', 'amount']:
-                            if col in sample:
-                                monto_col = col
-                                break
-                        
-                        if monto_col:
-                            try:
-                                capital = sum(float(r.get(monto_col, 0) or 0) for r in rows)
-                                total_capital += capital
-                                banco_details[banco_file.stem] = capital
-                            except ValueError:
-                                pass
-                                
-            except Exception:
-                pass
-                
         self._add_result(ValidationResult(
             name="bancos_capital_total",
-            passed=True,
-            message=f"Capital total en bancos: ${total_capital:,.2f}",
-            details=banco_details
+            passed=not conciliacion.missing_files,
+            message=f"Capital total en bancos: ${conciliacion.capital_total:,.2f}",
+            details={
+                "bancos": {banco: t.to_dict() for banco, t in conciliacion.totals.items()},
+                "archivos_faltantes": conciliacion.missing_files
+            },
+            severity="medium"
+        ))
+        
+        pares = {
+            f"{origen}->{destino}": {"transferencias": n, "monto": round(monto, 2)}
+            for (origen, destino), (n, monto) in sorted(conciliacion.transfer_pairs.items())
+        }
+        sin_par = len(conciliacion.unmatched_out) + len(conciliacion.unmatched_in)
+        self._add_result(ValidationResult(
+            name="bancos_transferencias",
+            passed=conciliacion.transfers_balanced,
+            message=(f"{sum(p['transferencias'] for p in pares.values())} transferencias entre bancos conciliadas"
+                     if conciliacion.transfers_balanced
+                     else f"{sin_par} transferencias sin contrapartida"),
+            details={
+                "pares": pares,
+                "sin_deposito": [list(k) for k in conciliacion.unmatched_out[:10]],
+                "sin_retiro": [list(k) for k in conciliacion.unmatched_in[:10]],
+                "bancos_desconocidos": dict(conciliacion.unknown_banks)
+            },
+            severity="high"
         ))
     
     def _validate_distribution_logic(self):
@@ -396,9 +518,7 @@ class DataConsistencyValidator:
             return
             
         try:
-            with open(clientes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                clientes = list(reader)
+            clientes = instantanea(clientes_file).filas
                 
             # Verificar campos requeridos
             if clientes:
@@ -510,8 +630,16 @@ class DataConsistencyValidator:
 
 def main():
     """Punto de entrada principal."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="CHRONOS Data Consistency Validator")
+    parser.add_argument("--workers", type=int, default=6, help="Checks en paralelo")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignora la caché y ejecuta todos los checks")
+    args = parser.parse_args()
+    
     print()
-    validator = DataConsistencyValidator()
+    validator = DataConsistencyValidator(max_workers=args.workers, use_cache=not args.full)
     report = validator.validate_all()
     validator.save_report()
     
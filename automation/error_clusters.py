@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+🧬 ERROR CLUSTERS - CHRONOS SYSTEM
+Deterministic near-duplicate clustering of error messages (TS, Jest,
+Playwright, Python), with cluster ids that survive restarts.
+
+- Normalization drops ANSI colors and stack frames and replaces numbers,
+  hex ids, UUIDs and paths with placeholders; the remaining lowercase word
+  tokens are cut into shingles of SHINGLE_SIZE tokens, hashed with crc32
+  (never the per-process salted hash()).
+- MinHash: NUM_PERM hashes (a*x + b) mod 2**61-1 whose coefficients come
+  from blake2b, so signatures are identical in every process and numpy
+  version. LSH splits a signature into BANDS bands; clusters sharing a band
+  bucket are the only candidates, and the best one whose estimated Jaccard
+  similarity reaches `threshold` is chosen. Otherwise a new cluster starts.
+- Exact repeats of a message hit a bounded in-memory memo first.
+- A cluster id is the fingerprint (blake2b of the normalized tokens) of
+  its founding message. Clusters, their signatures and the fingerprints
+  already seen are stored in SQLite (the test history file by default) and
+  reloaded at start: repeats that normalize the same skip MinHash entirely.
+
+    clusters = ErrorClusterIndex(reports_dir / 'test_history.sqlite3')
+    cluster_id = clusters.assign(error_message)
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 32
+SHINGLE_SIZE = 3
+MAX_TOKENS = 200
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _coefficients(name: str, low: int) -> np.ndarray:
+    values = [low + int.from_bytes(hashlib.blake2b(f"minhash:{name}:{i}".encode(), digest_size=8).digest(),
+                                   'big') % (_MERSENNE - low)
+              for i in range(NUM_PERM)]
+    return np.array(values, dtype=np.uint64)
+
+
+_A = _coefficients('a', 1)
+_B = _coefficients('b', 0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS error_clusters (
+    cluster_id  TEXT PRIMARY KEY,
+    signature   BLOB NOT NULL,
+    exemplar    TEXT,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    occurrences INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS error_fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    cluster_id  TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+MAX_EXEMPLAR_CHARS = 500
+MEMO_SIZE = 4096
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+# JS "    at fn (file:1:2)" and Python '  File "x.py", line 3, in fn' frames
+_FRAME = re.compile(r'^\s*(?:at\s.*|File ".*", line \d+.*)$', re.MULTILINE)
+# (regex, placeholder, substrings of which one must be present to try it)
+_VOLATILE = (
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), ' ref ', ('-',)),
+    (re.compile(r'0x[0-9a-f]+', re.I), ' ref ', ('0x', '0X')),
+    # Paths start at a token boundary only (the lookbehind avoids rescans)
+    (re.compile(r'(?<![\w.@~:-])(?:[a-z]:)?[\w.@~-]*[/\\][\w.@~/\\-]*', re.I), ' ref ', ('/', '\\')),
+    (re.compile(r'\b\d+'), ' num ', ('',)),  # not the digits of TS2307
+)
+_TOKEN = re.compile(r'[a-z_$][a-z0-9_$]*')
+
+
+def normalize_tokens(message: str) -> List[str]:
+    """Lowercase word tokens with the volatile parts replaced by placeholders"""
+    text = _FRAME.sub(' ', _ANSI.sub('', message))
+    for regex, placeholder, required in _VOLATILE:
+        if any(part in text for part in required):
+            text = regex.sub(placeholder, text)
+    return _TOKEN.findall(text.lower())[:MAX_TOKENS]
+
+
+def fingerprint(tokens: Sequence[str]) -> str:
+    """Stable id of a normalized message"""
+    return hashlib.blake2b(' '.join(tokens).encode(), digest_size=8).hexdigest()
+
+
+def shingles(tokens: Sequence[str], size: int = SHINGLE_SIZE) -> set:
+    """crc32 of every run of `size` consecutive tokens (one shingle if shorter)"""
+    if len(tokens) <= size:
+        return {zlib.crc32(' '.join(tokens).encode())} if tokens else set()
+    return {zlib.crc32(' '.join(tokens[i:i + size]).encode()) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(tokens: Sequence[str]) -> Optional[np.ndarray]:
+    """NUM_PERM-value uint32 signature; None when there are no tokens"""
+    hashed = shingles(tokens)
+    if not hashed:
+        return None
+    values = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+    # a*x wraps at 2**64 before the modulo; still a fixed function of x
+    permuted = (np.outer(values, _A) + _B) % np.uint64(_MERSENNE) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class ErrorClusterIndex:
+    """MinHash/LSH index of error clusters persisted in SQLite"""
+
+    def __init__(self, path: Path, threshold: float = 0.5, readonly: bool = False,
+                 timeout: float = 5.0):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.readonly = readonly
+        self._rows = NUM_PERM // BANDS
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                                         timeout=timeout, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.executescript(SCHEMA)
+        self._conn.row_factory = sqlite3.Row
+
+        # raw message -> cluster id
+        self._memo: Dict[str, str] = OrderedDict()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(BANDS)]
+        self._fingerprints: Dict[str, str] = dict(
+            self._conn.execute("SELECT fingerprint, cluster_id FROM error_fingerprints"))
+        for cluster_id, blob in self._conn.execute("SELECT cluster_id, signature FROM error_clusters"):
+            signature = np.frombuffer(blob, dtype=np.uint32)
+            # Signatures from another NUM_PERM stay reachable by fingerprint only
+            if len(signature) == NUM_PERM:
+                self._index(cluster_id, signature)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'ErrorClusterIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _bands(self, signature: np.ndarray) -> Iterable[bytes]:
+        rows = self._rows
+        return (signature[band * rows:(band + 1) * rows].tobytes() for band in range(BANDS))
+
+    def _index(self, cluster_id: str, signature: np.ndarray):
+        self._signatures[cluster_id] = signature
+        for buckets, key in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(key, []).append(cluster_id)
+
+    def _nearest(self, signature: np.ndarray) -> Optional[str]:
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._bands(signature)):
+            candidates.update(buckets.get(key, ()))
+        best, best_score = None, self.threshold
+        # Sorted: ties go to the same cluster in every process
+        for cluster_id in sorted(candidates):
+            score = similarity(signature, self._signatures[cluster_id])
+            if score > best_score or (best is None and score >= best_score):
+                best, best_score = cluster_id, score
+        return best
+
+    # ------------------------------------------------------------------ write
+
+    def assign(self, message: Optional[str], ts: Optional[float] = None) -> Optional[str]:
+        """Cluster id of one message (None for an empty message)"""
+        return self.assign_many([message], ts)[0]
+
+    def assign_many(self, messages: Iterable[Optional[str]], ts: Optional[float] = None) -> List[Optional[str]]:
+        """Cluster ids of a batch, written in one transaction"""
+        if self.readonly:
+            raise RuntimeError("ErrorClusterIndex abierto en solo lectura")
+        ts = time.time() if ts is None else ts
+        assigned: List[Optional[str]] = []
+        new_clusters, new_fingerprints, counts = [], [], {}
+        with self._lock:
+            for message in messages:
+                if not message:
+                    assigned.append(None)
+                    continue
+                cluster_id = self._memo.get(message)
+                if cluster_id is not None:
+                    counts[cluster_id] = counts.get(cluster_id, 0) + 1
+                    assigned.append(cluster_id)
+                    continue
+                tokens = normalize_tokens(message)
+                key = fingerprint(tokens)
+                cluster_id = self._fingerprints.get(key)
+                if cluster_id is None:
+                    signature = minhash(tokens)
+                    cluster_id = self._nearest(signature) if signature is not None else None
+                    if cluster_id is None:
+                        cluster_id = key
+                        if signature is None:
+                            signature = np.zeros(0, dtype=np.uint32)
+                        else:
+                            self._index(cluster_id, signature)
+                        new_clusters.append((cluster_id, signature.tobytes(),
+                                             message[:MAX_EXEMPLAR_CHARS], ts, ts))
+                    self._fingerprints[key] = cluster_id
+                    new_fingerprints.append((key, cluster_id))
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.popitem(last=False)
+                self._memo[message] = cluster_id
+                counts[cluster_id] = counts.get(cluster_id, 0) + 1
+                assigned.append(cluster_id)
+
+            if counts:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO error_clusters "
+                        "(cluster_id, signature, exemplar, first_seen, last_seen, occurrences) "
+                        "VALUES (?, ?, ?, ?, ?, 0)", new_clusters)
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO error_fingerprints (fingerprint, cluster_id) VALUES (?, ?)",
+                        new_fingerprints)
+                    self._conn.executemany(
+                        "UPDATE error_clusters SET occurrences = occurrences + ?, "
+                        "last_seen = MAX(last_seen, ?) WHERE cluster_id = ?",
+                        [(count, ts, cluster_id) for cluster_id, count in counts.items()])
+        return assigned
+
+    def apply_retention(self, retention_days: float = 30) -> int:
+        """Forgets clusters not seen since the cutoff; returns clusters removed"""
+        if self.readonly:
+            raise RuntimeError("ErrorClusterIndex abierto en solo lectura")
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT cluster_id FROM error_clusters WHERE last_seen < ?", (cutoff,))]
+            if not expired:
+                return 0
+            self._conn.execute(
+                "DELETE FROM error_fingerprints WHERE cluster_id IN "
+                "(SELECT cluster_id FROM error_clusters WHERE last_seen < ?)", (cutoff,))
+            self._conn.execute("DELETE FROM error_clusters WHERE last_seen < ?", (cutoff,))
+            gone = set(expired)
+            self._memo.clear()
+            self._fingerprints = {k: v for k, v in self._fingerprints.items() if v not in gone}
+            signatures = {k: v for k, v in self._signatures.items() if k not in gone}
+            self._signatures, self._buckets = {}, [{} for _ in range(BANDS)]
+            for cluster_id, signature in signatures.items():
+                self._index(cluster_id, signature)
+        return len(expired)
+
+    # ------------------------------------------------------------------ read
+
+    def get(self, cluster_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cluster_id, exemplar, first_seen, last_seen, occurrences "
+                "FROM error_clusters WHERE cluster_id = ?", (cluster_id,)).fetchone()
+        return dict(row) if row else None
+
+    def clusters(self, limit: int = 50, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Clusters seen since a unix timestamp, most recent first"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                "SELECT cluster_id, exemplar, first_seen, last_seen, occurrences "
+                "FROM error_clusters WHERE last_seen >= ? "
+                "ORDER BY last_seen DESC, cluster_id LIMIT ?", (since or 0, limit))]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+🩺 ERROR TRIAGE - CHRONOS SYSTEM
+Classifies error messages against a list of known patterns in one pass.
+
+- The rules are compiled once into a single alternation of non-capturing
+  groups (capturing wrappers would disable re's prefix scan). One search()
+  finds the leftmost position where some rule matches; a second
+  alternation, with rule i as the named group `r<i>`, is match()ed at that
+  position to tell which rule it was and read its groups. It is final
+  unless an earlier-declared rule matches further right, so the alternation
+  of just the earlier rules is searched from the next position, and so on.
+  The result is the first declared rule that matches anywhere, exactly as a
+  loop of re.search calls would give, and a message that matches nothing
+  costs one C-level scan.
+- Results are memoized per message. tsc reports the message without
+  file/line, so a broken build that repeats one error thousands of times
+  is scanned once; callers that group errors first classify the simplified
+  message (see simplify_message), which collapses numbers and paths too.
+
+    triage = TriageClassifier({r"Cannot find module '([^']+)'": {...}})
+    result = triage.classify(message)  # TriageMatch or None
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+SIMPLIFIED_MAX_CHARS = 200
+
+# Precompiled and applied in this order (plain-string replacements stay in C);
+# the substring check skips a pass that cannot match
+_SIMPLIFY = (
+    (re.compile(r'\d+'), 'N', ''),
+    (re.compile(r'/[^\s]+/'), '/PATH/', '/'),
+    (re.compile(r'at \w+\.\w+'), 'at FUNC', 'at '),
+)
+
+
+@lru_cache(maxsize=4096)
+def simplify_message(message: str) -> str:
+    """Message without numbers, paths or function names, for grouping"""
+    for regex, replacement, required in _SIMPLIFY:
+        if required in message:
+            message = regex.sub(replacement, message)
+    return message[:SIMPLIFIED_MAX_CHARS]
+
+
+@dataclass(frozen=True)
+class TriageMatch:
+    pattern: str
+    info: Any
+    groups: Tuple[Optional[str], ...]
+
+
+class TriageClassifier:
+    """First-match classifier over an ordered set of regex rules"""
+
+    def __init__(self, rules: Union[Dict[str, Any], Iterable[Tuple[str, Any]]],
+                 flags: int = 0, cache_size: int = 4096):
+        self.rules = list(rules.items() if isinstance(rules, dict) else rules)
+        self.cache_size = cache_size
+        sizes = []
+        for pattern, _ in self.rules:
+            compiled = re.compile(pattern, flags)
+            if compiled.groupindex or re.search(r"\\[1-9]", pattern):
+                # Both would clash once the rules share one regex
+                raise ValueError(f"Regla de triage con grupos con nombre o referencias: {pattern}")
+            sizes.append(compiled.groups)
+        # _prefixes[n]: alternation of the first n rules
+        self._prefixes = [None] + [
+            re.compile("|".join(f"(?:{pattern})" for pattern, _ in self.rules[:n]), flags)
+            for n in range(1, len(self.rules) + 1)
+        ]
+        self._marked = re.compile(
+            "|".join(f"(?P<r{i}>{pattern})" for i, (pattern, _) in enumerate(self.rules)), flags)
+        # rule index -> slice of _marked's match.groups() with the rule's own groups
+        self._spans = []
+        for i, size in enumerate(sizes):
+            first = self._marked.groupindex[f"r{i}"]
+            self._spans.append(slice(first, first + size))
+        self._results: Dict[str, Optional[TriageMatch]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _scan(self, message: str) -> Optional[TriageMatch]:
+        best, limit, pos = None, len(self.rules), 0
+        while limit:
+            found = self._prefixes[limit].search(message, pos)
+            if found is None:
+                break
+            start = found.start()
+            best = self._marked.match(message, start)
+            # The rule group closes after its inner groups: lastgroup is the rule.
+            # Earlier rules failed at and before `start`, but may match further right
+            limit, pos = int(best.lastgroup[1:]), start + 1
+        if best is None:
+            return None
+        pattern, info = self.rules[limit]
+        return TriageMatch(pattern, info, best.groups()[self._spans[limit]])
+
+    def classify(self, message: Optional[str]) -> Optional[TriageMatch]:
+        if not message:
+            return None
+        try:
+            result = self._results[message]
+        except KeyError:
+            self.misses += 1
+            result = self._scan(message)
+            if len(self._results) >= self.cache_size:
+                self._results.popitem(last=False)
+            self._results[message] = result
+        else:
+            self.hits += 1
+        return result
+
+    def info(self, message: Optional[str], default: Any = None) -> Any:
+        result = self.classify(message)
+        return result.info if result is not None else default
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🧪 EVALUATION TASKS - CHRONOS SYSTEM
+Test suites exposed as functions for worker_pool.WarmWorkerPool.
+
+Importing this module imports the evaluators, so preloading it in the
+forkserver keeps them warm across agent iterations. Every task returns
+plain dicts/lists (picklable, JSON-friendly).
+"""
+
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+EVALUATION_DIR = Path(__file__).resolve().parent.parent / 'evaluation'
+sys.path.insert(0, str(EVALUATION_DIR))
+
+import test_evaluators
+from evaluators.business_logic import BusinessLogicEvaluator
+
+# Casos de distribución de ventas
+SALES_DISTRIBUTION_CASES = [
+    {"precioVenta": 10000, "precioCompra": 6300, "precioFlete": 500, "cantidad": 10},
+    {"precioVenta": 15000, "precioCompra": 9000, "precioFlete": 600, "cantidad": 5},
+    {"precioVenta": 8000, "precioCompra": 5000, "precioFlete": 400, "cantidad": 20},
+]
+
+
+def evaluation_suite(only: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Runs test_evaluators.TESTS (or the functions named in `only`); one entry per test"""
+    tests = []
+    for name, test_func in test_evaluators.TESTS:
+        if only is not None and test_func.__name__ not in only:
+            continue
+        try:
+            passed = bool(test_func())
+            tests.append({"name": name, "function": test_func.__name__, "passed": passed, "error": None})
+        except Exception as e:
+            tests.append({"name": name, "function": test_func.__name__, "passed": False,
+                          "error": str(e), "trace": traceback.format_exc()})
+    return {"passed": sum(t["passed"] for t in tests), "total": len(tests), "tests": tests}
+
+
+def business_logic_suite() -> Dict[str, Any]:
+    """Checks the sales distribution formulas with BusinessLogicEvaluator"""
+    evaluator = BusinessLogicEvaluator()
+    cases = []
+    for tc in SALES_DISTRIBUTION_CASES:
+        result = evaluator(
+            operation_type="venta",
+            input_data=tc,
+            output_data={
+                "distribucion": {
+                    "boveda_monte": tc["precioCompra"] * tc["cantidad"],
+                    "fletes": tc["precioFlete"] * tc["cantidad"],
+                    "utilidades": (tc["precioVenta"] - tc["precioCompra"] - tc["precioFlete"]) * tc["cantidad"]
+                },
+                "total": tc["precioVenta"] * tc["cantidad"]
+            }
+        )
+        # {"boveda_monte": 1.0, "flete_sur": 1.0, "utilidades": 1.0}
+        accuracy = result.get("distribution_accuracy", {})
+        cases.append({
+            "input": tc,
+            "accuracy": accuracy,
+            "passed": bool(accuracy) and all(v == 1.0 for v in accuracy.values())
+        })
+    return {"passed": sum(c["passed"] for c in cases), "total": len(cases), "cases": cases}
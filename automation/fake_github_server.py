@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+🧪 FAKE GITHUB SERVER - CHRONOS SYSTEM
+Local stand-in for the part of the GitHub REST API the automation uses, to
+exercise github_client / github_automation without a token or network.
+
+- /repos/{owner}/{repo}/issues: GET (state, labels, since, sort=updated,
+  per_page/page with Link headers, ETag / If-None-Match -> 304) and POST;
+  /issues/{n}: GET and PATCH; /issues/{n}/comments: POST.
+- X-RateLimit-* headers from a configurable budget (304s are free, as on
+  GitHub); when it runs out, 403 "API rate limit exceeded" until the reset.
+- fail_next() queues rate-limit answers (403/429 with Retry-After) to test
+  backoff; `connections` and `writes` record pooling and write spacing.
+
+    with FakeGitHubServer() as server:
+        os.environ['GITHUB_API_URL'] = server.url
+        python3 github_automation.py    # GITHUB_TOKEN=anything
+
+    python3 fake_github_server.py [port]   # standalone
+"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+_ISSUES = re.compile(r'^/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/issues(?:/(?P<number>\d+)(?P<comments>/comments)?)?$')
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_Server'
+
+    def setup(self):
+        super().setup()
+        with self.server.fake._lock:
+            self.server.fake.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None):
+        payload = b'' if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if payload:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def _handle(self, method: str):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        match = _ISSUES.match(url.path)
+        if match is None:
+            return self._reply(404, {'message': 'Not Found'})
+        body = self._body() if method in ('POST', 'PATCH') else None
+        status, payload, headers = fake.dispatch(method, match, parse_qs(url.query), body,
+                                                 self.headers.get('If-None-Match'))
+        self._reply(status, payload, headers)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: 'FakeGitHubServer'
+
+
+class FakeGitHubServer:
+    """In-memory issues API on 127.0.0.1, served from a background thread"""
+
+    def __init__(self, port: int = 0, rate_limit: int = 5000, reset_after: float = 3600.0):
+        self.rate_limit = rate_limit
+        self.reset_after = reset_after
+        self.remaining = rate_limit
+        self.reset_at = time.time() + reset_after
+        self.issues: List[Dict[str, Any]] = []
+        self.comments: Dict[int, List[Dict[str, Any]]] = {}
+        self.connections = 0
+        self.requests = 0
+        self.writes: List[float] = []
+        self._failures: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._httpd = _Server(('127.0.0.1', port), _Handler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> 'FakeGitHubServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FakeGitHubServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def fail_next(self, status: int = 429, count: int = 1, retry_after: Optional[float] = 0,
+                  message: str = 'You have exceeded a secondary rate limit.'):
+        """Answers the next `count` requests with a rate-limit error"""
+        with self._lock:
+            self._failures.extend({'status': status, 'retry_after': retry_after, 'message': message}
+                                  for _ in range(count))
+
+    # ------------------------------------------------------------------ API
+
+    def _rate_headers(self) -> Dict[str, str]:
+        return {'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Remaining': str(self.remaining),
+                'X-RateLimit-Used': str(self.rate_limit - self.remaining),
+                'X-RateLimit-Reset': str(int(self.reset_at))}
+
+    def dispatch(self, method: str, match: 're.Match', query: Dict[str, List[str]], body: Any,
+                 if_none_match: Optional[str]):
+        with self._lock:
+            self.requests += 1
+            if time.time() >= self.reset_at:
+                self.remaining, self.reset_at = self.rate_limit, time.time() + self.reset_after
+            if self._failures:
+                failure = self._failures.pop(0)
+                headers = self._rate_headers()
+                if failure['retry_after'] is not None:
+                    headers['Retry-After'] = str(failure['retry_after'])
+                return failure['status'], {'message': failure['message']}, headers
+            if self.remaining <= 0:
+                return 403, {'message': 'API rate limit exceeded'}, self._rate_headers()
+
+            status, payload, headers = self._route(method, match, query, body)
+            etag = None
+            if method == 'GET' and status == 200:
+                etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+                headers['ETag'] = etag
+            if etag is not None and if_none_match == etag:
+                # Conditional hits do not count against the limit
+                return 304, None, {**headers, **self._rate_headers()}
+            self.remaining -= 1
+            if method != 'GET':
+                self.writes.append(time.monotonic())
+            return status, payload, {**headers, **self._rate_headers()}
+
+    def _issue(self, number: int) -> Optional[Dict[str, Any]]:
+        return next((issue for issue in self.issues if issue['number'] == number), None)
+
+    def _route(self, method: str, match: 're.Match', query: Dict[str, List[str]], body: Any):
+        owner, repo, number = match['owner'], match['repo'], match['number']
+        if number is None and method == 'POST':
+            now = _now_iso()
+            issue = {'number': len(self.issues) + 1, 'title': body['title'], 'body': body.get('body'),
+                     'labels': [{'name': name} for name in body.get('labels', [])],
+                     'assignees': [{'login': login} for login in body.get('assignees', [])],
+                     'state': 'open', 'state_reason': None, 'comments': 0, 'created_at': now, 'updated_at': now,
+                     'html_url': f"https://github.com/{owner}/{repo}/issues/{len(self.issues) + 1}"}
+            self.issues.append(issue)
+            return 201, issue, {}
+        if number is None and method == 'GET':
+            return self._list(query, f"{self.url}{match.group(0)}")
+
+        issue = self._issue(int(number))
+        if issue is None:
+            return 404, {'message': 'Not Found'}, {}
+        if match['comments'] and method == 'POST':
+            comment = {'id': sum(len(c) for c in self.comments.values()) + 1, 'body': body['body'],
+                       'created_at': _now_iso()}
+            self.comments.setdefault(issue['number'], []).append(comment)
+            issue['comments'] += 1
+            issue['updated_at'] = comment['created_at']
+            return 201, comment, {}
+        if method == 'PATCH':
+            for key in ('title', 'body', 'state', 'state_reason'):
+                if key in body:
+                    issue[key] = body[key]
+            if 'labels' in body:
+                issue['labels'] = [{'name': name} for name in body['labels']]
+            issue['updated_at'] = _now_iso()
+            return 200, issue, {}
+        if method == 'GET' and not match['comments']:
+            return 200, issue, {}
+        return 404, {'message': 'Not Found'}, {}
+
+    def _list(self, query: Dict[str, List[str]], base: str):
+        def arg(name, default=None):
+            return query.get(name, [default])[0]
+        state = arg('state', 'open')
+        labels = [l for l in (arg('labels') or '').split(',') if l]
+        since = arg('since')
+        issues = [i for i in self.issues
+                  if (state == 'all' or i['state'] == state)
+                  and all(any(l['name'] == name for l in i['labels']) for name in labels)
+                  and (since is None or i['updated_at'] >= since)]
+        if arg('sort') == 'updated':
+            issues.sort(key=lambda i: (i['updated_at'], i['number']), reverse=arg('direction', 'desc') == 'desc')
+        else:
+            issues.sort(key=lambda i: i['number'], reverse=True)
+        per_page = min(int(arg('per_page', 30)), 100)
+        page = int(arg('page', 1))
+        headers = {}
+        if page * per_page < len(issues):
+            params = {k: v[0] for k, v in query.items()}
+            params['page'] = page + 1
+            headers['Link'] = f'<{base}?{urlencode(params)}>; rel="next"'
+        return 200, issues[(page - 1) * per_page:page * per_page], headers
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    with FakeGitHubServer(port=port) as fake:
+        print(f"🧪 Fake GitHub API en {fake.url} (GITHUB_API_URL={fake.url})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+🔥 FIRESTORE ACCESS - CHRONOS SYSTEM
+Read helpers shared by the data validators:
+- Client factory: Firestore emulator (FIRESTORE_EMULATOR_HOST), service
+  account file or application default credentials
+- Server-side count() aggregation instead of downloading every document
+- Paged document streaming ordered by document id
+- Bounded thread pool to run one read per collection concurrently
+
+Every helper takes the client as a parameter, so validators can run against
+the emulator or against firestore_fake.FakeFirestoreClient.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+DEFAULT_PROJECT_ID = 'chronos-176d8'
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_MAX_WORKERS = 8
+
+
+def create_firestore_client():
+    """Firestore client for the current environment.
+
+    With FIRESTORE_EMULATOR_HOST set, connects to the emulator with anonymous
+    credentials; otherwise initializes firebase_admin from
+    FIREBASE_SERVICE_ACCOUNT_PATH or the application default credentials.
+    """
+    if os.getenv('FIRESTORE_EMULATOR_HOST'):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud import firestore as gcloud_firestore
+        print(f"🧪 Using Firestore emulator at {os.environ['FIRESTORE_EMULATOR_HOST']}")
+        return gcloud_firestore.Client(
+            project=os.getenv('FIREBASE_PROJECT_ID', DEFAULT_PROJECT_ID),
+            credentials=AnonymousCredentials()
+        )
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        try:
+            # Try to load from service account file
+            service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH',
+                                             './chronos-176d8-firebase-adminsdk.json')
+            if os.path.exists(service_account_path):
+                cred = credentials.Certificate(service_account_path)
+            else:
+                # Use default credentials
+                cred = credentials.ApplicationDefault()
+
+            firebase_admin.initialize_app(cred)
+            print("✅ Firebase Admin initialized")
+        except Exception as e:
+            print(f"⚠️  Firebase initialization warning: {e}")
+            print("Using Firestore emulator or default config")
+
+    return firestore.client()
+
+
+def count_documents(db, collection_name: str) -> int:
+    """Document count via a server-side aggregation query (one round trip)"""
+    collection = db.collection(collection_name)
+    if hasattr(collection, 'count'):
+        result = collection.count(alias='total').get()
+        # get() -> [[AggregationResult]]
+        return int(result[0][0].value)
+    # Older clients without aggregation support: stream ids only
+    return sum(1 for _ in collection.select([]).stream())
+
+
+def stream_documents(db, collection_name: str,
+                     page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Any]:
+    """Yields every document snapshot, fetched in pages ordered by id.
+
+    Each page is a separate query resumed with start_after, so no long-lived
+    stream is held open and memory is bounded by the page size.
+    """
+    base = db.collection(collection_name).order_by('__name__').limit(page_size)
+    last = None
+    while True:
+        query = base.start_after(last) if last is not None else base
+        page = list(query.stream())
+        yield from page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def read_collections(func: Callable[[str], Any], collection_names: Iterable[str],
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Tuple[Any, Any]]:
+    """Runs `func(name)` per collection on a bounded thread pool.
+
+    Returns {name: (result, error)}; exactly one of them is None.
+    """
+    names = list(dict.fromkeys(collection_names))
+    outcomes: Dict[str, Tuple[Any, Any]] = {}
+    if not names:
+        return outcomes
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as pool:
+        futures = {name: pool.submit(func, name) for name in names}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = (future.result(), None)
+            except Exception as e:
+                outcomes[name] = (None, e)
+    return outcomes
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+🧪 FIRESTORE FAKE - CHRONOS SYSTEM
+In-process stand-in for the subset of the Firestore client used by the
+validators (collection, count, select, order_by('__name__'), limit,
+start_after, stream/get). Documents live in plain dicts.
+
+    db = FakeFirestoreClient({'ventas': {'v1': {...}, 'v2': {...}}})
+    db = FakeFirestoreClient.from_csv_dir(csv_dir, {'ventas.csv': 'ventas'})
+"""
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class FakeDocumentSnapshot:
+    id: str
+    _data: Dict[str, Any]
+
+    @property
+    def exists(self) -> bool:
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+
+@dataclass
+class FakeAggregationResult:
+    alias: str
+    value: int
+
+
+class FakeQuery:
+    def __init__(self, documents: Dict[str, Dict[str, Any]], ordered: bool = False,
+                 limit: Optional[int] = None, after: Optional[str] = None):
+        self._documents = documents
+        self._ordered = ordered
+        self._limit = limit
+        self._after = after
+
+    def _copy(self, **changes) -> 'FakeQuery':
+        state = dict(ordered=self._ordered, limit=self._limit, after=self._after)
+        state.update(changes)
+        return FakeQuery(self._documents, **state)
+
+    def order_by(self, field_path: str, direction: Any = None) -> 'FakeQuery':
+        if field_path != '__name__':
+            raise NotImplementedError("FakeQuery only orders by document id")
+        return self._copy(ordered=True)
+
+    def limit(self, count: int) -> 'FakeQuery':
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot: FakeDocumentSnapshot) -> 'FakeQuery':
+        return self._copy(after=snapshot.id)
+
+    def select(self, field_paths: List[str]) -> 'FakeQuery':
+        return self._copy()
+
+    def stream(self):
+        ids = sorted(self._documents) if self._ordered or self._after else list(self._documents)
+        if self._after is not None:
+            ids = [i for i in ids if i > self._after]
+        if self._limit is not None:
+            ids = ids[:self._limit]
+        for doc_id in ids:
+            yield FakeDocumentSnapshot(doc_id, self._documents[doc_id])
+
+    def get(self) -> List[FakeDocumentSnapshot]:
+        return list(self.stream())
+
+    def count(self, alias: str = 'count') -> 'FakeAggregationQuery':
+        return FakeAggregationQuery(self, alias)
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: FakeQuery, alias: str):
+        self._query = query
+        self._alias = alias
+
+    def get(self) -> List[List[FakeAggregationResult]]:
+        total = sum(1 for _ in self._query.stream())
+        return [[FakeAggregationResult(self._alias, total)]]
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, name: str, documents: Dict[str, Dict[str, Any]]):
+        super().__init__(documents)
+        self.id = name
+
+
+class FakeFirestoreClient:
+    """Firestore client backed by {collection: {doc_id: data}}"""
+
+    def __init__(self, collections: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        self._collections = collections if collections is not None else {}
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(name, self._collections.setdefault(name, {}))
+
+    @classmethod
+    def from_csv_dir(cls, csv_dir: Path, mapping: Dict[str, str],
+                     fields: Optional[Dict[str, Dict[str, str]]] = None,
+                     transform: Optional[Dict[str, Callable[[Dict[str, str]], Dict[str, Any]]]] = None
+                     ) -> 'FakeFirestoreClient':
+        """Seeds one collection per CSV ({file: collection}); ids are row numbers.
+
+        `fields` renames columns per file ({file: {column: field}}); a column
+        renamed to '__name__' becomes the document id instead of a field.
+        `transform` rewrites each row first ({file: row -> row}), e.g. the
+        value conversions of the real migration.
+        """
+        collections = {}
+        for csv_file, collection_name in mapping.items():
+            path = Path(csv_dir) / csv_file
+            if not path.exists():
+                continue
+            renames = (fields or {}).get(csv_file, {})
+            rewrite = (transform or {}).get(csv_file)
+            documents = {}
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                for i, row in enumerate(csv.DictReader(f)):
+                    if rewrite is not None:
+                        row = rewrite(row)
+                    data = {renames.get(k, k): v for k, v in row.items()}
+                    doc_id = data.pop('__name__', None) or f"{i:06d}"
+                    documents[doc_id] = data
+            collections[collection_name] = documents
+        return cls(collections)
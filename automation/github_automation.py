@@ -2,14 +2,25 @@
 """
 🤖 GITHUB ISSUES & PRS AUTOMATION - CHRONOS SYSTEM
 Automatically creates issues and pull requests for detected problems
+
+Issues of a run are filed as one batch: with httpx, concurrently through a
+pooled AsyncGitHubClient (rate-limit aware, writes spaced out); otherwise
+sequentially over one keep-alive requests.Session with the same backoff.
+GITHUB_API_URL points it elsewhere (e.g. fake_github_server.py).
+Findings already tracked by an issue (see issue_index) update it instead of
+filing a duplicate on every run; closed issues are only reopened for
+problems this run detected again (validation and UI reports), never for the
+static improvement checklist.
 """
 
 import os
 import sys
 import json
+import time
+import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 try:
     import requests
@@ -18,6 +29,12 @@ except ImportError:
     os.system("pip install requests")
     import requests
 
+from github_client import (API_URL, HTTPX_AVAILABLE, AsyncGitHubClient, is_rate_limited,
+                           parse_next_link, retry_delay)
+from issue_index import IssueIndex, issue_fingerprint, mark_body
+
+REOPEN_COMMENT = "🔁 This problem was detected again by the Automation System, reopening."
+
 class GitHubAutomation:
     """Automates GitHub Issues and PRs creation"""
     
@@ -26,55 +43,198 @@ class GitHubAutomation:
         self.repo_owner = os.getenv('GITHUB_REPOSITORY_OWNER', 'zoro488')
         self.repo_name = os.getenv('GITHUB_REPOSITORY_NAME', 'v0-crypto-dashboard-design')
         
-        self.api_base = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
+        self.api_url = API_URL.rstrip('/')
+        self.api_base = f"{self.api_url}/repos/{self.repo_owner}/{self.repo_name}"
         self.headers = {
             'Authorization': f'token {self.github_token}' if self.github_token else '',
             'Accept': 'application/vnd.github.v3+json'
         }
+        self.etag_cache = Path(__file__).parent / 'reports' / '.github_etags.json'
+        self.index_path = Path(__file__).parent / 'reports' / 'issue_index.sqlite3'
+        self.max_retries = 5
         
         self.created_issues = []
         self.created_prs = []
+        self._session = None
+        self._next_link = None
     
     def create_issue(self, title: str, body: str, labels: List[str] = None, assignees: List[str] = None) -> Dict[str, Any]:
         """Create a GitHub issue"""
+        return self.create_issues([{'title': title, 'body': body, 'labels': labels, 'assignees': assignees}])[0]
+    
+    def create_issues(self, specs: List[Dict[str, Any]],
+                      reopen_closed: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """File a batch of findings (create_issue kwargs, optionally a 'fingerprint').
+        
+        A finding already tracked by an issue updates it instead of filing a
+        duplicate; with `reopen_closed` (problems detected again by this run) a
+        closed issue is reopened, otherwise it is left alone. Each result
+        carries the 'action' taken, None if it failed.
+        """
+        if not specs:
+            return []
         
         if not self.github_token:
             print("⚠️  No GITHUB_TOKEN set, simulating issue creation")
-            issue = {
-                'number': len(self.created_issues) + 1,
-                'title': title,
-                'body': body,
-                'labels': labels or [],
-                'state': 'open',
-                'html_url': f'https://github.com/{self.repo_owner}/{self.repo_name}/issues/simulated'
-            }
-            self.created_issues.append(issue)
-            return issue
+            issues = []
+            for spec in specs:
+                issue = {
+                    'number': len(self.created_issues) + 1,
+                    'title': spec['title'],
+                    'body': spec['body'],
+                    'labels': spec.get('labels') or [],
+                    'state': 'open',
+                    'html_url': f'https://github.com/{self.repo_owner}/{self.repo_name}/issues/simulated',
+                    'action': 'create'
+                }
+                self.created_issues.append(issue)
+                issues.append(issue)
+            return issues
         
-        url = f"{self.api_base}/issues"
+        # One issue per fingerprint, even when a report repeats a finding
+        findings = {}
+        for spec in specs:
+            fingerprint = spec.get('fingerprint') or issue_fingerprint(spec['title'])
+            findings.setdefault(fingerprint, {**spec, 'fingerprint': fingerprint,
+                                              'body': mark_body(spec['body'], fingerprint),
+                                              'reopen_closed': reopen_closed})
+        unique = list(findings.values())
         
-        data = {
-            'title': title,
-            'body': body,
-            'labels': labels or [],
-            'assignees': assignees or []
-        }
+        with IssueIndex(self.index_path) as index:
+            if HTTPX_AVAILABLE:
+                filed = asyncio.run(self._file_issues_async(index, unique))
+            else:
+                filed = self._file_issues_blocking(index, unique)
+        results = dict(zip(findings, filed))
         
-        try:
-            response = requests.post(url, headers=self.headers, json=data)
-            
-            if response.status_code == 201:
-                issue = response.json()
+        for spec, issue in zip(unique, filed):
+            if not issue:
+                print(f"❌ Failed to file issue: {spec['title']}")
+            elif issue['action'] == 'create':
                 self.created_issues.append(issue)
-                print(f"✅ Created issue #{issue['number']}: {title}")
-                return issue
+                print(f"✅ Created issue #{issue['number']}: {spec['title']}")
+            elif issue['action'] == 'update':
+                print(f"🔄 Updated issue #{issue['number']}: {spec['title']}")
+            elif issue['action'] == 'reopen':
+                print(f"🔁 Reopened issue #{issue['number']}: {spec['title']}")
+        return [results[spec.get('fingerprint') or issue_fingerprint(spec['title'])] for spec in specs]
+    
+    def _skipped(self, spec: Dict[str, Any], number: int) -> Dict[str, Any]:
+        return {
+            'number': number,
+            'title': spec['title'],
+            'labels': spec.get('labels') or [],
+            'html_url': f'https://github.com/{self.repo_owner}/{self.repo_name}/issues/{number}',
+            'action': 'skip'
+        }
+    
+    # ------------------------------------------------------------------ httpx
+    
+    async def _file_issues_async(self, index: IssueIndex, specs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        async with AsyncGitHubClient(self.github_token, self.repo_owner, self.repo_name,
+                                     api_url=self.api_url, max_retries=self.max_retries,
+                                     cache_path=self.etag_cache) as client:
+            try:
+                index.absorb([issue async for issue in client.paginate(f"{client.repo_path}/issues",
+                                                                       index.sync_params())])
+            except Exception as e:
+                print(f"⚠️  Issue index sync failed, using the local copy: {e}")
+            
+            results = await asyncio.gather(*(self._file_async(client, index, spec) for spec in specs),
+                                           return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    async def _file_async(self, client: AsyncGitHubClient, index: IssueIndex, spec: Dict[str, Any]) -> Dict[str, Any]:
+        action, number = index.plan(spec['fingerprint'], spec['body'], spec['reopen_closed'])
+        if action == 'skip':
+            return self._skipped(spec, number)
+        try:
+            if action == 'create':
+                issue = await client.create_issue(spec['title'], spec['body'], spec.get('labels'),
+                                                  spec.get('assignees'))
             else:
-                print(f"❌ Failed to create issue: {response.status_code}")
+                fields = {'title': spec['title'], 'body': spec['body']}
+                if action == 'reopen':
+                    fields['state'] = 'open'
+                issue = await client.update_issue(number, **fields)
+                if action == 'reopen':
+                    await client.comment_issue(number, REOPEN_COMMENT)
+        except Exception as e:
+            print(f"❌ Error filing issue: {e}")
+            raise
+        index.record(spec['fingerprint'], issue)
+        return {**issue, 'action': action}
+    
+    # ------------------------------------------------------------------ requests fallback
+    
+    def _file_issues_blocking(self, index: IssueIndex, specs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Blocking fallback without httpx: one pooled session, rate-limit backoff"""
+        url, params = f"{self.api_base}/issues", {'per_page': 100, **index.sync_params()}
+        while url:
+            data = self._api_call('GET', url, 200, params=params)
+            if data is None:
+                print("⚠️  Issue index sync failed, using the local copy")
+                break
+            index.absorb(data)
+            url, params = self._next_link, None
+        
+        results = []
+        for spec in specs:
+            action, number = index.plan(spec['fingerprint'], spec['body'], spec['reopen_closed'])
+            if action == 'skip':
+                results.append(self._skipped(spec, number))
+                continue
+            if action == 'create':
+                issue = self._api_call('POST', f"{self.api_base}/issues", 201, json={
+                    'title': spec['title'],
+                    'body': spec['body'],
+                    'labels': spec.get('labels') or [],
+                    'assignees': spec.get('assignees') or []
+                })
+            else:
+                fields = {'title': spec['title'], 'body': spec['body']}
+                if action == 'reopen':
+                    fields['state'] = 'open'
+                issue = self._api_call('PATCH', f"{self.api_base}/issues/{number}", 200, json=fields)
+                if issue and action == 'reopen':
+                    self._api_call('POST', f"{self.api_base}/issues/{number}/comments", 201,
+                                   json={'body': REOPEN_COMMENT})
+            if issue:
+                index.record(spec['fingerprint'], issue)
+                issue = {**issue, 'action': action}
+            results.append(issue)
+        return results
+    
+    def _api_call(self, method: str, url: str, expected: int, **kwargs) -> Any:
+        """JSON of the response if it has the expected status, else None; retries rate limits"""
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.request(method, url, timeout=30, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries:
+                    print(f"❌ Error calling GitHub: {e}")
+                    return None
+                time.sleep(retry_delay(attempt, {}))
+                continue
+            except Exception as e:
+                print(f"❌ Error calling GitHub: {e}")
+                return None
+            
+            if response.status_code == expected:
+                self._next_link = parse_next_link(response.headers.get('link'))
+                return response.json()
+            if not is_rate_limited(response.status_code, response.headers, response.text) or attempt == self.max_retries:
+                print(f"❌ {method} {url} failed: {response.status_code}")
                 print(response.text)
                 return None
-        except Exception as e:
-            print(f"❌ Error creating issue: {e}")
-            return None
+            delay = retry_delay(attempt, response.headers)
+            print(f"⏳ Rate limited ({response.status_code}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return None
     
     def create_issues_from_validation_report(self, report_path: str) -> List[Dict[str, Any]]:
         """Create issues from data validation report"""
@@ -86,7 +246,7 @@ class GitHubAutomation:
         with open(report_path) as f:
             report = json.load(f)
         
-        issues_created = []
+        specs = []
         
         # Create issues for CSV validation errors
         if 'validations' in report and 'csv' in report['validations']:
@@ -124,14 +284,11 @@ class GitHubAutomation:
 **Report:** `{report_path}`
 """
                     
-                    issue = self.create_issue(
-                        title=title,
-                        body=body,
-                        labels=['bug', 'data-validation', 'automated']
-                    )
-                    
-                    if issue:
-                        issues_created.append(issue)
+                    specs.append({
+                        'title': title,
+                        'body': body,
+                        'labels': ['bug', 'data-validation', 'automated']
+                    })
         
         # Create issues for Firestore sync problems
         if 'validations' in report and 'comparisons' in report['validations']:
@@ -163,16 +320,13 @@ class GitHubAutomation:
 **Report:** `{report_path}`
 """
                     
-                    issue = self.create_issue(
-                        title=title,
-                        body=body,
-                        labels=['sync-issue', 'data', 'automated']
-                    )
-                    
-                    if issue:
-                        issues_created.append(issue)
+                    specs.append({
+                        'title': title,
+                        'body': body,
+                        'labels': ['sync-issue', 'data', 'automated']
+                    })
         
-        return issues_created
+        return [issue for issue in self.create_issues(specs, reopen_closed=True) if issue]
     
     def create_issues_from_ui_report(self, report_path: str) -> List[Dict[str, Any]]:
         """Create issues from UI test report"""
@@ -184,7 +338,7 @@ class GitHubAutomation:
         with open(report_path) as f:
             report = json.load(f)
         
-        issues_created = []
+        specs = []
         
         # Create issues for failed tests
         if 'tests' in report:
@@ -203,11 +357,15 @@ class GitHubAutomation:
                     for issue in test_result['issues']:
                         body += f"- {issue}\n"
                     
-                    # Add metrics if available
+                    # Add metrics if available (measured values: not part of the dedup hash)
                     if test_result.get('metrics'):
                         body += "\n### Metrics\n\n"
                         for key, value in test_result['metrics'].items():
                             body += f"- **{key}:** {value}\n"
+                    if test_result.get('performance'):
+                        body += "\n### Performance\n\n"
+                        for key, value in test_result['performance'].items():
+                            body += f"- **{key}:** {value}\n"
                     
                     # Add fixes if available
                     if 'fixes' in test_result and test_result['fixes']:
@@ -230,22 +388,17 @@ class GitHubAutomation:
 **Report:** `{report_path}`
 """
                     
-                    issue = self.create_issue(
-                        title=title,
-                        body=body,
-                        labels=['ui', 'bug', 'automated']
-                    )
-                    
-                    if issue:
-                        issues_created.append(issue)
+                    specs.append({
+                        'title': title,
+                        'body': body,
+                        'labels': ['ui', 'bug', 'automated']
+                    })
         
-        return issues_created
+        return [issue for issue in self.create_issues(specs, reopen_closed=True) if issue]
     
     def create_improvement_issues(self) -> List[Dict[str, Any]]:
         """Create issues for general improvements based on analysis"""
         
-        issues_created = []
-        
         improvements = [
             {
                 'title': '⚡ Optimize React Query cache configuration',
@@ -386,17 +539,7 @@ Improve mobile experience across all viewports
             }
         ]
         
-        for improvement in improvements:
-            issue = self.create_issue(
-                title=improvement['title'],
-                body=improvement['body'],
-                labels=improvement['labels']
-            )
-            
-            if issue:
-                issues_created.append(issue)
-        
-        return issues_created
+        return [issue for issue in self.create_issues(improvements) if issue]
     
     def run_automation(self) -> Dict[str, Any]:
         """Run all GitHub automation tasks"""
@@ -416,7 +559,7 @@ Improve mobile experience across all viewports
             latest_data_report = data_reports[-1]
             issues = self.create_issues_from_validation_report(str(latest_data_report))
             all_issues.extend(issues)
-            print(f"   Created {len(issues)} issues from data validation")
+            print(f"   Filed {len(issues)} issues from data validation")
         
         # UI test reports
         print("🎨 Processing UI test reports...")
@@ -427,19 +570,24 @@ Improve mobile experience across all viewports
                 latest_ui_report = ui_reports[-1]
                 issues = self.create_issues_from_ui_report(str(latest_ui_report))
                 all_issues.extend(issues)
-                print(f"   Created {len(issues)} issues from UI tests")
+                print(f"   Filed {len(issues)} issues from UI tests")
         
         # Create improvement issues
         print("💡 Creating improvement issues...")
         improvement_issues = self.create_improvement_issues()
         all_issues.extend(improvement_issues)
-        print(f"   Created {len(improvement_issues)} improvement issues")
+        print(f"   Filed {len(improvement_issues)} improvement issues")
         
         # Generate summary
         print("\n" + "="*80)
         print("📊 AUTOMATION SUMMARY")
         print("="*80)
-        print(f"✅ Total issues created: {len(all_issues)}")
+        actions = {}
+        for issue in all_issues:
+            actions[issue['action']] = actions.get(issue['action'], 0) + 1
+        print(f"✅ Total issues created: {actions.get('create', 0)}")
+        print(f"🔄 Existing issues updated: {actions.get('update', 0)}, "
+              f"reopened: {actions.get('reopen', 0)}, unchanged: {actions.get('skip', 0)}")
         print(f"📋 Issues by type:")
         
         labels_count = {}
@@ -459,7 +607,8 @@ Improve mobile experience across all viewports
         print("="*80 + "\n")
         
         return {
-            'issues_created': len(all_issues),
+            'issues_created': actions.get('create', 0),
+            'issues_updated': actions.get('update', 0) + actions.get('reopen', 0),
             'issues': all_issues
         }
 
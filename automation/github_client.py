@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+🐙 GITHUB CLIENT - CHRONOS SYSTEM
+Async GitHub REST client for the automation scripts.
+
+- One httpx.AsyncClient per run: a keep-alive connection pool with at most
+  `concurrency` requests in flight.
+- Content-creating requests (POST/PATCH/PUT/DELETE) go out one at a time,
+  at least `write_interval` seconds apart, as GitHub asks in order to stay
+  clear of its secondary rate limits.
+- Primary limit: X-RateLimit-Remaining/Reset are read from every response;
+  once the budget is spent, requests wait for the reset instead of failing.
+- Rate-limited answers (429, or 403 with Retry-After / remaining 0 / a
+  "rate limit" message) are retried after Retry-After, the reset time or an
+  exponential backoff with jitter (retry_delay, also used by the blocking
+  fallback in github_automation). GETs also retry 5xx and transport errors.
+- GETs are conditional: the ETag of every URL is cached (and persisted in
+  `cache_path` between runs); a 304 is answered from the cache and does
+  not count against the rate limit.
+
+    async with AsyncGitHubClient(token, 'owner', 'repo') as gh:
+        issues = await gh.create_issues([{'title': ..., 'body': ...}, ...])
+        async for issue in gh.paginate(gh.repo_path + '/issues', {'state': 'open'}):
+            ...
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
+WRITE_METHODS = {'POST', 'PATCH', 'PUT', 'DELETE'}
+MAX_CACHED_URLS = 256
+
+
+class GitHubError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"GitHub API {status}: {message[:200]}")
+        self.status = status
+
+
+def is_rate_limited(status: int, headers: Mapping[str, str], text: str = '') -> bool:
+    """429, or a 403 that is a primary/secondary rate limit (not a permission error)"""
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    return ('retry-after' in headers or headers.get('x-ratelimit-remaining') == '0'
+            or 'rate limit' in text.lower())
+
+
+def retry_delay(attempt: int, headers: Mapping[str, str], base: float = 1.0, cap: float = 60.0) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)"""
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    reset = headers.get('x-ratelimit-reset')
+    if headers.get('x-ratelimit-remaining') == '0' and reset:
+        return max(0.0, float(reset) - time.time()) + 1.0
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def parse_next_link(link: Optional[str]) -> Optional[str]:
+    """URL of rel="next" in a Link header"""
+    for part in (link or '').split(','):
+        url, _, rel = part.partition(';')
+        if 'rel="next"' in rel:
+            return url.strip().strip('<>')
+    return None
+
+
+class AsyncGitHubClient:
+    """Pooled, rate-limit aware GitHub client for one repository"""
+
+    def __init__(self, token: Optional[str], owner: str, repo: str, api_url: str = API_URL,
+                 concurrency: int = 8, write_interval: float = 1.0, max_retries: int = 5,
+                 backoff_base: float = 1.0, cache_path: Optional[Path] = None, timeout: float = 30.0,
+                 transport: Any = None):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx no instalado (pip install httpx)")
+        headers = {'Accept': 'application/vnd.github+json',
+                   'X-GitHub-Api-Version': '2022-11-28',
+                   'User-Agent': 'chronos-automation'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        self.repo_path = f"/repos/{owner}/{repo}"
+        self.write_interval = write_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._client = httpx.AsyncClient(
+            base_url=api_url.rstrip('/'), headers=headers, timeout=timeout, transport=transport,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency))
+        self._slots = asyncio.Semaphore(concurrency)
+        self._write_lock = asyncio.Lock()
+        self._last_write = 0.0
+        self._reset_at = 0.0
+        self.rate_remaining: Optional[int] = None
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0}
+        # url -> (etag, json body, next link)
+        self._etags: Dict[str, Tuple[str, Any, Optional[str]]] = OrderedDict()
+        if self.cache_path and self.cache_path.exists():
+            try:
+                self._etags.update((k, tuple(v)) for k, v in json.loads(self.cache_path.read_text()).items())
+            except (OSError, ValueError):
+                pass
+
+    async def aclose(self):
+        await self._client.aclose()
+        if self.cache_path:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self._etags))
+            tmp.replace(self.cache_path)
+
+    async def __aenter__(self) -> 'AsyncGitHubClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    # ------------------------------------------------------------------ transport
+
+    def _track_rate_limit(self, headers: Mapping[str, str]):
+        remaining = headers.get('x-ratelimit-remaining')
+        if remaining is not None:
+            self.rate_remaining = int(remaining)
+            reset = headers.get('x-ratelimit-reset')
+            if remaining == '0' and reset:
+                self._reset_at = float(reset)
+
+    async def _wait_for_reset(self):
+        wait = self._reset_at - time.time()
+        if wait > 0:
+            logger.warning(f"⏳ Límite de la API agotado: esperando {wait:.0f}s al reset")
+            await asyncio.sleep(wait + 1)
+        self._reset_at = 0.0
+
+    async def _send(self, method: str, url: str, **kwargs) -> 'httpx.Response':
+        async with self._slots:
+            self.stats['requests'] += 1
+            return await self._client.request(method, url, **kwargs)
+
+    async def request(self, method: str, url: str, *, params: Optional[Dict[str, Any]] = None,
+                      json_body: Any = None, headers: Optional[Dict[str, str]] = None) -> 'httpx.Response':
+        """One request with rate-limit waits and retries; returns the last response"""
+        method = method.upper()
+        if method not in WRITE_METHODS:
+            return await self._request(method, url, params, None, headers, write=False)
+        # Writes hold the lock through their retries: the queue backs off as a whole
+        # and issues are still filed in submission order
+        async with self._write_lock:
+            return await self._request(method, url, params, json_body, headers, write=True)
+
+    async def _request(self, method: str, url: str, params: Optional[Dict[str, Any]], json_body: Any,
+                       headers: Optional[Dict[str, str]], write: bool) -> 'httpx.Response':
+        attempt = 0
+        while True:
+            await self._wait_for_reset()
+            try:
+                if write:
+                    wait = self._last_write + self.write_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    try:
+                        response = await self._send(method, url, params=params, json=json_body, headers=headers)
+                    finally:
+                        self._last_write = time.monotonic()
+                else:
+                    response = await self._send(method, url, params=params, headers=headers)
+            except httpx.TransportError as exc:
+                # A write that may have reached GitHub is not repeated (duplicate issues)
+                if (write and not isinstance(exc, httpx.ConnectError)) or attempt == self.max_retries:
+                    raise
+                delay = retry_delay(attempt, {}, base=self.backoff_base)
+            else:
+                self._track_rate_limit(response.headers)
+                retryable = (is_rate_limited(response.status_code, response.headers, response.text)
+                             or (not write and response.status_code >= 500))
+                if not retryable or attempt == self.max_retries:
+                    return response
+                delay = retry_delay(attempt, response.headers, base=self.backoff_base)
+            self.stats['retries'] += 1
+            logger.warning(f"🔁 {method} {url}: reintento {attempt + 1} en {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    # ------------------------------------------------------------------ reads
+
+    async def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str]]:
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        cached = self._etags.get(key)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        response = await self.request('GET', url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self.stats['not_modified'] += 1
+            self._etags.move_to_end(key)
+            return cached[1], cached[2]
+        if response.status_code != 200:
+            raise GitHubError(response.status_code, response.text)
+        data = response.json()
+        next_link = parse_next_link(response.headers.get('link'))
+        etag = response.headers.get('etag')
+        if etag:
+            self._etags[key] = (etag, data, next_link)
+            self._etags.move_to_end(key)
+            while len(self._etags) > MAX_CACHED_URLS:
+                self._etags.popitem(last=False)
+        return data, next_link
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET with ETag revalidation"""
+        return (await self._get_page(url, params))[0]
+
+    async def paginate(self, url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """Items of every page, following Link rel="next" (each page revalidated by ETag)"""
+        params = {'per_page': 100, **(params or {})}
+        next_url: Optional[str] = url
+        while next_url:
+            data, next_url = await self._get_page(next_url, params)
+            # The next link already carries the query string
+            params = None
+            for item in data:
+                yield item
+
+    # ------------------------------------------------------------------ issues
+
+    async def create_issue(self, title: str, body: str, labels: Optional[List[str]] = None,
+                           assignees: Optional[List[str]] = None) -> Dict[str, Any]:
+        response = await self.request('POST', f"{self.repo_path}/issues", json_body={
+            'title': title, 'body': body, 'labels': labels or [], 'assignees': assignees or []})
+        if response.status_code != 201:
+            raise GitHubError(response.status_code, response.text)
+        return response.json()
+
+    async def update_issue(self, number: int, **fields) -> Dict[str, Any]:
+        """PATCH title/body/state/labels of an issue"""
+        response = await self.request('PATCH', f"{self.repo_path}/issues/{number}", json_body=fields)
+        if response.status_code != 200:
+            raise GitHubError(response.status_code, response.text)
+        return response.json()
+
+    async def comment_issue(self, number: int, body: str) -> Dict[str, Any]:
+        response = await self.request('POST', f"{self.repo_path}/issues/{number}/comments",
+                                      json_body={'body': body})
+        if response.status_code != 201:
+            raise GitHubError(response.status_code, response.text)
+        return response.json()
+
+    async def create_issues(self, specs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Files every spec (create_issue kwargs); None where GitHub refused one"""
+        results = await asyncio.gather(*(self.create_issue(**spec) for spec in specs),
+                                       return_exceptions=True)
+        issues = []
+        for spec, result in zip(specs, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ No se pudo crear el issue '{spec.get('title')}': {result}")
+                issues.append(None)
+            else:
+                issues.append(result)
+        return issues
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+🎯 IMPACT ANALYSIS - CHRONOS SYSTEM
+Maps a set of changed files to the suites, and tests, that can observe them.
+
+Dependency sources:
+- Python import graph of evaluation/, automation/ and scripts/, built with
+  ast (nothing is imported). A suite lists its Python entries: a file, or
+  "file::function" for one function of it. A change reaches the entry when
+  the entry imports the changed file, directly or transitively. Inside a
+  file, each top-level function/class only depends on the imports it
+  references, so test_*.py entries select individual tests
+  ("evaluation/test_evaluators.py::test_business_logic").
+- CSV files: csv/<name>.csv selects the suites that read csv/ and, for
+  suites validating file by file, only the test "csv-<name>".
+- Coverage, when a .coverage file recorded with test contexts exists
+  (pytest --cov --cov-context=test): tests that executed a changed file are
+  added to the static selection.
+- Anything else matches the suites' path prefixes (frontend sources,
+  configs); a Python file in the graph only when a suite lists it exactly.
+  For runners that find related tests themselves (jest
+  --findRelatedTests), the changed sources are passed along instead.
+
+Safety net: lockfiles/requirements, every `full_run_every` selections or
+`full_run_interval` seconds trigger a full run.
+
+    analyzer = ImpactAnalyzer(workspace, SUITE_SPECS)
+    selection = analyzer.select(git_changed_files(workspace, 'HEAD~1'))
+    selection.suites, selection.tests_for('python')
+"""
+
+import ast
+import fnmatch
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from coverage import CoverageData
+    COVERAGE_AVAILABLE = True
+except ImportError:
+    CoverageData = None
+    COVERAGE_AVAILABLE = False
+
+# Directories the suites put on sys.path, in lookup order
+PYTHON_ROOTS = ('evaluation', 'automation', 'scripts')
+IGNORED_DIRS = {'__pycache__', '.pytest_cache', 'node_modules', 'reports', 'logs', 'fixes'}
+# Dependency manifests: any change means a full run
+FULL_RUN_FILES = ('pnpm-lock.yaml', 'package.json', 'evaluation/requirements.txt',
+                  'automation/requirements.txt')
+CSV_PREFIX = 'csv/'
+
+
+@dataclass(frozen=True)
+class SuiteSpec:
+    """What a suite reads"""
+    paths: Tuple[str, ...] = ()    # path prefixes of non-Python inputs (whole suite)
+    entries: Tuple[str, ...] = ()  # Python files it runs ("file", "file::function", globs)
+    csv_tests: bool = False        # one test per CSV file: "csv-<stem>"
+    related: Tuple[str, ...] = ()  # prefixes whose changed files go to the runner as-is
+
+
+@dataclass
+class Selection:
+    """Suites to run; suites listed in `tests`/`related` only need those"""
+    suites: Set[str] = field(default_factory=set)
+    tests: Dict[str, Set[str]] = field(default_factory=dict)
+    related: Dict[str, Set[str]] = field(default_factory=dict)
+    # Changed Python files plus everything importing them
+    modules: Set[str] = field(default_factory=set)
+    full_run: bool = False
+    reason: str = ''
+
+    def tests_for(self, suite: str) -> Optional[List[str]]:
+        """Selected tests, or None when the whole suite must run"""
+        return sorted(self.tests[suite]) if suite in self.tests else None
+
+    def related_for(self, suite: str) -> Optional[List[str]]:
+        return sorted(self.related[suite]) if suite in self.related else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'suites': sorted(self.suites),
+            'tests': {s: sorted(t) for s, t in self.tests.items()},
+            'related': {s: sorted(r) for s, r in self.related.items()},
+            'full_run': self.full_run,
+            'reason': self.reason,
+        }
+
+
+@dataclass
+class _Deps:
+    """Files a piece of code depends on"""
+    files: Set[str] = field(default_factory=set)
+    # Packages only executed on the way (`evaluators` in `evaluators.business_logic`):
+    # a change to them matters, a change to what they import does not
+    parents: Set[str] = field(default_factory=set)
+
+    def update(self, other: '_Deps'):
+        self.files |= other.files
+        self.parents |= other.parents
+
+    def hit(self, changed: Set[str], affected: Set[str]) -> bool:
+        return bool(self.files & affected or self.parents & changed)
+
+
+@dataclass
+class _Module:
+    """Parsed dependencies of one Python file"""
+    mtime_ns: int
+    imports: _Deps               # everything imported anywhere in the file
+    units: Dict[str, _Deps]      # top-level def/class -> what it uses
+    shared: _Deps                # what every unit depends on (module-level code)
+    tests: List[str] = field(default_factory=list)  # units pytest collects
+
+
+def git_changed_files(workspace: Path, base: str = 'HEAD') -> Set[str]:
+    """Files changed between `base` and the working tree, plus untracked ones"""
+    changed = set()
+    for cmd in (['git', 'diff', '--name-only', '--relative', base],
+                ['git', 'ls-files', '--others', '--exclude-standard']):
+        result = subprocess.run(cmd, cwd=str(workspace), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd)}: {result.stderr.strip()}")
+        changed.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+    return changed
+
+
+class ImportGraph:
+    """Workspace-relative import graph of the Python roots"""
+
+    def __init__(self, workspace: Path, roots: Sequence[str] = PYTHON_ROOTS):
+        self.workspace = Path(workspace).resolve()
+        self.roots = [r for r in roots if (self.workspace / r).is_dir()]
+        self.modules: Dict[str, _Module] = {}
+        self._names: Dict[str, str] = {}  # dotted module name -> file
+        self._importers: Dict[str, Set[str]] = {}
+        self._parent_importers: Dict[str, Set[str]] = {}
+
+    def refresh(self):
+        """Re-parses files whose mtime changed; drops deleted ones"""
+        files = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(self.workspace / root):
+                dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+                for name in sorted(filenames):
+                    if name.endswith('.py'):
+                        path = Path(dirpath, name)
+                        files[path.relative_to(self.workspace).as_posix()] = path
+
+        names = {}
+        for rel in files:
+            names.setdefault(self._module_name(rel), rel)  # first root wins, as on sys.path
+        renamed = names != self._names
+        self._names = names
+
+        for rel in list(self.modules):
+            if rel not in files:
+                del self.modules[rel]
+        for rel, path in files.items():
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            cached = self.modules.get(rel)
+            if renamed or cached is None or cached.mtime_ns != mtime:
+                self.modules[rel] = self._parse(rel, path, mtime)
+
+        self._importers, self._parent_importers = {}, {}
+        for rel, module in self.modules.items():
+            for target in module.imports.files:
+                self._importers.setdefault(target, set()).add(rel)
+            for target in module.imports.parents:
+                self._parent_importers.setdefault(target, set()).add(rel)
+
+    def _module_name(self, rel: str) -> str:
+        root, _, inner = rel.partition('/')
+        parts = inner[:-3].split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return '.'.join(parts) or root
+
+    def _resolve(self, name: str) -> _Deps:
+        """The module `name` plus the packages executed to reach it"""
+        deps = _Deps()
+        parts = name.split('.')
+        for i in range(1, len(parts) + 1):
+            rel = self._names.get('.'.join(parts[:i]))
+            if rel:
+                (deps.files if i == len(parts) else deps.parents).add(rel)
+        return deps
+
+    def _import_targets(self, node, package: List[str]) -> Dict[str, _Deps]:
+        """{bound name: dependencies} for one import statement"""
+        bound: Dict[str, _Deps] = {}
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                key = alias.asname or alias.name.split('.')[0]
+                bound.setdefault(key, _Deps()).update(self._resolve(alias.name))
+            return bound
+
+        if node.level:
+            base = package[:len(package) - (node.level - 1)] if node.level > 1 else package
+            module = '.'.join(base + ([node.module] if node.module else []))
+        else:
+            module = node.module or ''
+        for alias in node.names:
+            key = alias.asname or alias.name
+            submodule = f"{module}.{alias.name}" if module else alias.name
+            if submodule in self._names:
+                deps = self._resolve(submodule)
+            else:
+                deps = self._resolve(module) if module else _Deps()
+            bound.setdefault(key, _Deps()).update(deps)
+        return bound
+
+    def _parse(self, rel: str, path: Path, mtime: int) -> _Module:
+        try:
+            tree = ast.parse(path.read_text(encoding='utf-8'), filename=rel)
+        except (SyntaxError, UnicodeDecodeError, OSError):
+            # Unparseable: keep the file itself in the graph, without edges
+            return _Module(mtime, _Deps(), {}, _Deps())
+
+        name = self._module_name(rel)
+        package = name.split('.') if rel.endswith('__init__.py') else name.split('.')[:-1]
+
+        def collect(root: ast.AST, bindings: Optional[Dict[str, _Deps]] = None) -> Tuple[_Deps, Set[str]]:
+            deps, refs = _Deps(), set()
+            for node in ast.walk(root):
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    for key, targets in self._import_targets(node, package).items():
+                        deps.update(targets)
+                        if bindings is not None:
+                            bindings.setdefault(key, _Deps()).update(targets)
+                elif isinstance(node, ast.Name):
+                    refs.add(node.id)
+            return deps, refs
+
+        imports, _ = collect(tree)
+        imports.files.discard(rel)
+        imports.parents.discard(rel)
+
+        # Top-level bindings created by imports (also inside if/try blocks)
+        bindings: Dict[str, _Deps] = {}
+        defs: Dict[str, ast.AST] = {}
+        body_refs: Set[str] = set()
+        tests: List[str] = []
+        for stmt in tree.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                defs[stmt.name] = stmt
+                if isinstance(stmt, ast.ClassDef):
+                    if stmt.name.startswith('Test') and any(
+                            isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and n.name.startswith('test')
+                            for n in stmt.body):
+                        tests.append(stmt.name)
+                elif stmt.name.startswith('test'):
+                    tests.append(stmt.name)
+            else:
+                body_refs |= collect(stmt, bindings)[1]
+
+        direct = {unit: collect(node) for unit, node in defs.items()}
+        units: Dict[str, _Deps] = {}
+        for unit in defs:
+            # Follow references to other top-level defs of the same file
+            deps, seen, stack = _Deps(), set(), [unit]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                own, refs = direct[current]
+                deps.update(own)
+                for ref in refs:
+                    if ref in bindings:
+                        deps.update(bindings[ref])
+                    if ref in defs:
+                        stack.append(ref)
+            units[unit] = deps
+
+        # Imports used by module-level code, star imports, or imports no
+        # unit references affect every unit
+        used = set(body_refs)
+        for _, refs in direct.values():
+            used |= refs
+        shared = _Deps()
+        for key, deps in bindings.items():
+            if key == '*' or key in body_refs or key not in used:
+                shared.update(deps)
+        return _Module(mtime, imports, units, shared, tests)
+
+    def dependents(self, changed: Iterable[str]) -> Set[str]:
+        """Changed files plus every file importing them, transitively"""
+        changed = [c for c in changed if c.endswith('.py')]
+        stack = list(changed)
+        for rel in changed:
+            stack.extend(self._parent_importers.get(rel, ()))
+        result = set()
+        while stack:
+            current = stack.pop()
+            if current in result:
+                continue
+            result.add(current)
+            stack.extend(self._importers.get(current, ()))
+        return result
+
+    def affected_units(self, rel: str, changed: Set[str], affected: Set[str]) -> Optional[Set[str]]:
+        """Top-level defs of `rel` reached by a change; None when all of them"""
+        module = self.modules.get(rel)
+        if module is None:
+            return None
+        if rel in changed or module.shared.hit(changed, affected):
+            return None
+        return {unit for unit, deps in module.units.items() if deps.hit(changed, affected)}
+
+    def expand(self, pattern: str) -> List[str]:
+        return sorted(rel for rel in self.modules if fnmatch.fnmatch(rel, pattern))
+
+
+class ImpactAnalyzer:
+    """Selects the suites/tests for a batch of changed paths"""
+
+    def __init__(self, workspace: Path, suites: Dict[str, SuiteSpec],
+                 full_run_every: int = 20, full_run_interval: float = 6 * 3600,
+                 coverage_file: Optional[Path] = None):
+        self.workspace = Path(workspace).resolve()
+        self.suites = suites
+        self.full_run_every = full_run_every
+        self.full_run_interval = full_run_interval
+        self.coverage_file = Path(coverage_file) if coverage_file else self.workspace / '.coverage'
+        self.graph = ImportGraph(self.workspace)
+        self.graph.refresh()
+        self._selections = 0
+        self._last_full = time.monotonic()
+        self._coverage: Dict[str, Set[str]] = {}
+        self._coverage_mtime: Optional[int] = None
+
+    def watch_roots(self) -> List[str]:
+        """Directories whose changes can select something ('.' for root files)"""
+        roots = list(self.graph.roots)
+        for spec in self.suites.values():
+            for prefix in spec.paths + spec.related:
+                root = prefix.split('/', 1)[0] if '/' in prefix else '.'
+                if root not in roots:
+                    roots.append(root)
+        return roots
+
+    def full(self, reason: str) -> Selection:
+        self._selections = 0
+        self._last_full = time.monotonic()
+        return Selection(suites=set(self.suites), full_run=True, reason=reason)
+
+    def select(self, changed: Iterable[str]) -> Selection:
+        """Minimal selection for workspace-relative `changed` paths"""
+        changed = {Path(p).as_posix() for p in changed}
+        if not changed:
+            return Selection()
+        forced = sorted(p for p in changed if p in FULL_RUN_FILES)
+        if forced:
+            return self.full(f"dependencias cambiadas: {', '.join(forced)}")
+        if self.full_run_every and self._selections + 1 >= self.full_run_every:
+            return self.full(f"ejecución completa periódica (cada {self.full_run_every} selecciones)")
+        if self.full_run_interval and time.monotonic() - self._last_full >= self.full_run_interval:
+            return self.full(f"ejecución completa periódica (cada {self.full_run_interval / 3600:g}h)")
+
+        # Deleted files are only known to the previous graph
+        affected = self.graph.dependents(changed)
+        self.graph.refresh()
+        selection = Selection(modules=affected | self.graph.dependents(changed))
+        whole: Set[str] = set()
+
+        python_roots = tuple(f"{root}/" for root in self.graph.roots)
+        for path in changed:
+            # Python sources go through the import graph unless a suite lists the file itself
+            in_graph = path.endswith('.py') and path.startswith(python_roots)
+            for name, spec in self.suites.items():
+                if in_graph:
+                    if path in spec.paths:
+                        selection.suites.add(name)
+                        whole.add(name)
+                    continue
+                if spec.related and path.startswith(spec.related):
+                    selection.suites.add(name)
+                    selection.related.setdefault(name, set()).add(path)
+                elif spec.csv_tests and path.startswith(CSV_PREFIX) and path.endswith('.csv'):
+                    selection.suites.add(name)
+                    selection.tests.setdefault(name, set()).add(f"csv-{Path(path).stem}")
+                elif any(path == p or path.startswith(p) for p in spec.paths):
+                    selection.suites.add(name)
+                    whole.add(name)
+
+        if selection.modules:
+            for name, spec in self.suites.items():
+                for entry in spec.entries:
+                    self._select_entry(name, entry, changed, selection, whole)
+            covered = self._coverage_tests(selection.modules & changed)
+            for name, spec in self.suites.items():
+                test_files = {rel for e in spec.entries for rel in self.graph.expand(e.partition('::')[0])}
+                nodes = {node for node in covered if node.split('::')[0] in test_files}
+                if nodes:
+                    selection.suites.add(name)
+                    selection.tests.setdefault(name, set()).update(nodes)
+
+        for name in whole:
+            selection.tests.pop(name, None)
+            selection.related.pop(name, None)
+        if selection.suites:
+            self._selections += 1
+            selection.reason = f"{len(changed)} archivos cambiados"
+        return selection
+
+    def _select_entry(self, suite: str, entry: str, changed: Set[str],
+                      selection: Selection, whole: Set[str]):
+        pattern, _, function = entry.partition('::')
+        for rel in self.graph.expand(pattern):
+            units = self.graph.affected_units(rel, changed, selection.modules)
+            if function:
+                if units is None or function in units:
+                    selection.suites.add(suite)
+                    whole.add(suite)
+            elif not Path(rel).name.startswith('test_'):
+                if rel in selection.modules:
+                    selection.suites.add(suite)
+                    whole.add(suite)
+            else:
+                tests = self.graph.modules[rel].tests
+                if units is not None:
+                    tests = [u for u in tests if u in units]
+                if tests:
+                    selection.suites.add(suite)
+                    selection.tests.setdefault(suite, set()).update(f"{rel}::{t}" for t in tests)
+
+    def _coverage_tests(self, changed_py: Set[str]) -> Set[str]:
+        """Test node ids that executed any of `changed_py` in the last coverage run"""
+        if not COVERAGE_AVAILABLE or not changed_py or not self.coverage_file.exists():
+            return set()
+        mtime = self.coverage_file.stat().st_mtime_ns
+        if mtime != self._coverage_mtime:
+            self._coverage, self._coverage_mtime = {}, mtime
+            data = CoverageData(basename=str(self.coverage_file))
+            data.read()
+            for measured in data.measured_files():
+                try:
+                    rel = Path(measured).resolve().relative_to(self.workspace).as_posix()
+                except ValueError:
+                    continue
+                contexts = set()
+                for line_contexts in (data.contexts_by_lineno(measured) or {}).values():
+                    for context in line_contexts:
+                        # pytest-cov: "path::test|run"
+                        node = context.split('|')[0]
+                        if '::' in node:
+                            contexts.add(node)
+                self._coverage[rel] = contexts
+        tests = set()
+        for rel in changed_py:
+            tests.update(self._coverage.get(rel, ()))
+        return tests
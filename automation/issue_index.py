@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+🔖 ISSUE INDEX - CHRONOS SYSTEM
+Local SQLite map from finding fingerprints to the GitHub issues that track
+them, so repeated findings update an issue instead of filing a duplicate.
+
+- Every automated issue body ends in a marker `<!-- chronos-fingerprint: X -->`;
+  the fingerprint is the caller's key (e.g. an error cluster id) or a hash
+  of the issue title, which already names the root cause (file, collection,
+  UI test).
+- sync_params() gives the incremental query: issues updated since the last
+  sync, oldest first; absorb() indexes the marked issues of those pages.
+  The first sync reads the whole tracker once, later ones only the delta.
+- plan() decides per finding: create it, skip it (open issue with the same
+  body, closed as not planned, or closed while `reopen` is off), update it
+  (open issue, changed body) or reopen it (closed as fixed, but the caller
+  detected the problem again). Bodies are compared by a hash that ignores
+  what changes every run without the finding changing: the report path and
+  the measured values (Metrics / Performance sections).
+
+    index = IssueIndex(reports_dir / 'issue_index.sqlite3')
+    async for issue in client.paginate(issues_url, index.sync_params()):
+        index.absorb([issue])
+    action, number = index.plan(fingerprint, body, reopen=True)
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    fingerprint TEXT PRIMARY KEY,
+    number      INTEGER NOT NULL,
+    state       TEXT NOT NULL,
+    body_hash   TEXT,
+    updated_at  TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+MARKER = '<!-- chronos-fingerprint: {} -->'
+_MARKER = re.compile(r'<!-- chronos-fingerprint: ([0-9a-zA-Z_:-]+) -->')
+# Lines and sections that differ on every run without the finding changing
+_VOLATILE = re.compile(r'^\*\*Report:\*\*.*$'
+                       r'|^### (?:Metrics|Performance)\n.*?(?=^### |^\*\*|\Z)',
+                       re.MULTILINE | re.DOTALL)
+
+
+def issue_fingerprint(title: str) -> str:
+    return hashlib.blake2b(title.strip().encode(), digest_size=8).hexdigest()
+
+
+def body_hash(body: Optional[str]) -> str:
+    return hashlib.blake2b(_VOLATILE.sub('', body or '').strip().encode(), digest_size=16).hexdigest()
+
+
+def mark_body(body: str, fingerprint: str) -> str:
+    """Body with its fingerprint marker appended (replaces an existing one)"""
+    return f"{_MARKER.sub('', body).rstrip()}\n\n{MARKER.format(fingerprint)}\n"
+
+
+def body_fingerprint(body: Optional[str]) -> Optional[str]:
+    match = _MARKER.search(body or '')
+    return match.group(1) if match else None
+
+
+def issue_state(issue: Dict[str, Any]) -> str:
+    """open, closed, or not_planned (closed on purpose: never reopened)"""
+    if issue.get('state_reason') == 'not_planned':
+        return 'not_planned'
+    return issue.get('state', 'open')
+
+
+class IssueIndex:
+    """fingerprint -> issue number/state, kept in sync with the issues API"""
+
+    def __init__(self, path: Path, timeout: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'IssueIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ------------------------------------------------------------------ sync
+
+    @property
+    def last_sync(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'since'").fetchone()
+        return row[0] if row else None
+
+    def sync_params(self) -> Dict[str, Any]:
+        """Query for GET /issues returning only what changed since the last sync"""
+        params = {'state': 'all', 'sort': 'updated', 'direction': 'asc'}
+        since = self.last_sync
+        if since:
+            # `since` is inclusive: the newest issue of the last sync comes back, harmlessly
+            params['since'] = since
+        return params
+
+    def absorb(self, issues: Iterable[Dict[str, Any]]) -> int:
+        """Indexes the marked issues of a page from the issues API; returns how many"""
+        indexed = 0
+        with self._lock, self._conn:
+            for issue in issues:
+                updated = issue.get('updated_at')
+                if updated:
+                    self._conn.execute(
+                        "INSERT INTO sync_state (key, value) VALUES ('since', ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = max(value, excluded.value)", (updated,))
+                fingerprint = body_fingerprint(issue.get('body'))
+                # The issues endpoint also lists pull requests
+                if fingerprint is None or 'pull_request' in issue:
+                    continue
+                self._upsert(fingerprint, issue['number'], issue_state(issue), body_hash(issue.get('body')),
+                             updated)
+                indexed += 1
+        return indexed
+
+    def record(self, fingerprint: str, issue: Dict[str, Any]):
+        """Indexes an issue this process just created or edited"""
+        with self._lock, self._conn:
+            self._upsert(fingerprint, issue['number'], issue_state(issue),
+                         body_hash(issue.get('body')), issue.get('updated_at'))
+
+    def _upsert(self, fingerprint: str, number: int, state: str, digest: str, updated: Optional[str]):
+        # A duplicate filed by hand never displaces the open issue already tracked
+        self._conn.execute(
+            "INSERT INTO issues (fingerprint, number, state, body_hash, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(fingerprint) DO UPDATE SET number = excluded.number, state = excluded.state, "
+            "body_hash = excluded.body_hash, updated_at = excluded.updated_at "
+            "WHERE issues.number = excluded.number OR issues.state != 'open'",
+            (fingerprint, number, state, digest, updated))
+
+    # ------------------------------------------------------------------ lookup
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT number, state, body_hash, updated_at FROM issues WHERE fingerprint = ?",
+                (fingerprint,)).fetchone()
+        if row is None:
+            return None
+        return {'number': row[0], 'state': row[1], 'body_hash': row[2], 'updated_at': row[3]}
+
+    def plan(self, fingerprint: str, body: str, reopen: bool = False) -> Tuple[str, Optional[int]]:
+        """('create', None) or ('skip' | 'update' | 'reopen', issue number).
+
+        `reopen` marks a problem the caller just detected again; without it
+        a closed issue stays closed (e.g. a static checklist item already done).
+        """
+        tracked = self.get(fingerprint)
+        if tracked is None:
+            return 'create', None
+        if tracked['state'] == 'not_planned':
+            return 'skip', tracked['number']
+        if tracked['state'] != 'open':
+            return ('reopen' if reopen else 'skip'), tracked['number']
+        if tracked['body_hash'] == body_hash(body):
+            return 'skip', tracked['number']
+        return 'update', tracked['number']
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+🧬 RECORD DIFF - CHRONOS SYSTEM
+Record-level reconciliation between the CSV source of truth and Firestore.
+
+- Each record is canonicalized the way scripts/migrate-csv-to-firestore.ts
+  writes it (trimmed strings, numeric text as numbers, DD/MM/YYYY dates as
+  ISO, blanks as None or 0 in numeric fields, only the compared fields) and
+  hashed.
+- Records are grouped into buckets by key hash; each bucket has a digest and
+  the index has a root digest (Merkle-style, two levels). Equal roots mean
+  the sides are in sync; otherwise only buckets with different digests are
+  diffed record by record.
+- The diff reports keys to add (CSV only), to remove (Firestore only) and
+  changed records with field-level differences.
+
+Records are matched by `key_fields` when the file has a natural key. Without
+one, the canonical content itself is the key: drift then shows up as
+remove + add instead of changed. A natural key seen twice keeps its first
+record and is counted in `duplicates`.
+"""
+
+import hashlib
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = 256
+
+Key = Tuple[Any, ...]
+
+_DMY = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+
+
+# ================================================================================
+# CANONICAL FORM
+# ================================================================================
+
+def canonical_value(value: Any) -> Any:
+    """Normalizes a scalar so CSV text and Firestore values compare equal"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        if isinstance(value, float):
+            if math.isnan(value):
+                return None
+            if value.is_integer():
+                return int(value)
+            return round(value, 6)
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    text = str(value).strip()
+    if text == '':
+        return None
+    dmy = _DMY.match(text)
+    if dmy:
+        day, month, year = dmy.groups()
+        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+    try:
+        return canonical_value(float(text.replace(',', ''))) if _looks_numeric(text) else text
+    except ValueError:
+        return text
+
+
+def _looks_numeric(text: str) -> bool:
+    return text[0].isdigit() or (text[0] in '+-.' and len(text) > 1)
+
+
+def canonical_record(record: Dict[str, Any], fields: Sequence[str],
+                     numeric_fields: Iterable[str] = ()) -> Dict[str, Any]:
+    canonical = {f: canonical_value(record.get(f)) for f in fields}
+    # The migrator stores blank numbers as 0
+    for f in numeric_fields:
+        if f in canonical and canonical[f] is None:
+            canonical[f] = 0
+    return canonical
+
+
+def record_hash(canonical: Dict[str, Any]) -> str:
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _bucket_of(key: Key, n_buckets: int) -> int:
+    digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % n_buckets
+
+
+# ================================================================================
+# HASH INDEX
+# ================================================================================
+
+class HashIndex:
+    """Bucketed hash index of one side (CSV or Firestore)"""
+
+    def __init__(self, fields: Sequence[str], key_fields: Optional[Sequence[str]] = None,
+                 n_buckets: int = DEFAULT_BUCKETS, numeric_fields: Iterable[str] = ()):
+        self.fields = list(fields)
+        self.key_fields = list(key_fields) if key_fields else None
+        self.numeric_fields = [f for f in numeric_fields if f in self.fields]
+        self.n_buckets = n_buckets
+        # Records whose natural key was already indexed
+        self.duplicates = 0
+        # bucket -> {key: content hash}
+        self.buckets: Dict[int, Dict[Key, str]] = {}
+        self.records: Dict[Key, Dict[str, Any]] = {}
+        self._occurrences: Dict[str, int] = {}
+        self._digests: Optional[Dict[int, str]] = None
+
+    def add(self, record: Dict[str, Any]):
+        canonical = canonical_record(record, self.fields, self.numeric_fields)
+        content = record_hash(canonical)
+        if self.key_fields:
+            key = tuple(canonical_value(record.get(f)) for f in self.key_fields)
+            if key in self.records:
+                self.duplicates += 1
+                return
+        else:
+            # Content-addressed: duplicates are told apart by occurrence
+            n = self._occurrences.get(content, 0)
+            self._occurrences[content] = n + 1
+            key = (content, n)
+        self.buckets.setdefault(_bucket_of(key, self.n_buckets), {})[key] = content
+        self.records[key] = canonical
+        self._digests = None
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], fields: Sequence[str],
+              key_fields: Optional[Sequence[str]] = None,
+              n_buckets: int = DEFAULT_BUCKETS,
+              numeric_fields: Iterable[str] = ()) -> 'HashIndex':
+        index = cls(fields, key_fields, n_buckets, numeric_fields)
+        for record in records:
+            index.add(record)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def digests(self) -> Dict[int, str]:
+        """bucket -> digest of its sorted (key, content hash) pairs"""
+        if self._digests is None:
+            self._digests = {}
+            for bucket, entries in self.buckets.items():
+                h = hashlib.blake2b(digest_size=16)
+                for key, content in sorted(entries.items(), key=lambda kv: repr(kv[0])):
+                    h.update(f"{key!r}={content};".encode('utf-8'))
+                self._digests[bucket] = h.hexdigest()
+        return self._digests
+
+    @property
+    def root(self) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for bucket, digest in sorted(self.digests.items()):
+            h.update(f"{bucket}:{digest};".encode('utf-8'))
+        return h.hexdigest()
+
+
+# ================================================================================
+# DIFF
+# ================================================================================
+
+@dataclass
+class RecordDiff:
+    """Differences from the source (CSV) to the target (Firestore)"""
+    # key -> canonical record
+    added: Dict[Key, Dict[str, Any]] = field(default_factory=dict)      # in source only
+    removed: Dict[Key, Dict[str, Any]] = field(default_factory=dict)    # in target only
+    # key -> {field: (source value, target value)}
+    changed: Dict[Key, Dict[str, Tuple[Any, Any]]] = field(default_factory=dict)
+    buckets_compared: int = 0
+    buckets_skipped: int = 0
+    # Repeated natural keys on each side (not part of the diff above)
+    source_duplicates: int = 0
+    target_duplicates: int = 0
+
+    @property
+    def in_sync(self) -> bool:
+        return not (self.added or self.removed or self.changed
+                    or self.source_duplicates or self.target_duplicates)
+
+    def summary(self, sample: int = 10) -> Dict[str, Any]:
+        """JSON-friendly summary with a sample of each set"""
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'changed': len(self.changed),
+            'buckets_compared': self.buckets_compared,
+            'buckets_skipped': self.buckets_skipped,
+            'source_duplicates': self.source_duplicates,
+            'target_duplicates': self.target_duplicates,
+            'added_sample': [
+                {'key': list(k), 'record': r} for k, r in list(self.added.items())[:sample]
+            ],
+            'removed_sample': [
+                {'key': list(k), 'record': r} for k, r in list(self.removed.items())[:sample]
+            ],
+            'changed_sample': [
+                {'key': list(k), 'fields': {f: list(v) for f, v in fields.items()}}
+                for k, fields in list(self.changed.items())[:sample]
+            ],
+        }
+
+
+def diff_indexes(source: HashIndex, target: HashIndex) -> RecordDiff:
+    """Compares two indexes built with the same fields, keys and bucket count"""
+    if (source.n_buckets, source.key_fields) != (target.n_buckets, target.key_fields):
+        raise ValueError("Indexes must share bucket count and key fields")
+
+    result = RecordDiff(source_duplicates=source.duplicates, target_duplicates=target.duplicates)
+    if source.root == target.root:
+        result.buckets_skipped = len(set(source.buckets) | set(target.buckets))
+        return result
+
+    src_digests, tgt_digests = source.digests, target.digests
+    for bucket in sorted(set(src_digests) | set(tgt_digests)):
+        if src_digests.get(bucket) == tgt_digests.get(bucket):
+            result.buckets_skipped += 1
+            continue
+        result.buckets_compared += 1
+
+        src = source.buckets.get(bucket, {})
+        tgt = target.buckets.get(bucket, {})
+        for key, content in src.items():
+            if key not in tgt:
+                result.added[key] = source.records[key]
+            elif tgt[key] != content:
+                a, b = source.records[key], target.records[key]
+                result.changed[key] = {
+                    f: (a.get(f), b.get(f)) for f in source.fields if a.get(f) != b.get(f)
+                }
+        result.removed.update(
+            (key, target.records[key]) for key in tgt if key not in src
+        )
+
+    return result
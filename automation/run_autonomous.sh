@@ -8,7 +8,7 @@
 # Uso:
 #   ./run_autonomous.sh              # Ejecutar una vez
 #   ./run_autonomous.sh --daemon     # Ejecutar en modo daemon (continuo)
-#   ./run_autonomous.sh --watch      # Ejecutar con watch (reinicia en cambios)
+#   ./run_autonomous.sh --watch      # Ejecutar con watch (suites afectados por cada cambio)
 #
 # Autor: CHRONOS AI System
 # Versión: 1.0.0
@@ -158,36 +158,10 @@ run_watch() {
     echo -e "${CYAN}   Presiona Ctrl+C para detener${NC}"
     echo ""
     
-    # Verificar si inotifywait está disponible
-    if command -v inotifywait &> /dev/null; then
-        # Linux con inotify
-        while true; do
-            inotifywait -r -e modify,create,delete \
-                --exclude '(node_modules|\.git|automation/logs|automation/reports)' \
-                "$WORKSPACE/app" "$WORKSPACE/evaluation" 2>/dev/null
-            
-            echo -e "\n${YELLOW}🔄 Cambios detectados, ejecutando tests...${NC}\n"
-            sleep 2  # Pequeña pausa para que terminen los cambios
-            run_once || true
-        done
-    else
-        # Fallback: polling cada 60 segundos
-        echo -e "${YELLOW}⚠️ inotifywait no disponible, usando polling${NC}"
-        
-        local last_hash=""
-        
-        while true; do
-            local current_hash=$(find "$WORKSPACE/app" "$WORKSPACE/evaluation" -name "*.ts" -o -name "*.tsx" -o -name "*.py" 2>/dev/null | xargs md5sum 2>/dev/null | md5sum | cut -d' ' -f1)
-            
-            if [ "$current_hash" != "$last_hash" ] && [ -n "$last_hash" ]; then
-                echo -e "\n${YELLOW}🔄 Cambios detectados, ejecutando tests...${NC}\n"
-                run_once || true
-            fi
-            
-            last_hash="$current_hash"
-            sleep 60
-        done
-    fi
+    # El agente queda residente: watchdog (inotify) con debounce y solo
+    # los suites afectados por cada lote de cambios
+    cd "$WORKSPACE"
+    python3 automation/autonomous_testing_agent.py --watch
 }
 
 # Mostrar estado
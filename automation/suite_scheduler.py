@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+🗓️ SUITE SCHEDULER - CHRONOS SYSTEM
+Runs independent test suites concurrently under a CPU budget.
+
+- Each Suite declares a `cost` in CPU slots (tsc and jest are heavy); a suite
+  starts as soon as enough slots are free, so the total never exceeds the
+  budget. A suite more expensive than the whole budget runs alone.
+- Suites may be coroutine functions or blocking functions (run in a thread).
+- Outcomes are streamed as suites finish (`stream`), or collected in
+  declaration order (`run`).
+- fail_fast: the first failing suite cancels the rest. Running suites get
+  their `on_cancel` hook (e.g. to kill child processes); waiting ones never
+  start.
+
+    scheduler = SuiteScheduler(cpu_budget=4, fail_fast=True)
+    async for outcome in scheduler.stream(suites):
+        print(outcome.name, outcome.duration)
+"""
+
+import asyncio
+import inspect
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class Suite:
+    name: str
+    run: Callable[[], Any]
+    cost: int = 1
+    # result -> True when the suite failed (triggers fail-fast)
+    failed: Callable[[Any], bool] = lambda result: False
+    on_cancel: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class SuiteOutcome:
+    name: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+    cancelled: bool = False
+    failed: bool = False
+
+
+class SuiteScheduler:
+    """Weighted-slot scheduler for a set of independent suites"""
+
+    def __init__(self, cpu_budget: Optional[int] = None, fail_fast: bool = False):
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.fail_fast = fail_fast
+
+    async def stream(self, suites: Sequence[Suite]) -> AsyncIterator[SuiteOutcome]:
+        """Yields one outcome per suite, in completion order"""
+        free = self.cpu_budget
+        slots = asyncio.Condition()
+        done: "asyncio.Queue[SuiteOutcome]" = asyncio.Queue()
+        started: Dict[str, bool] = {}
+
+        async def execute(suite: Suite):
+            nonlocal free
+            cost = min(max(1, suite.cost), self.cpu_budget)
+            outcome = SuiteOutcome(suite.name)
+            try:
+                async with slots:
+                    await slots.wait_for(lambda: free >= cost)
+                    free -= cost
+                started[suite.name] = True
+                start = time.perf_counter()
+                try:
+                    if inspect.iscoroutinefunction(suite.run):
+                        outcome.result = await suite.run()
+                    else:
+                        outcome.result = await asyncio.to_thread(suite.run)
+                    outcome.failed = bool(suite.failed(outcome.result))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    outcome.error = e
+                    outcome.failed = True
+                finally:
+                    outcome.duration = time.perf_counter() - start
+                    async with slots:
+                        free += cost
+                        slots.notify_all()
+            except asyncio.CancelledError:
+                outcome.cancelled = True
+                if started.get(suite.name) and suite.on_cancel is not None:
+                    suite.on_cancel()
+            await done.put(outcome)
+
+        tasks = [asyncio.create_task(execute(suite), name=suite.name) for suite in suites]
+        try:
+            for _ in tasks:
+                outcome = await done.get()
+                yield outcome
+                if outcome.failed and self.fail_fast:
+                    for task in tasks:
+                        task.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, suites: Sequence[Suite],
+                  on_outcome: Optional[Callable[[SuiteOutcome], None]] = None) -> Dict[str, SuiteOutcome]:
+        """Runs every suite; outcomes keyed by name in declaration order"""
+        outcomes = {}
+        async for outcome in self.stream(suites):
+            outcomes[outcome.name] = outcome
+            if on_outcome is not None:
+                on_outcome(outcome)
+        return {suite.name: outcomes[suite.name] for suite in suites}
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+🗃️ TEST HISTORY - CHRONOS SYSTEM
+Append-only SQLite store of test results, shared by the agents and the
+dashboard.
+
+- WAL journal: the agent appends while readers query, without blocking
+  each other. Readers open the file read-only (TestHistory(path, readonly=True)).
+- A run groups the results of one agent cycle and carries the fingerprint
+  of the code it tested (HEAD + uncommitted diff, see workspace_fingerprint),
+  so flakiness is measured across identical inputs only.
+- Queries: pass-rate trend per hour/day, duration percentiles per test
+  (nearest rank), flaky tests (pass/fail flips within one fingerprint),
+  failures per error cluster (see error_clusters) and their trend, and
+  numeric metrics per test (web vitals, heap, fps... see web_perf).
+- Retention: results older than `retention_days` are rolled up into
+  daily_summary (kept for trends) and deleted, metrics are deleted;
+  compact() returns the freed pages to the OS.
+
+    history = TestHistory(reports_dir / 'test_history.sqlite3')
+    history.record_run(results, agent='autonomous_test_agent', input_hash=fp)
+    history.flaky_tests(since=time.time() - 7 * 86400)
+"""
+
+import hashlib
+import sqlite3
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from change_watcher import IGNORED_PREFIXES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     INTEGER PRIMARY KEY,
+    started    REAL NOT NULL,
+    agent      TEXT,
+    input_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY,
+    run_id        INTEGER NOT NULL REFERENCES runs(run_id),
+    ts            REAL NOT NULL,
+    suite         TEXT,
+    test_id       TEXT NOT NULL,
+    name          TEXT,
+    status        TEXT NOT NULL,
+    duration      REAL,
+    error_message TEXT,
+    cluster_id    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_test_ts ON results(test_id, ts);
+CREATE INDEX IF NOT EXISTS idx_results_ts ON results(ts);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE TABLE IF NOT EXISTS perf_metrics (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id),
+    test_id TEXT NOT NULL,
+    metric  TEXT NOT NULL,
+    ts      REAL NOT NULL,
+    value   REAL NOT NULL,
+    PRIMARY KEY (run_id, test_id, metric)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_perf_test_metric_ts ON perf_metrics(test_id, metric, ts);
+CREATE TABLE IF NOT EXISTS daily_summary (
+    day          TEXT NOT NULL,
+    test_id      TEXT NOT NULL,
+    suite        TEXT,
+    runs         INTEGER NOT NULL,
+    passed       INTEGER NOT NULL,
+    failed       INTEGER NOT NULL,
+    duration_sum REAL NOT NULL,
+    duration_max REAL NOT NULL,
+    PRIMARY KEY (day, test_id)
+) WITHOUT ROWID;
+"""
+
+BUCKETS = {'hour': '%Y-%m-%dT%H:00', 'day': '%Y-%m-%d'}
+FAILED_STATUSES = ('failed', 'error')
+MAX_ERROR_CHARS = 2000
+
+
+def workspace_fingerprint(workspace: Path) -> Optional[str]:
+    """HEAD, uncommitted changes and untracked contents; None outside a git checkout"""
+    digest = hashlib.blake2b(digest_size=16)
+    # Agent output (reports, logs) is never part of the tested input
+    excludes = [f":(exclude){path}" for path in IGNORED_PREFIXES]
+    for cmd in (['git', 'rev-parse', 'HEAD'],
+                ['git', 'diff', 'HEAD', '--no-ext-diff', '--binary', '--', '.', *excludes],
+                ['git', 'ls-files', '--others', '--exclude-standard', '-z', '--', '.', *excludes]):
+        result = subprocess.run(cmd, cwd=str(workspace), capture_output=True)
+        if result.returncode != 0:
+            return None
+        digest.update(result.stdout)
+    # The listing above only names untracked files; editing one must change the fingerprint too
+    untracked = [path for path in result.stdout.split(b'\0') if path]
+    if untracked:
+        result = subprocess.run(['git', 'hash-object', '--stdin-paths'], cwd=str(workspace),
+                                input=b'\n'.join(untracked) + b'\n', capture_output=True)
+        if result.returncode != 0:
+            return None
+        digest.update(result.stdout)
+    return digest.hexdigest()
+
+
+class TestHistory:
+    """Append-only result store on one SQLite file"""
+
+    def __init__(self, path: Path, readonly: bool = False, timeout: float = 5.0):
+        self.path = Path(path)
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                                         timeout=timeout, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+            # auto_vacuum only takes effect before the first table exists
+            self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+        self._conn.row_factory = sqlite3.Row
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if 'cluster_id' not in columns:
+            self._conn.execute("ALTER TABLE results ADD COLUMN cluster_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_cluster_ts ON results(cluster_id, ts)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'TestHistory':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits (cheap change detection)"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    # ------------------------------------------------------------------ write
+
+    def record_run(self, results: Iterable[Dict[str, Any]], agent: Optional[str] = None,
+                   input_hash: Optional[str] = None, started: Optional[float] = None) -> int:
+        """Appends one run; results are dicts with test_id, status and optionally
+        suite, name, duration, error_message, cluster_id, ts and metrics
+        ({name: number}). Returns the run id."""
+        results = list(results)
+        started = time.time() if started is None else started
+        with self._lock, self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (started, agent, input_hash) VALUES (?, ?, ?)",
+                (started, agent, input_hash)).lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (run_id, ts, suite, test_id, name, status, duration, error_message, "
+                "cluster_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, r.get('ts') or started, r.get('suite'), r['test_id'], r.get('name'),
+                  r['status'], r.get('duration'),
+                  str(r['error_message'])[:MAX_ERROR_CHARS] if r.get('error_message') else None,
+                  r.get('cluster_id'))
+                 for r in results])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO perf_metrics (run_id, test_id, metric, ts, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, r['test_id'], name, r.get('ts') or started, float(value))
+                 for r in results for name, value in (r.get('metrics') or {}).items()
+                 if isinstance(value, (int, float)) and not isinstance(value, bool)])
+        return run_id
+
+    # ------------------------------------------------------------------ read
+
+    def recent(self, limit: int = 50, test_id: Optional[str] = None,
+               before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Latest results, newest first (keyset pagination with `before_id`)"""
+        where, params = [], []
+        if test_id is not None:
+            where.append("test_id = ?")
+            params.append(test_id)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        sql = "SELECT * FROM results"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql + " ORDER BY id DESC LIMIT ?", [*params, limit])
+
+    def runs(self, limit: int = 20, before_id: Optional[int] = None,
+             after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Latest runs with their counts, newest first (keyset pagination with
+        `before_id`; `after_id` returns only runs newer than it)"""
+        where, params = [], []
+        if before_id is not None:
+            where.append("u.run_id < ?")
+            params.append(before_id)
+        if after_id is not None:
+            where.append("u.run_id > ?")
+            params.append(after_id)
+        where = ("WHERE " + " AND ".join(where)) if where else ""
+        return self._query(f"""
+            SELECT u.run_id, u.started, u.agent, u.input_hash,
+                   COUNT(r.id) AS total,
+                   COALESCE(SUM(r.status = 'passed'), 0) AS passed,
+                   COALESCE(SUM(r.status IN {FAILED_STATUSES}), 0) AS failed,
+                   COALESCE(SUM(r.duration), 0) AS duration
+            FROM runs u LEFT JOIN results r ON r.run_id = u.run_id
+            {where}
+            GROUP BY u.run_id ORDER BY u.run_id DESC LIMIT ?""", [*params, limit])
+
+    def totals(self, since: Optional[float] = None) -> Dict[str, int]:
+        """{executed, passed, failed} since a unix timestamp"""
+        return self._query(f"""
+            SELECT COUNT(*) AS executed, COALESCE(SUM(status = 'passed'), 0) AS passed,
+                   COALESCE(SUM(status IN {FAILED_STATUSES}), 0) AS failed
+            FROM results WHERE ts >= ?""", [since or 0])[0]
+
+    def pass_rate_trend(self, bucket: str = 'day', since: Optional[float] = None,
+                        test_id: Optional[str] = None, suite: Optional[str] = None) -> List[Dict[str, Any]]:
+        """[{bucket, runs, passed, pass_rate}] oldest first; daily trends include
+        the rolled-up history"""
+        fmt = BUCKETS[bucket]
+        since = since or 0
+        filters, params = "", []
+        if test_id is not None:
+            filters += " AND test_id = ?"
+            params.append(test_id)
+        if suite is not None:
+            filters += " AND suite = ?"
+            params.append(suite)
+        sql = f"""
+            SELECT strftime('{fmt}', ts, 'unixepoch') AS bucket,
+                   COUNT(*) AS runs, SUM(status = 'passed') AS passed
+            FROM results WHERE ts >= ? AND status != 'skipped'{filters}
+            GROUP BY bucket"""
+        all_params = [since, *params]
+        if bucket == 'day':
+            sql = f"""
+                SELECT bucket, SUM(runs) AS runs, SUM(passed) AS passed FROM (
+                    {sql}
+                    UNION ALL
+                    SELECT day AS bucket, runs, passed FROM daily_summary
+                    WHERE day >= strftime('%Y-%m-%d', ?, 'unixepoch'){filters}
+                ) GROUP BY bucket"""
+            all_params += [since, *params]
+        rows = self._query(sql + " ORDER BY bucket", all_params)
+        for row in rows:
+            row['pass_rate'] = row['passed'] / row['runs'] if row['runs'] else 0.0
+        return rows
+
+    def duration_percentiles(self, percentiles: Sequence[int] = (50, 90, 99),
+                             since: Optional[float] = None, test_id: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Nearest-rank duration percentiles per test, slowest p[-1] first"""
+        percentiles = [int(p) for p in percentiles]
+        columns = ", ".join(
+            f"MAX(CASE WHEN rn = MAX(1, ({p} * n + 99) / 100) THEN duration END) AS p{p}"
+            for p in percentiles)
+        filters, params = "", [since or 0]
+        if test_id is not None:
+            filters = " AND test_id = ?"
+            params.append(test_id)
+        sql = f"""
+            WITH ranked AS (
+                SELECT test_id, duration,
+                       ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY duration) AS rn,
+                       COUNT(*) OVER (PARTITION BY test_id) AS n
+                FROM results
+                WHERE ts >= ? AND duration IS NOT NULL AND status != 'skipped'{filters})
+            SELECT test_id, MAX(n) AS samples, {columns}
+            FROM ranked GROUP BY test_id
+            ORDER BY p{percentiles[-1]} DESC, test_id"""
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def flaky_tests(self, since: Optional[float] = None, min_flips: int = 1,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tests whose outcome flipped between runs of the same input fingerprint"""
+        sql = """
+            WITH seq AS (
+                SELECT r.test_id, u.input_hash, (r.status = 'passed') AS ok,
+                       LAG(r.status = 'passed') OVER (
+                           PARTITION BY r.test_id, u.input_hash ORDER BY r.ts, r.id) AS prev_ok
+                FROM results r JOIN runs u ON u.run_id = r.run_id
+                WHERE r.ts >= ? AND r.status != 'skipped' AND u.input_hash IS NOT NULL)
+            SELECT test_id, COUNT(*) AS runs, SUM(ok) AS passed,
+                   SUM(prev_ok IS NOT NULL AND ok != prev_ok) AS flips,
+                   COUNT(DISTINCT input_hash) AS inputs
+            FROM seq GROUP BY test_id
+            HAVING flips >= ?
+            ORDER BY flips DESC, test_id"""
+        params: List[Any] = [since or 0, min_flips]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._query(sql, params)
+        for row in rows:
+            # Flips over the comparisons made (runs after the first of each input)
+            comparisons = row['runs'] - row['inputs']
+            row['flip_rate'] = row['flips'] / comparisons if comparisons else 0.0
+        return rows
+
+    def top_clusters(self, since: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Error clusters by failures since a unix timestamp, with the tests they hit"""
+        return self._query(f"""
+            SELECT cluster_id, COUNT(*) AS failures, COUNT(DISTINCT test_id) AS tests,
+                   MIN(ts) AS first_ts, MAX(ts) AS last_ts
+            FROM results
+            WHERE ts >= ? AND cluster_id IS NOT NULL AND status IN {FAILED_STATUSES}
+            GROUP BY cluster_id ORDER BY failures DESC, cluster_id LIMIT ?""", [since or 0, limit])
+
+    def cluster_trend(self, cluster_id: str, bucket: str = 'day',
+                      since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """[{bucket, failures, tests}] of one error cluster, oldest first"""
+        return self._query(f"""
+            SELECT strftime('{BUCKETS[bucket]}', ts, 'unixepoch') AS bucket,
+                   COUNT(*) AS failures, COUNT(DISTINCT test_id) AS tests
+            FROM results WHERE cluster_id = ? AND ts >= ?
+            GROUP BY bucket ORDER BY bucket""", [cluster_id, since or 0])
+
+    def run_metrics(self, run_id: int) -> Dict[str, Dict[str, float]]:
+        """{test_id: {metric: value}} recorded with one run"""
+        metrics: Dict[str, Dict[str, float]] = {}
+        for row in self._query("SELECT test_id, metric, value FROM perf_metrics WHERE run_id = ?", [run_id]):
+            metrics.setdefault(row['test_id'], {})[row['metric']] = row['value']
+        return metrics
+
+    def metric_trend(self, metric: str, test_id: Optional[str] = None, bucket: str = 'day',
+                     since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """[{bucket, test_id, samples, avg, min, max}] of one metric, oldest first"""
+        filters, params = "", [metric, since or 0]
+        if test_id is not None:
+            filters = " AND test_id = ?"
+            params.append(test_id)
+        return self._query(f"""
+            SELECT strftime('{BUCKETS[bucket]}', ts, 'unixepoch') AS bucket, test_id,
+                   COUNT(*) AS samples, AVG(value) AS avg, MIN(value) AS min, MAX(value) AS max
+            FROM perf_metrics WHERE metric = ? AND ts >= ?{filters}
+            GROUP BY bucket, test_id ORDER BY bucket, test_id""", params)
+
+    # ------------------------------------------------------------------ maintenance
+
+    def apply_retention(self, retention_days: float = 30) -> int:
+        """Rolls results older than the cutoff into daily_summary; returns rows removed"""
+        if self.readonly:
+            raise RuntimeError("TestHistory abierto en solo lectura")
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                INSERT INTO daily_summary (day, test_id, suite, runs, passed, failed, duration_sum, duration_max)
+                SELECT strftime('%Y-%m-%d', ts, 'unixepoch'), test_id, MAX(suite),
+                       COUNT(*), SUM(status = 'passed'), SUM(status IN {FAILED_STATUSES}),
+                       COALESCE(SUM(duration), 0), COALESCE(MAX(duration), 0)
+                FROM results WHERE ts < ? AND status != 'skipped'
+                GROUP BY 1, test_id
+                ON CONFLICT (day, test_id) DO UPDATE SET
+                    runs = runs + excluded.runs,
+                    passed = passed + excluded.passed,
+                    failed = failed + excluded.failed,
+                    duration_sum = duration_sum + excluded.duration_sum,
+                    duration_max = MAX(duration_max, excluded.duration_max)""", (cutoff,))
+            removed = self._conn.execute("DELETE FROM results WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM perf_metrics WHERE ts < ?", (cutoff,))
+            self._conn.execute(
+                "DELETE FROM runs WHERE started < ? AND NOT EXISTS "
+                "(SELECT 1 FROM results r WHERE r.run_id = runs.run_id) AND NOT EXISTS "
+                "(SELECT 1 FROM perf_metrics m WHERE m.run_id = runs.run_id)", (cutoff,))
+        return removed
+
+    def compact(self):
+        """Returns free pages to the OS and truncates the WAL"""
+        if self.readonly:
+            raise RuntimeError("TestHistory abierto en solo lectura")
+        with self._lock:
+            # executescript steps the pragma to completion (execute frees one page)
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA optimize")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
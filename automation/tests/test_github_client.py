@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+CHRONOS GitHub Client Test Script
+=================================
+
+Pruebas del cliente de GitHub (AsyncGitHubClient y el fallback con requests
+de GitHubAutomation) contra fake_github_server.py: backoff ante límites de
+la API, espaciado de escrituras, revalidación por ETag y paginación.
+
+Uso:
+    python -m pytest -q automation/tests
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Agregar automation/ al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_github_server import FakeGitHubServer
+
+httpx = pytest.importorskip('httpx')
+
+import github_automation
+from github_client import AsyncGitHubClient
+
+
+@pytest.fixture
+def fake():
+    with FakeGitHubServer() as server:
+        yield server
+
+
+def run_client(fake, scenario, **kwargs):
+    """Runs `scenario(client)` with a client pointed at the fake server"""
+    async def main():
+        async with AsyncGitHubClient('token', 'zoro488', 'repo', api_url=fake.url,
+                                     backoff_base=0.01, **kwargs) as client:
+            return client, await scenario(client)
+    return asyncio.run(main())
+
+
+def test_retries_rate_limits(fake):
+    """429 y 403 de límite secundario se reintentan hasta obtener respuesta"""
+    fake.fail_next(429, count=2)
+    fake.fail_next(403, message='API rate limit exceeded for user.')
+
+    async def scenario(client):
+        return await client.create_issue('Rate limited', 'body')
+
+    client, issue = run_client(fake, scenario, write_interval=0)
+
+    assert issue['number'] == 1
+    assert client.stats['retries'] == 3
+    assert client.stats['requests'] == 4
+    assert len(fake.issues) == 1
+
+
+def test_permission_error_is_not_retried(fake):
+    """Un 403 que no es de rate limit se devuelve sin reintentos"""
+    fake.fail_next(403, retry_after=None, message='Resource not accessible by integration')
+
+    async def scenario(client):
+        return await client.request('GET', client.repo_path + '/issues')
+
+    client, response = run_client(fake, scenario)
+    assert response.status_code == 403
+    assert client.stats['retries'] == 0
+
+
+def test_writes_are_spaced(fake):
+    """Las escrituras salen de una en una, con write_interval entre ellas y en orden"""
+    interval = 0.2
+    titles = [f'Issue {n}' for n in range(4)]
+
+    async def scenario(client):
+        return await client.create_issues([{'title': t, 'body': 'b'} for t in titles])
+
+    _, issues = run_client(fake, scenario, write_interval=interval)
+
+    assert [issue['title'] for issue in issues] == titles
+    assert [issue['number'] for issue in issues] == [1, 2, 3, 4]
+    gaps = [b - a for a, b in zip(fake.writes, fake.writes[1:])]
+    assert len(gaps) == 3
+    assert min(gaps) >= interval * 0.9
+
+
+def test_etag_revalidation(fake):
+    """Un GET repetido se responde con 304 desde la caché y no gasta cuota"""
+    async def scenario(client):
+        await client.create_issue('Cached', 'body')
+        first = await client.get_json(client.repo_path + '/issues')
+        remaining = client.rate_remaining
+        second = await client.get_json(client.repo_path + '/issues')
+        return first, second, remaining
+
+    client, (first, second, remaining) = run_client(fake, scenario, write_interval=0)
+
+    assert first == second
+    assert client.stats['not_modified'] == 1
+    assert client.rate_remaining == remaining
+
+
+def test_pagination_and_since(fake):
+    """paginate sigue el Link rel="next" y since= filtra por updated_at"""
+    async def scenario(client):
+        await client.create_issues([{'title': f'Issue {n}', 'body': 'b'} for n in range(5)])
+        fake.issues[1]['updated_at'] = '2099-01-01T00:00:00Z'
+        fake.issues[3]['updated_at'] = '2099-01-02T00:00:00Z'
+        url = client.repo_path + '/issues'
+        every = [i['number'] async for i in client.paginate(url, {'per_page': 2})]
+        since = [i['number'] async for i in client.paginate(
+            url, {'per_page': 1, 'since': '2099-01-01T00:00:00Z', 'sort': 'updated', 'direction': 'asc'})]
+        return every, since
+
+    client, (every, since) = run_client(fake, scenario, write_interval=0)
+
+    assert sorted(every) == [1, 2, 3, 4, 5]
+    assert since == [2, 4]
+    # 5 POST + 3 páginas + 2 páginas
+    assert client.stats['requests'] == 10
+
+
+def test_requests_fallback(fake, tmp_path, monkeypatch):
+    """Sin httpx, GitHubAutomation reintenta con requests y no duplica issues"""
+    monkeypatch.setattr(github_automation, 'HTTPX_AVAILABLE', False)
+    monkeypatch.setenv('GITHUB_TOKEN', 'token')
+
+    def automation():
+        gh = github_automation.GitHubAutomation()
+        gh.api_url = fake.url
+        gh.api_base = f"{fake.url}/repos/{gh.repo_owner}/{gh.repo_name}"
+        gh.etag_cache = tmp_path / 'etags.json'
+        gh.index_path = tmp_path / 'issue_index.sqlite3'
+        return gh
+
+    specs = [{'title': 'Fallback finding', 'body': 'body', 'labels': ['automated']}]
+    fake.fail_next(429)
+    first = automation().create_issues(specs)
+    second = automation().create_issues(specs)
+
+    assert first[0]['action'] == 'create'
+    assert second[0]['action'] == 'skip'
+    assert len(fake.issues) == 1
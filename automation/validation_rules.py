@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+📐 VALIDATION RULES - CHRONOS SYSTEM
+Declarative per-file rules compiled into vectorized pandas masks.
+
+Rule kinds:
+- Required:  value present (not NaN / not blank)
+- Numeric:   coercible to a number and inside optional bounds
+- Allowed:   value in a fixed set
+- Regex:     value fully matches a pattern
+- Formula:   column equals an expression of other columns, within tolerance
+
+A rule only applies when all of its fields exist in the frame (same as the
+old per-record callbacks). Each rule yields a boolean failure mask; messages
+are formatted only for failing rows, and failures are reported by row index.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _missing(series: pd.Series) -> pd.Series:
+    return series.isna() | series.astype(str).str.strip().eq('')
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Base rule over the columns named in `fields`"""
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        raise NotImplementedError
+
+    def applies_to(self, df: pd.DataFrame) -> bool:
+        return all(f in df.columns for f in self.fields)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """Messages for the failing rows only, indexed by row"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _messages(df: pd.DataFrame, mask: pd.Series, render) -> pd.Series:
+        failing = df.index[mask.to_numpy()]
+        return pd.Series([render(i) for i in failing], index=failing, dtype=object)
+
+
+@dataclass(frozen=True)
+class Required(Rule):
+    field_name: str
+    message: str = "Campo requerido vacío: {field}"
+
+    @property
+    def fields(self):
+        return (self.field_name,)
+
+    def evaluate(self, df):
+        mask = _missing(df[self.field_name])
+        return self._messages(df, mask, lambda i: self.message.format(field=self.field_name))
+
+
+@dataclass(frozen=True)
+class Numeric(Rule):
+    """Numeric value with optional bounds.
+
+    gt/ge/lt/le are exclusive/inclusive bounds. Blank values pass (use
+    Required for presence); non-numeric text fails with `not_numeric`.
+    `integer` truncates values before the bounds check, like int().
+    """
+    field_name: str
+    gt: Optional[float] = None
+    ge: Optional[float] = None
+    lt: Optional[float] = None
+    le: Optional[float] = None
+    integer: bool = False
+    invalid: str = "{field} inválido: {value}"
+    not_numeric: str = "{field} no numérico: {raw}"
+
+    @property
+    def fields(self):
+        return (self.field_name,)
+
+    def evaluate(self, df):
+        raw = df[self.field_name]
+        values = _numeric(raw).astype(float)
+        not_numeric = values.isna() & ~_missing(raw)
+        if self.integer:
+            values = np.trunc(values)
+
+        out_of_range = pd.Series(False, index=df.index)
+        if self.gt is not None:
+            out_of_range |= values <= self.gt
+        if self.ge is not None:
+            out_of_range |= values < self.ge
+        if self.lt is not None:
+            out_of_range |= values >= self.lt
+        if self.le is not None:
+            out_of_range |= values > self.le
+
+        return pd.concat([
+            self._messages(df, not_numeric, lambda i: self.not_numeric.format(
+                field=self.field_name, raw=raw.at[i])),
+            self._messages(df, out_of_range, lambda i: self.invalid.format(
+                field=self.field_name,
+                value=int(values.at[i]) if self.integer else values.at[i])),
+        ]).sort_index()
+
+
+@dataclass(frozen=True)
+class Allowed(Rule):
+    field_name: str
+    values: Tuple[str, ...]
+    message: str = "{field} inválido: {value}"
+
+    @property
+    def fields(self):
+        return (self.field_name,)
+
+    def evaluate(self, df):
+        column = df[self.field_name]
+        mask = ~column.isin(self.values)
+        return self._messages(df, mask, lambda i: self.message.format(
+            field=self.field_name, value=column.at[i]))
+
+
+@dataclass(frozen=True)
+class Regex(Rule):
+    field_name: str
+    pattern: str
+    message: str = "{field} con formato inválido: {value}"
+
+    @property
+    def fields(self):
+        return (self.field_name,)
+
+    def evaluate(self, df):
+        column = df[self.field_name]
+        present = ~_missing(column)
+        mask = present & ~column.astype(str).str.fullmatch(self.pattern)
+        return self._messages(df, mask, lambda i: self.message.format(
+            field=self.field_name, value=column.at[i]))
+
+
+_COLUMN_REF = re.compile(r'`([^`]+)`|\b([A-Za-z_]\w*)\b')
+
+
+@dataclass(frozen=True)
+class Formula(Rule):
+    """`target` must equal `expression` (pandas.eval syntax, backticks for
+    column names with spaces) within abs_tol + rel_tol * |calc|.
+    """
+    target: str
+    expression: str
+    abs_tol: float = 0.01
+    rel_tol: float = 0.0
+    message: str = "{target} no coincide: calc={calc}, reg={reg}"
+
+    @property
+    def fields(self):
+        names = []
+        for quoted, bare in _COLUMN_REF.findall(self.expression):
+            name = quoted or bare
+            if name not in names:
+                names.append(name)
+        return (self.target, *names)
+
+    def evaluate(self, df):
+        numeric = pd.DataFrame({f: _numeric(df[f]) for f in self.fields}, index=df.index)
+        calc = numeric.eval(self.expression)
+        reg = numeric[self.target]
+        tolerance = self.abs_tol + self.rel_tol * calc.abs()
+        # Comparisons with NaN are False: incomplete rows are not reported here
+        mask = (calc - reg).abs() > tolerance
+        return self._messages(df, mask, lambda i: self.message.format(
+            target=self.target, calc=float(calc.at[i]), reg=float(reg.at[i])))
+
+
+@dataclass
+class RuleReport:
+    """Outcome of a rule set over one frame"""
+    missing_columns: List[str] = field(default_factory=list)
+    # row index -> messages in rule order
+    failures: Dict[int, List[str]] = field(default_factory=dict)
+
+    @property
+    def failed_rows(self) -> List[int]:
+        return list(self.failures)
+
+
+class RuleSet:
+    """Rules for one file, evaluated column-wise over a whole DataFrame"""
+
+    def __init__(self, rules: Sequence[Rule], required_columns: Sequence[str] = ()):
+        self.rules = list(rules)
+        self.required_columns = list(required_columns)
+
+    def evaluate(self, df: pd.DataFrame) -> RuleReport:
+        report = RuleReport(
+            missing_columns=[c for c in self.required_columns if c not in df.columns]
+        )
+        messages = {
+            position: rule.evaluate(df)
+            for position, rule in enumerate(self.rules) if rule.applies_to(df)
+        }
+        messages = {p: m for p, m in messages.items() if not m.empty}
+        if not messages:
+            return report
+
+        # (rule position, row) -> message; grouped by row keeping rule order
+        long = pd.concat(messages, names=['rule', 'row']).reset_index(name='message')
+        long = long.sort_values(['row', 'rule'], kind='stable')
+        report.failures = long.groupby('row', sort=True)['message'].agg(list).to_dict()
+        return report
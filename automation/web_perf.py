@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+⏱️ WEB PERF - CHRONOS SYSTEM
+Per-page performance metrics for the UI tester, read from Chromium through
+a Playwright CDP session, and the budgets they are checked against.
+
+- VITALS_JS is installed as a context init script, so its
+  PerformanceObservers see the page from its first byte: LCP, CLS (largest
+  session window: gaps < 1s, windows <= 5s), INP (worst interaction, or the
+  98th percentile past 50 interactions) and long tasks (count, total and
+  blocking time over 50ms).
+- CDP: Performance.getMetrics gives the JS heap; Network events give the
+  bytes transferred (encodedDataLength) per resource type.
+- Frame rate is sampled with requestAnimationFrame while the canvases
+  animate: mean fps, 5th-percentile fps and frames over 50ms.
+- Budgets are maxima except for the fps metrics (minima); defaults can be
+  overridden with a JSON file in UI_PERF_BUDGETS. Metrics a page did not
+  produce (e.g. INP without interactions) are not checked. Violations name
+  the budget only; the measured values stay in the metrics, so a filed
+  issue does not change with every run's numbers.
+
+    probe = PerfProbe()
+    await probe.attach(context, page)       # before page.goto
+    metrics = await probe.collect(page, fps_seconds=2)
+    violations = check_budgets(metrics, load_budgets())
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_BUDGETS = {
+    'lcp_ms': 2500,
+    'cls': 0.1,
+    'inp_ms': 200,
+    'total_blocking_ms': 300,
+    'js_heap_mb': 150,
+    'transfer_kb': 5000,
+    'fps_avg': 50,
+    'fps_p5': 30,
+}
+HIGHER_IS_BETTER = {'fps_avg', 'fps_p5'}
+
+VITALS_JS = """
+(() => {
+    const v = window.__chronosVitals = {lcp: null, cls: 0, inp: null, longTasks: 0, longTaskMs: 0, tbt: 0};
+    const observe = (type, cb, opts) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(cb))
+                .observe({type, buffered: true, ...opts});
+        } catch (e) { /* entry type not supported */ }
+    };
+    observe('largest-contentful-paint', e => { v.lcp = e.renderTime || e.loadTime || e.startTime; });
+    let session = 0, first = 0, last = 0;
+    observe('layout-shift', e => {
+        if (e.hadRecentInput) return;
+        if (session && e.startTime - last < 1000 && e.startTime - first < 5000) {
+            session += e.value;
+        } else {
+            session = e.value;
+            first = e.startTime;
+        }
+        last = e.startTime;
+        v.cls = Math.max(v.cls, session);
+    });
+    const interactions = new Map();
+    const onEvent = e => {
+        if (!e.interactionId) return;
+        interactions.set(e.interactionId, Math.max(interactions.get(e.interactionId) || 0, e.duration));
+        const worst = [...interactions.values()].sort((a, b) => b - a);
+        v.inp = worst[Math.min(worst.length - 1, Math.floor(worst.length / 50))];
+    };
+    observe('event', onEvent, {durationThreshold: 16});
+    observe('first-input', onEvent);
+    observe('longtask', e => {
+        v.longTasks += 1;
+        v.longTaskMs += e.duration;
+        v.tbt += Math.max(0, e.duration - 50);
+    });
+})();
+"""
+
+# Frame intervals (ms) over `ms` milliseconds of requestAnimationFrame
+FRAME_SAMPLE_JS = """
+ms => new Promise(resolve => {
+    const intervals = [];
+    let prev = performance.now();
+    const start = prev;
+    const tick = now => {
+        intervals.push(now - prev);
+        prev = now;
+        if (now - start < ms) requestAnimationFrame(tick); else resolve(intervals);
+    };
+    requestAnimationFrame(tick);
+})
+"""
+
+
+def load_budgets(path: Optional[str] = None) -> Dict[str, float]:
+    """DEFAULT_BUDGETS updated with the JSON file in `path` / UI_PERF_BUDGETS"""
+    budgets = dict(DEFAULT_BUDGETS)
+    path = path or os.getenv('UI_PERF_BUDGETS')
+    if path:
+        budgets.update(json.loads(Path(path).read_text()))
+    return budgets
+
+
+def check_budgets(metrics: Dict[str, float], budgets: Dict[str, float]) -> List[str]:
+    """One message per metric outside its budget (without the measured value)"""
+    violations = []
+    for name, limit in budgets.items():
+        value = metrics.get(name)
+        if value is None or limit is None:
+            continue
+        if name in HIGHER_IS_BETTER:
+            if value < limit:
+                violations.append(f"Perf budget: {name} below {limit:g}")
+        elif value > limit:
+            violations.append(f"Perf budget: {name} over {limit:g}")
+    return violations
+
+
+def frame_stats(intervals: List[float]) -> Dict[str, float]:
+    # The first interval includes the wait for the first frame
+    intervals = sorted(intervals[1:])
+    if not intervals:
+        return {}
+    p95 = intervals[min(len(intervals) - 1, (95 * len(intervals) + 99) // 100 - 1)]
+    return {
+        'fps_avg': round(1000 * len(intervals) / sum(intervals), 1) if sum(intervals) else 0.0,
+        'fps_p5': round(1000 / p95, 1) if p95 else 0.0,
+        'long_frames': sum(1 for i in intervals if i > 50),
+    }
+
+
+class PerfProbe:
+    """CDP listeners of one page; collect() returns flat {metric: number}"""
+
+    def __init__(self):
+        self._cdp = None
+        self._types: Dict[str, str] = {}
+        self.transfer: Dict[str, int] = {}
+        self.requests = 0
+
+    async def attach(self, context, page):
+        await context.add_init_script(VITALS_JS)
+        self._cdp = await context.new_cdp_session(page)
+        self._cdp.on('Network.responseReceived', self._on_response)
+        self._cdp.on('Network.loadingFinished', self._on_finished)
+        await self._cdp.send('Network.enable')
+        await self._cdp.send('Performance.enable')
+
+    def _on_response(self, params: Dict[str, Any]):
+        self._types[params['requestId']] = params.get('type', 'Other')
+
+    def _on_finished(self, params: Dict[str, Any]):
+        kind = self._types.pop(params['requestId'], 'Other')
+        self.transfer[kind] = self.transfer.get(kind, 0) + int(params.get('encodedDataLength', 0))
+        self.requests += 1
+
+    async def collect(self, page, fps_seconds: float = 0) -> Dict[str, float]:
+        metrics: Dict[str, float] = {}
+        if fps_seconds > 0:
+            metrics.update(frame_stats(await page.evaluate(FRAME_SAMPLE_JS, int(fps_seconds * 1000))))
+
+        vitals = await page.evaluate('window.__chronosVitals || null') or {}
+        for name, key, digits in (('lcp_ms', 'lcp', 0), ('cls', 'cls', 4), ('inp_ms', 'inp', 0),
+                                  ('long_tasks', 'longTasks', 0), ('long_task_ms', 'longTaskMs', 0),
+                                  ('total_blocking_ms', 'tbt', 0)):
+            if vitals.get(key) is not None:
+                metrics[name] = round(vitals[key], digits)
+
+        heap = {m['name']: m['value'] for m in (await self._cdp.send('Performance.getMetrics'))['metrics']}
+        if 'JSHeapUsedSize' in heap:
+            metrics['js_heap_mb'] = round(heap['JSHeapUsedSize'] / 2 ** 20, 1)
+
+        metrics['requests'] = self.requests
+        metrics['transfer_kb'] = round(sum(self.transfer.values()) / 1024, 1)
+        for kind in ('Script', 'Image', 'Fetch', 'XHR', 'Font', 'Stylesheet'):
+            if kind in self.transfer:
+                metrics[f"transfer_{kind.lower()}_kb"] = round(self.transfer[kind] / 1024, 1)
+        return metrics
+
+    async def detach(self):
+        if self._cdp is not None:
+            await self._cdp.detach()
+            self._cdp = None
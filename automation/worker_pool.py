@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+♨️ WARM WORKER POOL - CHRONOS SYSTEM
+Persistent worker processes that keep heavy modules imported between agent
+iterations.
+
+- Workers are forked from a forkserver that has already imported the
+  `preload` modules, so a new or recycled worker starts warm.
+- Tasks are plain function calls named "module:function"; they return
+  picklable data and come back as a TaskResult (value or error, captured
+  stdout, duration). No stdout parsing.
+- Each task has its own timeout. A worker that exceeds it is killed and
+  replaced, and the task is reported as timed out.
+- Workers are also recycled after `max_tasks_per_worker` tasks.
+- After editing a preloaded module, close the pool and call
+  stop_forkserver(): the next pool starts a fresh server with the new code.
+  The forkserver can only be stopped through a private CPython hook; where
+  it is missing the next pools use 'spawn' (cold, but never stale).
+
+    with WarmWorkerPool(preload=['evaluation_tasks']) as pool:
+        result = pool.run('evaluation_tasks:business_logic_suite', timeout=60)
+"""
+
+import importlib
+import io
+import logging
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+DEFAULT_TIMEOUT = 120.0
+MAX_OUTPUT_CHARS = 20000
+
+logger = logging.getLogger(__name__)
+
+# Set when the forkserver holds outdated modules and could not be stopped
+_forkserver_stale = False
+
+
+@dataclass
+class TaskResult:
+    """Structured outcome of one task"""
+    target: str
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+    error_trace: Optional[str] = None
+    output: str = ''
+    duration: float = 0.0
+    timed_out: bool = False
+
+
+def stop_forkserver() -> bool:
+    """Stops the shared forkserver; it restarts (re-importing `preload`) on next use.
+
+    Returns False when this Python lacks the (private) stop hook: the old
+    server keeps running, so later pools fall back to 'spawn'.
+    """
+    global _forkserver_stale
+    from multiprocessing import forkserver
+    stop = getattr(getattr(forkserver, '_forkserver', None), '_stop', None)
+    if stop is None:
+        _forkserver_stale = True
+        logger.warning("No se puede detener el forkserver en Python %s: "
+                       "los próximos pools usan 'spawn'", sys.version.split()[0])
+        return False
+    stop()
+    return True
+
+
+def _resolve(target: str):
+    module_name, _, func_name = target.partition(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _worker_main(conn):
+    """Worker loop: receives (target, kwargs), replies with a TaskResult"""
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        target, kwargs = message
+        captured = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(captured), redirect_stderr(captured):
+                value = _resolve(target)(**kwargs)
+            result = TaskResult(target, ok=True, value=value)
+        except Exception as e:
+            result = TaskResult(target, ok=False, error=f"{type(e).__name__}: {e}",
+                                error_trace=traceback.format_exc())
+        result.output = captured.getvalue()[-MAX_OUTPUT_CHARS:]
+        result.duration = time.perf_counter() - start
+        try:
+            conn.send(result)
+        except Exception as e:
+            # Value not picklable: report it instead of losing the worker
+            conn.send(TaskResult(target, ok=False, error=f"Resultado no serializable: {e}",
+                                 output=result.output, duration=result.duration))
+
+
+class _Worker:
+    """One worker process plus the pipe used to talk to it"""
+
+    def __init__(self, context):
+        self._context = context
+        self.tasks_done = 0
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks_done = 0
+
+    def stop(self, graceful: bool = True):
+        if self.process is None:
+            return
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(timeout=2)
+            except (OSError, BrokenPipeError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=2)
+        self.conn.close()
+        self.process = None
+
+    def restart(self):
+        self.stop(graceful=False)
+        self.start()
+
+
+class WarmWorkerPool:
+    """Fixed set of warm worker processes fed from a shared task queue"""
+
+    def __init__(self, workers: int = 2, preload: Sequence[str] = (),
+                 paths: Sequence[str] = (), default_timeout: float = DEFAULT_TIMEOUT,
+                 max_tasks_per_worker: int = 50, start_method: str = 'forkserver'):
+        # The forkserver copies sys.path when it starts: extend it first
+        for path in paths:
+            if str(path) not in sys.path:
+                sys.path.insert(0, str(path))
+        if start_method not in multiprocessing.get_all_start_methods() or (
+                start_method == 'forkserver' and _forkserver_stale):
+            start_method = 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            self._context.set_forkserver_preload(list(preload))
+
+        self.default_timeout = default_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._workers: List[_Worker] = [_Worker(self._context) for _ in range(max(1, workers))]
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._dispatch, args=(worker,), daemon=True)
+            for worker in self._workers
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, target: str, timeout: Optional[float] = None, **kwargs) -> Future:
+        """Queues `target(**kwargs)`; the future resolves to a TaskResult"""
+        if self._closed:
+            raise RuntimeError("WarmWorkerPool cerrado")
+        future: Future = Future()
+        self._tasks.put((future, target, kwargs,
+                         self.default_timeout if timeout is None else timeout))
+        return future
+
+    def run(self, target: str, timeout: Optional[float] = None, **kwargs) -> TaskResult:
+        return self.submit(target, timeout=timeout, **kwargs).result()
+
+    def _dispatch(self, worker: _Worker):
+        """Feeds one worker; owns its timeouts and recycling"""
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                return
+            future, target, kwargs, timeout = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            start = time.perf_counter()
+            recycle = False
+            try:
+                worker.conn.send((target, kwargs))
+                if worker.conn.poll(timeout):
+                    result = worker.conn.recv()
+                    worker.tasks_done += 1
+                else:
+                    result = TaskResult(target, ok=False, timed_out=True,
+                                        error=f"Timeout de {timeout:.0f}s: worker reciclado",
+                                        duration=time.perf_counter() - start)
+                    recycle = True
+            except (EOFError, OSError) as e:
+                # The worker died (crash, os._exit, OOM killer)
+                result = TaskResult(target, ok=False,
+                                    error=f"Worker terminado inesperadamente ({type(e).__name__})",
+                                    duration=time.perf_counter() - start)
+                recycle = True
+            except Exception as e:
+                # E.g. kwargs or a result that cannot be pickled: the task fails,
+                # the dispatcher keeps running and the worker starts clean
+                result = TaskResult(target, ok=False, error=f"{type(e).__name__}: {e}",
+                                    error_trace=traceback.format_exc(),
+                                    duration=time.perf_counter() - start)
+                recycle = True
+
+            if recycle or worker.tasks_done >= self.max_tasks_per_worker:
+                try:
+                    worker.restart()
+                except Exception as e:
+                    # The next task finds the pipe closed and retries the restart
+                    logger.error("No se pudo reiniciar el worker: %s", e)
+            future.set_result(result)
+
+    def close(self):
+        """Stops dispatchers and workers; pending tasks are cancelled"""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        for worker in self._workers:
+            worker.stop()
+
+    def __enter__(self) -> 'WarmWorkerPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
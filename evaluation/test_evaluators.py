@@ -340,23 +340,25 @@ def test_user_learning():
     return True
 
 
+# Pruebas en orden de ejecución (también las usa automation/evaluation_tasks.py)
+TESTS = [
+    ("Intent Detection", test_intent_detection),
+    ("Business Logic", test_business_logic),
+    ("Form Autofill", test_form_autofill),
+    ("KPI Accuracy", test_kpi_accuracy),
+    ("Report Quality", test_report_quality),
+    ("User Learning", test_user_learning)
+]
+
+
 def run_all_tests():
     """Ejecuta todas las pruebas."""
     print("\n" + "="*60)
     print("🚀 CHRONOS EVALUATION FRAMEWORK - TEST SUITE")
     print("="*60)
     
-    tests = [
-        ("Intent Detection", test_intent_detection),
-        ("Business Logic", test_business_logic),
-        ("Form Autofill", test_form_autofill),
-        ("KPI Accuracy", test_kpi_accuracy),
-        ("Report Quality", test_report_quality),
-        ("User Learning", test_user_learning)
-    ]
-    
     results = []
-    for name, test_func in tests:
+    for name, test_func in TESTS:
         try:
             success = test_func()
             results.append((name, "✅ PASSED" if success else "❌ FAILED"))
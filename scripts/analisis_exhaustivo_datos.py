@@ -19,14 +19,23 @@ Fecha: 2025-12-02
 """
 
 import pandas as pd
-import numpy as np
 import json
 import os
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from carga_tipada import CargadorTipado, ESQUEMAS, aplicar_esquema
+from rollups_ventas import RollupsVentas
+from grafo_tareas import EjecutorGrafo, Tarea
+import segmentacion_rfm
+import deteccion_anomalias
+from serializacion_json import escribir_json
+from escritura_hojas import (Hoja, escribir_csv_por_hoja, escribir_xlsx,
+                             filas_dataframe, hoja_desde_registros)
+
 # Configuración de visualización
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', None)
@@ -43,16 +52,32 @@ class DataLoader:
         self.base_path = Path(base_path)
         self.csv_path = self.base_path / 'csv'
         self.gg_path = self.base_path / 'gg'
+        self.cargador = CargadorTipado(
+            self.csv_path,
+            cache_path=self.base_path / 'analysis_output' / '.cache'
+        )
         
     def cargar_csv(self, nombre: str) -> pd.DataFrame:
-        """Carga un archivo CSV"""
-        path = self.csv_path / nombre
-        if path.exists():
-            df = pd.read_csv(path, encoding='utf-8')
-            return df
-        else:
-            print(f"⚠️ Archivo no encontrado: {path}")
-            return pd.DataFrame()
+        """Carga un archivo CSV ya tipado según su esquema (ver carga_tipada.ESQUEMAS).
+        
+        Los DataFrames devueltos se comparten entre analizadores y son de solo
+        lectura: las columnas derivadas se agregan con `assign`, nunca in-place.
+        """
+        return self.cargador.cargar(nombre)
+    
+    def cargar_rollups_ventas(self, actualizar: bool = True) -> RollupsVentas:
+        """Rollups diario/semanal/mensual de ventas persistidos en analysis_output/.cache.
+        
+        Con `actualizar` se ingieren solo las filas nuevas de ventas.csv; los
+        workers los abren en modo lectura (los actualiza el proceso principal).
+        """
+        rollups = RollupsVentas(self.base_path / 'analysis_output' / '.cache' / 'rollups')
+        path = self.csv_path / 'ventas.csv'
+        if actualizar and path.exists():
+            rollups.actualizar_desde_csv(
+                path, lambda df: aplicar_esquema(df, ESQUEMAS['ventas.csv'])
+            )
+        return rollups
     
     def cargar_json_unificado(self) -> dict:
         """Carga el JSON unificado"""
@@ -62,7 +87,7 @@ class DataLoader:
                 return json.load(f)
         return {}
     
-    def cargar_todos_csv(self) -> dict:
+    def cargar_todos_csv(self, verbose: bool = True) -> dict:
         """Carga todos los archivos CSV"""
         archivos = [
             'ventas.csv', 'clientes.csv', 'ordenes_compra.csv', 
@@ -78,7 +103,8 @@ class DataLoader:
             df = self.cargar_csv(archivo)
             if not df.empty:
                 datos[nombre] = df
-                print(f"✅ Cargado: {archivo} ({len(df)} registros)")
+                if verbose:
+                    print(f"✅ Cargado: {archivo} ({len(df)} registros)")
         
         return datos
 
@@ -99,15 +125,14 @@ class AnalizadorEstadistico:
         if 'ventas' not in self.datos:
             return {}
         
-        df = self.datos['ventas'].copy()
-        
-        # Convertir fecha
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+        df = self.datos['ventas']
         
         # Análisis temporal
-        df['mes'] = df['fecha'].dt.month
-        df['dia_semana'] = df['fecha'].dt.dayofweek
-        df['semana'] = df['fecha'].dt.isocalendar().week
+        df = df.assign(
+            mes=df['fecha'].dt.month,
+            dia_semana=df['fecha'].dt.dayofweek,
+            semana=df['fecha'].dt.isocalendar().week
+        )
         
         # Métricas numéricas
         cols_numericas = ['cantidad', 'bovedaMonte', 'precioVenta', 'ingreso', 
@@ -133,7 +158,6 @@ class AnalizadorEstadistico:
         # Métricas financieras
         for col in cols_numericas:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
                 analisis['metricas_financieras'][col] = {
                     'suma': float(df[col].sum()),
                     'promedio': float(df[col].mean()),
@@ -147,7 +171,7 @@ class AnalizadorEstadistico:
                 }
         
         # Distribución por cliente
-        ventas_cliente = df.groupby('cliente').agg({
+        ventas_cliente = df.groupby('cliente', observed=True).agg({
             'cantidad': 'sum',
             'ingreso': 'sum',
             'utilidad': 'sum',
@@ -200,20 +224,23 @@ class AnalizadorEstadistico:
             'margen_promedio': float(utilidades.mean())
         }
         
-        # Detección de anomalías (IQR)
+        # Detección de anomalías (IQR sobre todo el historial)
         Q1 = df['ingreso'].quantile(0.25)
         Q3 = df['ingreso'].quantile(0.75)
         IQR = Q3 - Q1
         anomalias_ingreso = df[(df['ingreso'] < (Q1 - 1.5 * IQR)) | (df['ingreso'] > (Q3 + 1.5 * IQR))]
         
-        if len(anomalias_ingreso) > 0:
-            for _, row in anomalias_ingreso.iterrows():
-                analisis['anomalias_detectadas'].append({
-                    'fecha': str(row['fecha']),
-                    'cliente': row['cliente'],
-                    'ingreso': float(row['ingreso']),
-                    'tipo': 'ingreso_atipico'
-                })
+        analisis['anomalias_detectadas'] = pd.DataFrame({
+            'fecha': anomalias_ingreso['fecha'].dt.strftime('%Y-%m-%d %H:%M:%S').fillna('NaT'),
+            'cliente': anomalias_ingreso['cliente'].astype(object),
+            'ingreso': anomalias_ingreso['ingreso'].astype(float),
+            'tipo': 'ingreso_atipico'
+        }).to_dict('records')
+        
+        # Detección por cliente y por semana (IQR, MAD y z-score móvil)
+        analisis['anomalias_por_grupo'] = deteccion_anomalias.a_registros(
+            deteccion_anomalias.detectar(df)
+        )
         
         return analisis
     
@@ -222,15 +249,7 @@ class AnalizadorEstadistico:
         if 'ordenes_compra' not in self.datos:
             return {}
         
-        df = self.datos['ordenes_compra'].copy()
-        
-        # Convertir tipos
-        cols_numericas = ['cantidad', 'costoDistribuidor', 'costoTransporte', 
-                         'costoPorUnidad', 'costoTotal', 'pagoDistribuidor', 'deuda']
-        
-        for col in cols_numericas:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df = self.datos['ordenes_compra']
         
         analisis = {
             'resumen': {
@@ -252,7 +271,7 @@ class AnalizadorEstadistico:
         
         # Análisis por distribuidor
         if 'origen' in df.columns:
-            por_dist = df.groupby('origen').agg({
+            por_dist = df.groupby('origen', observed=True).agg({
                 'cantidad': 'sum',
                 'costoTotal': 'sum',
                 'id': 'count'
@@ -266,12 +285,7 @@ class AnalizadorEstadistico:
         if 'clientes' not in self.datos:
             return {}
         
-        df = self.datos['clientes'].copy()
-        
-        cols_numericas = ['actual', 'deuda', 'abonos', 'pendiente']
-        for col in cols_numericas:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df = self.datos['clientes']
         
         analisis = {
             'resumen': {
@@ -305,7 +319,7 @@ class AnalizadorEstadistico:
         
         for banco in bancos:
             if banco in self.datos:
-                df = self.datos[banco].copy()
+                df = self.datos[banco]
                 
                 # Buscar columna de ingreso/valor
                 col_ingreso = None
@@ -315,8 +329,6 @@ class AnalizadorEstadistico:
                         break
                 
                 if col_ingreso:
-                    df[col_ingreso] = pd.to_numeric(df[col_ingreso], errors='coerce').fillna(0)
-                    
                     analisis[banco] = {
                         'total_movimientos': len(df),
                         'total_ingresos': float(df[col_ingreso].sum()),
@@ -332,12 +344,7 @@ class AnalizadorEstadistico:
         if 'gastos_abonos' not in self.datos:
             return {}
         
-        df = self.datos['gastos_abonos'].copy()
-        
-        # Convertir valores
-        for col in ['valor', 'tc', 'pesos']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df = self.datos['gastos_abonos']
         
         # Clasificar por tipo de operación
         gastos_mask = df['origen'].str.contains('Gasto', case=False, na=False)
@@ -365,7 +372,7 @@ class AnalizadorEstadistico:
         
         # Por destino
         if 'destino' in df.columns:
-            por_destino = df.groupby('destino')['valor'].sum().to_dict()
+            por_destino = df.groupby('destino', observed=True)['valor'].sum().to_dict()
             analisis['por_destino'] = {k: float(v) for k, v in por_destino.items()}
         
         return analisis
@@ -378,30 +385,29 @@ class AnalizadorEstadistico:
 class AnalizadorTendencias:
     """Análisis de correlaciones y tendencias temporales"""
     
-    def __init__(self, datos: dict):
+    def __init__(self, datos: dict, rollups: RollupsVentas = None):
         self.datos = datos
+        self.rollups = rollups
+    
+    def _rollups(self) -> RollupsVentas:
+        """Rollups persistidos si se recibieron; si no (o sin Parquet), en memoria"""
+        if self.rollups is None or self.rollups.tablas['diario'].empty:
+            self.rollups = RollupsVentas()
+            self.rollups.agregar(self.datos['ventas'])
+        return self.rollups
     
     def calcular_tendencias_ventas(self) -> dict:
-        """Calcula tendencias en ventas"""
+        """Calcula tendencias en ventas a partir del rollup semanal"""
         if 'ventas' not in self.datos:
             return {}
         
-        df = self.datos['ventas'].copy()
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-        df = df.dropna(subset=['fecha'])
-        
-        for col in ['cantidad', 'ingreso', 'utilidad']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Agrupar por semana
-        df['semana'] = df['fecha'].dt.to_period('W')
-        semanal = df.groupby('semana').agg({
-            'cantidad': 'sum',
-            'ingreso': 'sum',
-            'utilidad': 'sum',
-            'cliente': 'nunique'
-        }).rename(columns={'cliente': 'clientes_activos'})
+        semanal = self._rollups().tabla('semanal')
+        semanal = pd.DataFrame({
+            'cantidad': semanal['cantidad'],
+            'ingreso': semanal['ingreso'],
+            'utilidad': semanal['utilidad'],
+            'clientes_activos': semanal['clientes_unicos'],
+        }).set_axis(semanal.index.to_period('W'))
         
         # Calcular cambio porcentual
         semanal['cambio_ingreso_pct'] = semanal['ingreso'].pct_change() * 100
@@ -423,22 +429,28 @@ class AnalizadorTendencias:
         return tendencias
     
     def analisis_estacionalidad(self) -> dict:
-        """Análisis de patrones estacionales"""
+        """Análisis de patrones estacionales (rollups diario y mensual)"""
         if 'ventas' not in self.datos:
             return {}
         
-        df = self.datos['ventas'].copy()
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-        df = df.dropna(subset=['fecha'])
-        df['ingreso'] = pd.to_numeric(df['ingreso'], errors='coerce').fillna(0)
+        rollups = self._rollups()
+        
+        def sum_mean_count(tabla: pd.DataFrame, clave: pd.Index) -> pd.DataFrame:
+            agrupado = tabla.groupby(clave)[['ingreso', 'ventas']].sum()
+            return pd.DataFrame({
+                'sum': agrupado['ingreso'],
+                'mean': agrupado['ingreso'] / agrupado['ventas'],
+                'count': agrupado['ventas'].astype(int),
+            })
+        
+        diario = rollups.tabla('diario')
+        mensual = rollups.tabla('mensual')
         
         # Por día de la semana
-        df['dia_semana'] = df['fecha'].dt.day_name()
-        por_dia = df.groupby('dia_semana')['ingreso'].agg(['sum', 'mean', 'count'])
+        por_dia = sum_mean_count(diario, diario.index.day_name())
         
         # Por mes
-        df['mes'] = df['fecha'].dt.month_name()
-        por_mes = df.groupby('mes')['ingreso'].agg(['sum', 'mean', 'count'])
+        por_mes = sum_mean_count(mensual, mensual.index.month_name())
         
         return {
             'por_dia_semana': por_dia.to_dict('index'),
@@ -456,71 +468,39 @@ class AnalizadorSegmentacion:
     def __init__(self, datos: dict):
         self.datos = datos
     
-    def segmentar_clientes_rfm(self) -> dict:
-        """Segmentación RFM (Recency, Frequency, Monetary)"""
+    def segmentar_clientes_rfm(self, reglas: list = None) -> dict:
+        """Segmentación RFM (Recency, Frequency, Monetary)
+        
+        `reglas` reemplaza a segmentacion_rfm.REGLAS_SEGMENTO_RFM.
+        """
         if 'ventas' not in self.datos:
             return {}
         
-        df = self.datos['ventas'].copy()
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-        df['ingreso'] = pd.to_numeric(df['ingreso'], errors='coerce').fillna(0)
-        df = df.dropna(subset=['fecha'])
-        
-        fecha_ref = df['fecha'].max()
-        
-        rfm = df.groupby('cliente').agg({
-            'fecha': lambda x: (fecha_ref - x.max()).days,  # Recency
-            'ingreso': ['count', 'sum']  # Frequency y Monetary
-        })
-        rfm.columns = ['recency', 'frequency', 'monetary']
-        
-        # Scoring (1-5)
-        rfm['R_score'] = pd.qcut(rfm['recency'], 5, labels=[5, 4, 3, 2, 1], duplicates='drop')
-        rfm['F_score'] = pd.qcut(rfm['frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5], duplicates='drop')
-        rfm['M_score'] = pd.qcut(rfm['monetary'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5], duplicates='drop')
-        
-        # RFM Score combinado
-        rfm['RFM_score'] = rfm['R_score'].astype(str) + rfm['F_score'].astype(str) + rfm['M_score'].astype(str)
-        
-        # Segmentos
-        def clasificar_cliente(row):
-            r, f, m = int(row['R_score']), int(row['F_score']), int(row['M_score'])
-            if r >= 4 and f >= 4 and m >= 4:
-                return 'Champions'
-            elif r >= 3 and f >= 3 and m >= 4:
-                return 'Loyal Customers'
-            elif r >= 4 and f <= 2:
-                return 'New Customers'
-            elif r <= 2 and f >= 3:
-                return 'At Risk'
-            elif r <= 2 and f <= 2:
-                return 'Lost'
-            else:
-                return 'Potential Loyalists'
-        
-        rfm['segmento'] = rfm.apply(clasificar_cliente, axis=1)
-        
-        segmentos_count = rfm['segmento'].value_counts().to_dict()
-        
-        return {
-            'distribucion_segmentos': segmentos_count,
-            'detalle_clientes': rfm[['recency', 'frequency', 'monetary', 'segmento']].to_dict('index'),
-            'metricas_segmento': rfm.groupby('segmento').agg({
-                'monetary': ['mean', 'sum'],
-                'frequency': 'mean'
-            }).to_dict()
-        }
+        df = self.datos['ventas'].dropna(subset=['fecha'])
+        rfm = segmentacion_rfm.segmentar(segmentacion_rfm.agregar_parcial(df), reglas)
+        return segmentacion_rfm.resumen(rfm)
+    
+    def segmentar_clientes_rfm_por_bloques(self, bloques, reglas: list = None) -> dict:
+        """Segmentación RFM sobre bloques de ventas (p. ej. CargadorTipado.iterar_bloques
+        o un bloque por tenant). Solo el agregado por cliente vive en memoria."""
+        parciales = (
+            segmentacion_rfm.agregar_parcial(bloque.dropna(subset=['fecha']))
+            for bloque in bloques
+        )
+        agregado = segmentacion_rfm.combinar_parciales(parciales)
+        if agregado.empty:
+            return {}
+        return segmentacion_rfm.resumen(segmentacion_rfm.segmentar(agregado, reglas))
     
     def analisis_pareto_clientes(self) -> dict:
         """Análisis de Pareto (80/20) de clientes"""
         if 'ventas' not in self.datos:
             return {}
         
-        df = self.datos['ventas'].copy()
-        df['ingreso'] = pd.to_numeric(df['ingreso'], errors='coerce').fillna(0)
+        df = self.datos['ventas']
         
         # Total por cliente
-        por_cliente = df.groupby('cliente')['ingreso'].sum().sort_values(ascending=False)
+        por_cliente = df.groupby('cliente', observed=True)['ingreso'].sum().sort_values(ascending=False)
         total = por_cliente.sum()
         
         # Acumulado
@@ -555,197 +535,179 @@ class GeneradorReportes:
         self.output_path = self.base_path / 'analysis_output'
         self.output_path.mkdir(exist_ok=True)
     
-    def generar_excel_completo(self, resultados: dict, nombre: str = 'ANALISIS_EXHAUSTIVO_CHRONOS'):
-        """Genera un archivo Excel con todas las hojas de análisis"""
-        
-        archivo = self.output_path / f'{nombre}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        
-        with pd.ExcelWriter(archivo, engine='xlsxwriter') as writer:
-            workbook = writer.book
+    def _hojas_reporte(self, resultados: dict):
+        """Hojas del reporte tabular, generadas en orden y de a una"""
+        
+        # HOJA 1: Resumen Ejecutivo
+        if 'ventas' in resultados:
+            v = resultados['ventas']
+            resumen_data = [
+                ['📊 RESUMEN EJECUTIVO - ANÁLISIS DE DATOS CHRONOS', ''],
+                ['Fecha de Análisis', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+                ['', ''],
+                ['=== VENTAS ===', ''],
+                ['Total Registros de Ventas', v.get('resumen_general', {}).get('total_registros', 0)],
+                ['Clientes Únicos', v.get('resumen_general', {}).get('clientes_unicos', 0)],
+                ['Periodo de Datos', v.get('resumen_general', {}).get('periodo', 'N/A')],
+                ['', ''],
+                ['=== MÉTRICAS FINANCIERAS ===', ''],
+                ['Ingreso Total', v.get('metricas_financieras', {}).get('ingreso', {}).get('suma', 0)],
+                ['Ingreso Promedio por Venta', v.get('metricas_financieras', {}).get('ingreso', {}).get('promedio', 0)],
+                ['Utilidad Total', v.get('metricas_utilidad', {}).get('utilidad_total', 0)],
+                ['Utilidad Positiva', v.get('metricas_utilidad', {}).get('utilidad_positiva', 0)],
+                ['Utilidad Negativa', v.get('metricas_utilidad', {}).get('utilidad_negativa', 0)],
+                ['', ''],
+                ['=== ESTADO DE PAGOS ===', ''],
+                ['Ventas Pagadas', v.get('estado_pagos', {}).get('Pagado', 0)],
+                ['Ventas Pendientes', v.get('estado_pagos', {}).get('Pendiente', 0)],
+                ['Monto Pendiente (Bóveda Monte)', v.get('deuda_pendiente', {}).get('monto_boveda_monte_pendiente', 0)],
+            ]
+            yield Hoja('Resumen_Ejecutivo', ['Métrica', 'Valor'], resumen_data)
+        
+        # HOJA 2: Análisis de Clientes
+        if 'clientes' in resultados:
+            c = resultados['clientes']
+            clientes_data = [
+                ['=== CARTERA DE CLIENTES ===', ''],
+                ['Total Clientes', c.get('resumen', {}).get('total_clientes', 0)],
+                ['Clientes con Deuda', c.get('resumen', {}).get('con_deuda', 0)],
+                ['Clientes sin Deuda', c.get('resumen', {}).get('sin_deuda', 0)],
+                ['', ''],
+                ['=== MONTOS ===', ''],
+                ['Deuda Total Cartera', c.get('cartera', {}).get('deuda_total_cartera', 0)],
+                ['Abonos Totales', c.get('cartera', {}).get('abonos_totales', 0)],
+                ['Pendiente Cobrar', c.get('cartera', {}).get('pendiente_total', 0)],
+                ['', ''],
+                ['=== SEGMENTACIÓN ===', ''],
+                ['Deuda Alta (>100K)', c.get('segmentacion', {}).get('deuda_alta', 0)],
+                ['Deuda Media (10K-100K)', c.get('segmentacion', {}).get('deuda_media', 0)],
+                ['Deuda Baja (<10K)', c.get('segmentacion', {}).get('deuda_baja', 0)],
+            ]
+            yield Hoja('Analisis_Clientes', ['Métrica', 'Valor'], clientes_data)
             
-            # Formatos
-            header_format = workbook.add_format({
-                'bold': True, 'bg_color': '#4F81BD', 'font_color': 'white',
-                'border': 1, 'align': 'center'
-            })
-            money_format = workbook.add_format({'num_format': '$#,##0.00'})
-            percent_format = workbook.add_format({'num_format': '0.00%'})
+            # Top deudores
+            if 'top_deudores' in c:
+                yield hoja_desde_registros('Top_Deudores', c['top_deudores'])
+        
+        # HOJA 3: Órdenes de Compra
+        if 'ordenes_compra' in resultados:
+            oc = resultados['ordenes_compra']
+            oc_data = [
+                ['=== ÓRDENES DE COMPRA ===', ''],
+                ['Total Órdenes', oc.get('resumen', {}).get('total_ordenes', 0)],
+                ['Distribuidores Únicos', oc.get('resumen', {}).get('distribuidores_unicos', 0)],
+                ['Unidades Totales Compradas', oc.get('resumen', {}).get('unidades_totales', 0)],
+                ['', ''],
+                ['=== COSTOS ===', ''],
+                ['Costo Total de Compras', oc.get('costos', {}).get('costo_total_compras', 0)],
+                ['Costo Promedio por Unidad', oc.get('costos', {}).get('costo_promedio_unidad', 0)],
+                ['', ''],
+                ['=== PAGOS ===', ''],
+                ['Total Pagado a Distribuidores', oc.get('pagos', {}).get('total_pagado', 0)],
+                ['Deuda con Distribuidores', oc.get('pagos', {}).get('deuda_total', 0)],
+            ]
+            yield Hoja('Ordenes_Compra', ['Métrica', 'Valor'], oc_data)
+        
+        # HOJA 4: Análisis de Bancos
+        if 'bancos' in resultados:
+            bancos_filas = (
+                [banco,
+                 metricas.get('total_movimientos', 0),
+                 metricas.get('total_ingresos', 0),
+                 metricas.get('promedio_movimiento', 0),
+                 metricas.get('mayor_movimiento', 0)]
+                for banco, metricas in resultados['bancos'].items()
+            )
+            yield Hoja('Bancos_Bovedas',
+                       ['Banco', 'Total Movimientos', 'Total Ingresos',
+                        'Promedio Movimiento', 'Mayor Movimiento'],
+                       bancos_filas,
+                       formatos_columna={2: 'moneda', 3: 'moneda', 4: 'moneda'})
+        
+        # HOJA 5: Segmentación RFM
+        if 'segmentacion_rfm' in resultados:
+            rfm = resultados['segmentacion_rfm']
+            if 'distribucion_segmentos' in rfm:
+                yield Hoja('Segmentacion_RFM', ['Segmento', 'Cantidad'],
+                           rfm['distribucion_segmentos'].items())
             
-            # HOJA 1: Resumen Ejecutivo
-            resumen_data = []
-            if 'ventas' in resultados:
-                v = resultados['ventas']
-                resumen_data.extend([
-                    ['📊 RESUMEN EJECUTIVO - ANÁLISIS DE DATOS CHRONOS', ''],
-                    ['Fecha de Análisis', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-                    ['', ''],
-                    ['=== VENTAS ===', ''],
-                    ['Total Registros de Ventas', v.get('resumen_general', {}).get('total_registros', 0)],
-                    ['Clientes Únicos', v.get('resumen_general', {}).get('clientes_unicos', 0)],
-                    ['Periodo de Datos', v.get('resumen_general', {}).get('periodo', 'N/A')],
-                    ['', ''],
-                    ['=== MÉTRICAS FINANCIERAS ===', ''],
-                    ['Ingreso Total', v.get('metricas_financieras', {}).get('ingreso', {}).get('suma', 0)],
-                    ['Ingreso Promedio por Venta', v.get('metricas_financieras', {}).get('ingreso', {}).get('promedio', 0)],
-                    ['Utilidad Total', v.get('metricas_utilidad', {}).get('utilidad_total', 0)],
-                    ['Utilidad Positiva', v.get('metricas_utilidad', {}).get('utilidad_positiva', 0)],
-                    ['Utilidad Negativa', v.get('metricas_utilidad', {}).get('utilidad_negativa', 0)],
-                    ['', ''],
-                    ['=== ESTADO DE PAGOS ===', ''],
-                    ['Ventas Pagadas', v.get('estado_pagos', {}).get('Pagado', 0)],
-                    ['Ventas Pendientes', v.get('estado_pagos', {}).get('Pendiente', 0)],
-                    ['Monto Pendiente (Bóveda Monte)', v.get('deuda_pendiente', {}).get('monto_boveda_monte_pendiente', 0)],
-                ])
-            
-            if resumen_data:
-                df_resumen = pd.DataFrame(resumen_data, columns=['Métrica', 'Valor'])
-                df_resumen.to_excel(writer, sheet_name='Resumen_Ejecutivo', index=False)
-            
-            # HOJA 2: Análisis de Clientes
-            if 'clientes' in resultados:
-                c = resultados['clientes']
-                clientes_data = [
-                    ['=== CARTERA DE CLIENTES ===', ''],
-                    ['Total Clientes', c.get('resumen', {}).get('total_clientes', 0)],
-                    ['Clientes con Deuda', c.get('resumen', {}).get('con_deuda', 0)],
-                    ['Clientes sin Deuda', c.get('resumen', {}).get('sin_deuda', 0)],
-                    ['', ''],
-                    ['=== MONTOS ===', ''],
-                    ['Deuda Total Cartera', c.get('cartera', {}).get('deuda_total_cartera', 0)],
-                    ['Abonos Totales', c.get('cartera', {}).get('abonos_totales', 0)],
-                    ['Pendiente Cobrar', c.get('cartera', {}).get('pendiente_total', 0)],
-                    ['', ''],
-                    ['=== SEGMENTACIÓN ===', ''],
-                    ['Deuda Alta (>100K)', c.get('segmentacion', {}).get('deuda_alta', 0)],
-                    ['Deuda Media (10K-100K)', c.get('segmentacion', {}).get('deuda_media', 0)],
-                    ['Deuda Baja (<10K)', c.get('segmentacion', {}).get('deuda_baja', 0)],
-                ]
-                df_clientes = pd.DataFrame(clientes_data, columns=['Métrica', 'Valor'])
-                df_clientes.to_excel(writer, sheet_name='Analisis_Clientes', index=False)
-                
-                # Top deudores
-                if 'top_deudores' in c:
-                    df_deudores = pd.DataFrame(c['top_deudores'])
-                    df_deudores.to_excel(writer, sheet_name='Top_Deudores', index=False)
-            
-            # HOJA 3: Órdenes de Compra
-            if 'ordenes_compra' in resultados:
-                oc = resultados['ordenes_compra']
-                oc_data = [
-                    ['=== ÓRDENES DE COMPRA ===', ''],
-                    ['Total Órdenes', oc.get('resumen', {}).get('total_ordenes', 0)],
-                    ['Distribuidores Únicos', oc.get('resumen', {}).get('distribuidores_unicos', 0)],
-                    ['Unidades Totales Compradas', oc.get('resumen', {}).get('unidades_totales', 0)],
-                    ['', ''],
-                    ['=== COSTOS ===', ''],
-                    ['Costo Total de Compras', oc.get('costos', {}).get('costo_total_compras', 0)],
-                    ['Costo Promedio por Unidad', oc.get('costos', {}).get('costo_promedio_unidad', 0)],
-                    ['', ''],
-                    ['=== PAGOS ===', ''],
-                    ['Total Pagado a Distribuidores', oc.get('pagos', {}).get('total_pagado', 0)],
-                    ['Deuda con Distribuidores', oc.get('pagos', {}).get('deuda_total', 0)],
-                ]
-                df_oc = pd.DataFrame(oc_data, columns=['Métrica', 'Valor'])
-                df_oc.to_excel(writer, sheet_name='Ordenes_Compra', index=False)
-            
-            # HOJA 4: Análisis de Bancos
-            if 'bancos' in resultados:
-                bancos_list = []
-                for banco, metricas in resultados['bancos'].items():
-                    bancos_list.append({
-                        'Banco': banco,
-                        'Total Movimientos': metricas.get('total_movimientos', 0),
-                        'Total Ingresos': metricas.get('total_ingresos', 0),
-                        'Promedio Movimiento': metricas.get('promedio_movimiento', 0),
-                        'Mayor Movimiento': metricas.get('mayor_movimiento', 0)
-                    })
-                df_bancos = pd.DataFrame(bancos_list)
-                df_bancos.to_excel(writer, sheet_name='Bancos_Bovedas', index=False)
-            
-            # HOJA 5: Segmentación RFM
-            if 'segmentacion_rfm' in resultados:
-                rfm = resultados['segmentacion_rfm']
-                if 'distribucion_segmentos' in rfm:
-                    df_seg = pd.DataFrame(list(rfm['distribucion_segmentos'].items()), 
-                                         columns=['Segmento', 'Cantidad'])
-                    df_seg.to_excel(writer, sheet_name='Segmentacion_RFM', index=False)
-            
-            # HOJA 6: Análisis Pareto
-            if 'pareto' in resultados:
-                pareto = resultados['pareto']
-                pareto_data = [
-                    ['=== ANÁLISIS PARETO (80/20) ===', ''],
-                    ['Clientes que generan 80% de ingresos', pareto.get('clientes_top_80_pct', 0)],
-                    ['Total de Clientes', pareto.get('total_clientes', 0)],
-                    ['Ratio Pareto (%)', pareto.get('ratio_pareto', 0)],
-                    ['', ''],
-                    ['=== CONCENTRACIÓN ===', ''],
-                    ['Top 5 Clientes (%)', pareto.get('concentracion', {}).get('top_5_clientes_pct', 0)],
-                    ['Top 10 Clientes (%)', pareto.get('concentracion', {}).get('top_10_clientes_pct', 0)],
-                ]
-                df_pareto = pd.DataFrame(pareto_data, columns=['Métrica', 'Valor'])
-                df_pareto.to_excel(writer, sheet_name='Analisis_Pareto', index=False)
-            
-            # HOJA 7: Gastos y Abonos
-            if 'gastos_abonos' in resultados:
-                ga = resultados['gastos_abonos']
-                ga_data = [
-                    ['=== GASTOS Y ABONOS ===', ''],
-                    ['Total Registros', ga.get('resumen', {}).get('total_registros', 0)],
-                    ['Registros de Gastos', ga.get('resumen', {}).get('registros_gastos', 0)],
-                    ['Registros de Abonos', ga.get('resumen', {}).get('registros_abonos', 0)],
-                    ['', ''],
-                    ['=== MONTOS ===', ''],
-                    ['Total Gastos', ga.get('gastos', {}).get('total', 0)],
-                    ['Total Abonos', ga.get('abonos', {}).get('total', 0)],
-                    ['', ''],
-                    ['=== TIPO DE CAMBIO USD ===', ''],
-                    ['TC Promedio', ga.get('tipo_cambio', {}).get('promedio', 0)],
-                ]
-                df_ga = pd.DataFrame(ga_data, columns=['Métrica', 'Valor'])
-                df_ga.to_excel(writer, sheet_name='Gastos_Abonos', index=False)
-            
-            # HOJA 8: Anomalías Detectadas
-            if 'ventas' in resultados and 'anomalias_detectadas' in resultados['ventas']:
-                anomalias = resultados['ventas']['anomalias_detectadas']
-                if anomalias:
-                    df_anomalias = pd.DataFrame(anomalias)
-                    df_anomalias.to_excel(writer, sheet_name='Anomalias_Detectadas', index=False)
+            # Detalle por cliente: se vuelca por bloques desde el DataFrame
+            detalle = rfm.get('detalle_clientes')
+            if isinstance(detalle, pd.DataFrame) and not detalle.empty:
+                yield Hoja('Detalle_Clientes_RFM',
+                           ['Cliente', 'Recency', 'Frequency', 'Monetary', 'Segmento'],
+                           filas_dataframe(detalle, incluir_indice=True),
+                           formatos_columna={3: 'moneda'})
+        
+        # HOJA 6: Análisis Pareto
+        if 'pareto' in resultados:
+            pareto = resultados['pareto']
+            pareto_data = [
+                ['=== ANÁLISIS PARETO (80/20) ===', ''],
+                ['Clientes que generan 80% de ingresos', pareto.get('clientes_top_80_pct', 0)],
+                ['Total de Clientes', pareto.get('total_clientes', 0)],
+                ['Ratio Pareto (%)', pareto.get('ratio_pareto', 0)],
+                ['', ''],
+                ['=== CONCENTRACIÓN ===', ''],
+                ['Top 5 Clientes (%)', pareto.get('concentracion', {}).get('top_5_clientes_pct', 0)],
+                ['Top 10 Clientes (%)', pareto.get('concentracion', {}).get('top_10_clientes_pct', 0)],
+            ]
+            yield Hoja('Analisis_Pareto', ['Métrica', 'Valor'], pareto_data)
+        
+        # HOJA 7: Gastos y Abonos
+        if 'gastos_abonos' in resultados:
+            ga = resultados['gastos_abonos']
+            ga_data = [
+                ['=== GASTOS Y ABONOS ===', ''],
+                ['Total Registros', ga.get('resumen', {}).get('total_registros', 0)],
+                ['Registros de Gastos', ga.get('resumen', {}).get('registros_gastos', 0)],
+                ['Registros de Abonos', ga.get('resumen', {}).get('registros_abonos', 0)],
+                ['', ''],
+                ['=== MONTOS ===', ''],
+                ['Total Gastos', ga.get('gastos', {}).get('total', 0)],
+                ['Total Abonos', ga.get('abonos', {}).get('total', 0)],
+                ['', ''],
+                ['=== TIPO DE CAMBIO USD ===', ''],
+                ['TC Promedio', ga.get('tipo_cambio', {}).get('promedio', 0)],
+            ]
+            yield Hoja('Gastos_Abonos', ['Métrica', 'Valor'], ga_data)
+        
+        # HOJA 8: Anomalías Detectadas
+        if 'ventas' in resultados and 'anomalias_detectadas' in resultados['ventas']:
+            anomalias = resultados['ventas']['anomalias_detectadas']
+            if anomalias:
+                yield hoja_desde_registros('Anomalias_Detectadas', anomalias)
+    
+    def generar_excel_completo(self, resultados: dict, nombre: str = 'ANALISIS_EXHAUSTIVO_CHRONOS',
+                               formato: str = 'xlsx', memoria_constante: bool = True):
+        """Genera un archivo Excel con todas las hojas de análisis.
+        
+        Las filas se escriben en streaming (xlsxwriter `constant_memory`).
+        Con `formato='csv'` se escribe en cambio un directorio con un CSV por hoja.
+        """
+        
+        marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if formato == 'csv':
+            archivo = escribir_csv_por_hoja(self.output_path / f'{nombre}_{marca}_csv',
+                                            self._hojas_reporte(resultados))
+            print(f"\n✅ Hojas CSV generadas: {archivo}")
+            return str(archivo)
+        
+        archivo = self.output_path / f'{nombre}_{marca}.xlsx'
+        escribir_xlsx(archivo, self._hojas_reporte(resultados), memoria_constante=memoria_constante)
         
         print(f"\n✅ Archivo Excel generado: {archivo}")
         return str(archivo)
     
-    def generar_json_completo(self, resultados: dict, nombre: str = 'ANALISIS_EXHAUSTIVO_CHRONOS'):
-        """Genera archivo JSON con todos los resultados"""
-        
-        archivo = self.output_path / f'{nombre}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+    def generar_json_completo(self, resultados: dict, nombre: str = 'ANALISIS_EXHAUSTIVO_CHRONOS',
+                              compacto: bool = False, comprimir: bool = False):
+        """Genera archivo JSON con todos los resultados (ver serializacion_json).
         
-        # Convertir tipos no serializables
-        def convertir(obj):
-            if isinstance(obj, (np.integer, np.floating)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, pd.Period):
-                return str(obj)
-            elif isinstance(obj, pd.Timestamp):
-                return str(obj)
-            elif pd.isna(obj) if not isinstance(obj, (dict, list)) else False:
-                return None
-            return obj
-        
-        def limpiar_dict(d):
-            if isinstance(d, dict):
-                return {str(k): limpiar_dict(v) for k, v in d.items()}
-            elif isinstance(d, list):
-                return [limpiar_dict(i) for i in d]
-            else:
-                return convertir(d)
-        
-        resultados_limpio = limpiar_dict(resultados)
+        `compacto` omite la indentación y `comprimir` escribe .json.gz.
+        """
         
-        with open(archivo, 'w', encoding='utf-8') as f:
-            json.dump(resultados_limpio, f, indent=2, ensure_ascii=False, default=str)
+        archivo = self.output_path / f'{nombre}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+        archivo = escribir_json(resultados, archivo, compacto=compacto, comprimir=comprimir)
         
         print(f"✅ Archivo JSON generado: {archivo}")
         return str(archivo)
@@ -842,12 +804,133 @@ class GeneradorReportes:
         return str(archivo)
 
 
+# ================================================================================
+# 🧩 TAREAS DEL PIPELINE
+# ================================================================================
+
+# Resultado -> (analizador, método). El orden define el orden de `resultados`.
+ANALISIS = {
+    'ventas': ('estadistico', 'analizar_ventas'),
+    'ordenes_compra': ('estadistico', 'analizar_ordenes_compra'),
+    'clientes': ('estadistico', 'analizar_clientes'),
+    'bancos': ('estadistico', 'analizar_bancos'),
+    'gastos_abonos': ('estadistico', 'analizar_gastos_abonos'),
+    'tendencias': ('tendencias', 'calcular_tendencias_ventas'),
+    'estacionalidad': ('tendencias', 'analisis_estacionalidad'),
+    'segmentacion_rfm': ('segmentacion', 'segmentar_clientes_rfm'),
+    'pareto': ('segmentacion', 'analisis_pareto_clientes'),
+}
+
+# Nombres cortos aceptados por --only
+ALIAS_ANALISIS = {
+    'rfm': 'segmentacion_rfm',
+    'oc': 'ordenes_compra',
+}
+
+ANALIZADORES = {
+    'estadistico': AnalizadorEstadistico,
+    'tendencias': AnalizadorTendencias,
+    'segmentacion': AnalizadorSegmentacion,
+}
+
+# Tarea -> método de GeneradorReportes. Dependen de todos los análisis seleccionados.
+REPORTES = {
+    'reporte_excel': 'generar_excel_completo',
+    'reporte_json': 'generar_json_completo',
+    'reporte_markdown': 'generar_reporte_markdown',
+}
+
+# Datos del proceso worker (cargados una vez por proceso desde la caché tipada)
+_DATOS_WORKER: dict = {}
+_ROLLUPS_WORKER: RollupsVentas = None
+
+
+def _inicializar_worker(base_path: str):
+    global _DATOS_WORKER, _ROLLUPS_WORKER
+    loader = DataLoader(base_path)
+    _DATOS_WORKER = loader.cargar_todos_csv(verbose=False)
+    _ROLLUPS_WORKER = loader.cargar_rollups_ventas(actualizar=False)
+
+
+def _tarea_analisis(analizador: str, metodo: str) -> dict:
+    if analizador == 'tendencias':
+        instancia = AnalizadorTendencias(_DATOS_WORKER, rollups=_ROLLUPS_WORKER)
+    else:
+        instancia = ANALIZADORES[analizador](_DATOS_WORKER)
+    return getattr(instancia, metodo)()
+
+
+def _tarea_reporte(base_path: str, metodo: str, metadata: dict, opciones: dict,
+                   entradas: dict, tiempos: dict) -> str:
+    resultados = {
+        'metadata': {**metadata, 'tiempos_etapas': {k: round(v, 4) for k, v in tiempos.items()}},
+        **entradas
+    }
+    return getattr(GeneradorReportes(base_path), metodo)(resultados, **opciones)
+
+
+def seleccionar_analisis(only: str = None) -> list:
+    """Resuelve la lista de --only (separada por comas) a nombres de ANALISIS"""
+    if not only:
+        return list(ANALISIS)
+    
+    seleccion = []
+    for nombre in (n.strip() for n in only.split(',') if n.strip()):
+        nombre = ALIAS_ANALISIS.get(nombre, nombre)
+        if nombre not in ANALISIS:
+            validos = ', '.join(list(ANALISIS) + list(ALIAS_ANALISIS))
+            raise ValueError(f"Análisis desconocido: '{nombre}'. Válidos: {validos}")
+        if nombre not in seleccion:
+            seleccion.append(nombre)
+    
+    # Mantener el orden canónico de los resultados
+    return [n for n in ANALISIS if n in seleccion]
+
+
+def construir_tareas(base_path: str, analisis: list, metadata: dict,
+                     opciones_reportes: dict = None) -> list:
+    """Grafo del pipeline: análisis independientes -> reportes.
+    
+    `opciones_reportes` mapea tarea de reporte -> kwargs de su método.
+    """
+    opciones_reportes = opciones_reportes or {}
+    tareas = [
+        Tarea(nombre=nombre, funcion=_tarea_analisis, args=ANALISIS[nombre])
+        for nombre in analisis
+    ]
+    tareas += [
+        Tarea(nombre=reporte, funcion=_tarea_reporte,
+              args=(base_path, metodo, metadata, opciones_reportes.get(reporte, {})),
+              dependencias=tuple(analisis))
+        for reporte, metodo in REPORTES.items()
+    ]
+    return tareas
+
+
 # ================================================================================
 # 🚀 EJECUCIÓN PRINCIPAL
 # ================================================================================
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Análisis exhaustivo de datos CHRONOS')
+    parser.add_argument('--only', default=None,
+                        help='Análisis a ejecutar separados por coma (ej. ventas,rfm)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos del pool (1 = ejecución secuencial en proceso)')
+    parser.add_argument('--base-path', default='/workspaces/v0-crypto-dashboard-design',
+                        help='Raíz del proyecto (contiene csv/)')
+    parser.add_argument('--excel-formato', choices=['xlsx', 'csv'], default='xlsx',
+                        help='Reporte tabular: xlsx (memoria constante) o un CSV por hoja')
+    parser.add_argument('--json-compacto', action='store_true',
+                        help='Reporte JSON sin indentación')
+    parser.add_argument('--json-gzip', action='store_true',
+                        help='Reporte JSON comprimido (.json.gz)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Función principal de ejecución"""
+    args = parse_args(argv)
     
     print("=" * 80)
     print("🔬 ANÁLISIS EXHAUSTIVO DE DATOS - SISTEMA CHRONOS/FLOWDISTRIBUTOR")
@@ -855,68 +938,57 @@ def main():
     print()
     
     # Configurar ruta base
-    base_path = '/workspaces/v0-crypto-dashboard-design'
+    base_path = args.base_path
+    analisis = seleccionar_analisis(args.only)
     
-    # 1. Cargar datos
+    # 1. Cargar datos (llena la caché tipada que leen los workers)
     print("📁 CARGANDO DATOS...")
     print("-" * 40)
     loader = DataLoader(base_path)
     datos = loader.cargar_todos_csv()
+    if 'ventas' in datos:
+        rollups = loader.cargar_rollups_ventas()
+        print(f"✅ Rollups de ventas al día ({len(rollups.tablas['diario'])} días)")
     print()
     
-    # 2. Análisis estadístico
-    print("📊 EJECUTANDO ANÁLISIS ESTADÍSTICO...")
-    print("-" * 40)
-    analizador = AnalizadorEstadistico(datos)
-    
-    resultados = {
-        'metadata': {
-            'fecha_analisis': datetime.now().isoformat(),
-            'version': '1.0',
-            'archivos_procesados': list(datos.keys())
-        },
-        'ventas': analizador.analizar_ventas(),
-        'ordenes_compra': analizador.analizar_ordenes_compra(),
-        'clientes': analizador.analizar_clientes(),
-        'bancos': analizador.analizar_bancos(),
-        'gastos_abonos': analizador.analizar_gastos_abonos()
+    metadata = {
+        'fecha_analisis': datetime.now().isoformat(),
+        'version': '1.0',
+        'archivos_procesados': list(datos.keys()),
+        'analisis_ejecutados': analisis
     }
     
-    print("✅ Análisis de ventas completado")
-    print("✅ Análisis de órdenes de compra completado")
-    print("✅ Análisis de clientes completado")
-    print("✅ Análisis de bancos completado")
-    print("✅ Análisis de gastos/abonos completado")
-    print()
-    
-    # 3. Análisis de tendencias
-    print("📈 EJECUTANDO ANÁLISIS DE TENDENCIAS...")
+    # 2. Análisis y reportes en el grafo de tareas
+    print(f"📊 EJECUTANDO {len(analisis)} ANÁLISIS Y {len(REPORTES)} REPORTES...")
     print("-" * 40)
-    tendencias = AnalizadorTendencias(datos)
-    resultados['tendencias'] = tendencias.calcular_tendencias_ventas()
-    resultados['estacionalidad'] = tendencias.analisis_estacionalidad()
-    print("✅ Análisis de tendencias completado")
-    print()
+    workers = args.workers or min(len(analisis) + len(REPORTES), os.cpu_count() or 1)
+    ejecutor = EjecutorGrafo(
+        construir_tareas(base_path, analisis, metadata, {
+            'reporte_excel': {'formato': args.excel_formato},
+            'reporte_json': {'compacto': args.json_compacto, 'comprimir': args.json_gzip},
+        }),
+        max_workers=workers,
+        inicializador=_inicializar_worker,
+        initargs=(base_path,)
+    )
     
-    # 4. Segmentación
-    print("🎯 EJECUTANDO SEGMENTACIÓN DE CLIENTES...")
-    print("-" * 40)
-    segmentador = AnalizadorSegmentacion(datos)
-    resultados['segmentacion_rfm'] = segmentador.segmentar_clientes_rfm()
-    resultados['pareto'] = segmentador.analisis_pareto_clientes()
-    print("✅ Segmentación RFM completada")
-    print("✅ Análisis Pareto completado")
+    def al_completar(nombre, segundos):
+        print(f"✅ {nombre} completado ({segundos:.2f}s)")
+    
+    ejecucion = ejecutor.ejecutar(al_completar=al_completar)
+    for nombre, error in ejecucion.errores.items():
+        print(f"❌ {nombre}: {error}")
     print()
     
-    # 5. Generar reportes
-    print("📋 GENERANDO REPORTES...")
-    print("-" * 40)
-    generador = GeneradorReportes(base_path)
+    metadata['tiempos_etapas'] = {k: round(v, 4) for k, v in ejecucion.tiempos.items()}
+    metadata['duracion_total'] = round(ejecucion.duracion_total, 4)
+    metadata['workers'] = workers
+    resultados = {'metadata': metadata}
+    resultados.update({n: ejecucion.resultados[n] for n in analisis if n in ejecucion.resultados})
     
-    archivo_excel = generador.generar_excel_completo(resultados)
-    archivo_json = generador.generar_json_completo(resultados)
-    archivo_md = generador.generar_reporte_markdown(resultados)
-    print()
+    archivo_excel = ejecucion.resultados.get('reporte_excel', '')
+    archivo_json = ejecucion.resultados.get('reporte_json', '')
+    archivo_md = ejecucion.resultados.get('reporte_markdown', '')
     
     # 6. Mostrar resumen
     print("=" * 80)
@@ -961,7 +1033,10 @@ def main():
             print(f"   • {seg}: {cant} clientes")
     
     print("\n" + "=" * 80)
-    print("✅ ANÁLISIS COMPLETADO EXITOSAMENTE")
+    if ejecucion.errores:
+        print(f"⚠️ ANÁLISIS COMPLETADO CON {len(ejecucion.errores)} ETAPAS FALLIDAS")
+    else:
+        print("✅ ANÁLISIS COMPLETADO EXITOSAMENTE")
     print("=" * 80)
     print(f"\n📁 Archivos generados en: {base_path}/analysis_output/")
     print(f"   • Excel: {Path(archivo_excel).name}")
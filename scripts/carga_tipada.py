@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+📁 CARGA TIPADA CON CACHÉ - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Capa de carga para los CSV del sistema:
+- Esquema declarado por archivo (columnas numéricas, categóricas y de fecha)
+- Parseo y coerción de tipos una sola vez
+- Caché Parquet en disco con clave mtime + tamaño del CSV fuente
+- Cada carga devuelve su propio DataFrame tipado: las opciones globales de
+  pandas no se tocan, y modificarlo no altera la instantánea compartida
+- Instantáneas en memoria por archivo (texto, filas, DataFrame crudo/inferido/
+  tipado) memorizadas por mtime + tamaño, compartidas por los validadores de
+  automation/ y por DataLoader dentro de un mismo proceso
+
+Si pyarrow no está instalado la caché se desactiva y cada ejecución parsea
+los CSV, con los mismos tipos.
+================================================================================
+"""
+
+import csv
+import hashlib
+import io
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (motor de Parquet)
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+
+# ================================================================================
+# 📐 ESQUEMAS
+# ================================================================================
+
+@dataclass(frozen=True)
+class EsquemaCSV:
+    """Tipos declarados de un archivo CSV"""
+    numericas: List[str] = field(default_factory=list)
+    categoricas: List[str] = field(default_factory=list)
+    # columna -> formato de fecha ('ISO8601' o formato strftime)
+    fechas: Dict[str, str] = field(default_factory=dict)
+
+    def huella(self) -> str:
+        """Hash estable del esquema, parte de la clave de caché"""
+        contenido = json.dumps(
+            [self.numericas, self.categoricas, sorted(self.fechas.items())],
+            ensure_ascii=False
+        )
+        return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:10]
+
+
+FECHA_ISO = 'ISO8601'
+FECHA_DMY = '%d/%m/%Y'
+
+_BANCO_DMY = EsquemaCSV(
+    numericas=['ingreso', 'tc', 'dolares', 'pesos'],
+    categoricas=['cliente', 'destino'],
+    fechas={'fecha': FECHA_DMY}
+)
+
+ESQUEMAS: Dict[str, EsquemaCSV] = {
+    'ventas.csv': EsquemaCSV(
+        numericas=['cantidad', 'bovedaMonte', 'precioVenta', 'ingreso',
+                   'fleteUtilidad', 'utilidad'],
+        categoricas=['cliente', 'ocRelacionada', 'flete', 'estatus'],
+        fechas={'fecha': FECHA_ISO}
+    ),
+    'clientes.csv': EsquemaCSV(
+        numericas=['actual', 'deuda', 'abonos', 'pendiente']
+    ),
+    'ordenes_compra.csv': EsquemaCSV(
+        numericas=['cantidad', 'costoDistribuidor', 'costoTransporte',
+                   'costoPorUnidad', 'stockActual', 'costoTotal',
+                   'pagoDistribuidor', 'deuda'],
+        categoricas=['origen'],
+        fechas={'fecha': FECHA_ISO}
+    ),
+    'ordenes_compra_clean.csv': EsquemaCSV(
+        numericas=['cantidad', 'costoDistribuidor', 'costoTransporte',
+                   'costoPorUnidad', 'stockActual', 'costoTotal',
+                   'pagoDistribuidor', 'deuda'],
+        categoricas=['origen', 'estado'],
+        fechas={'fecha': FECHA_ISO}
+    ),
+    'almacen.csv': EsquemaCSV(
+        numericas=['cantidad'],
+        categoricas=['distribuidor']
+    ),
+    'boveda_monte.csv': EsquemaCSV(
+        numericas=['ingreso'],
+        categoricas=['cliente'],
+        fechas={'fecha': FECHA_DMY}
+    ),
+    'utilidades.csv': EsquemaCSV(
+        numericas=['ingreso'],
+        categoricas=['cliente'],
+        fechas={'fecha': FECHA_DMY}
+    ),
+    'boveda_usa.csv': _BANCO_DMY,
+    'bancos_profit.csv': _BANCO_DMY,
+    'bancos_leftie.csv': _BANCO_DMY,
+    'bancos_azteca.csv': _BANCO_DMY,
+    'gastos_abonos.csv': EsquemaCSV(
+        numericas=['valor', 'tc', 'pesos'],
+        categoricas=['origen', 'destino'],
+        fechas={'fecha': FECHA_ISO}
+    ),
+    'flete_sur.csv': EsquemaCSV(
+        numericas=['gasto', 'pesos', 'tc'],
+        categoricas=['origen', 'destino'],
+        fechas={'fecha': FECHA_ISO}
+    ),
+}
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: EsquemaCSV) -> pd.DataFrame:
+    """Convierte las columnas declaradas; las ausentes se ignoran"""
+    conversiones = {}
+    for col in esquema.numericas:
+        if col in df.columns:
+            conversiones[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    for col in esquema.categoricas:
+        if col in df.columns:
+            conversiones[col] = df[col].astype('category')
+    for col, formato in esquema.fechas.items():
+        if col in df.columns:
+            conversiones[col] = pd.to_datetime(df[col], format=formato, errors='coerce')
+    return df.assign(**conversiones) if conversiones else df
+
+
+# ================================================================================
+# 📸 INSTANTÁNEAS EN MEMORIA
+# ================================================================================
+
+class InstantaneaCSV:
+    """Contenido de un CSV leído una sola vez, con vistas derivadas perezosas.
+
+    Todas las vistas son de solo lectura: se comparten entre consumidores.
+    - texto: contenido decodificado
+    - num_lineas: equivalente a len(f.readlines())
+    - columnas / filas: equivalente a csv.DictReader (valores str)
+    - crudo: DataFrame con todas las columnas como str (sin NaN)
+    - inferido: DataFrame con la inferencia por defecto de pd.read_csv
+    - tipado(esquema): DataFrame con los tipos declarados
+    """
+
+    def __init__(self, path: Path, clave: Tuple[int, int]):
+        self.path = Path(path)
+        self.clave = clave
+        self._vistas: Dict[str, object] = {}
+        # Reentrante: una vista puede construirse a partir de otra
+        self._lock = threading.RLock()
+
+    def _vista(self, nombre: str, construir):
+        # Doble verificación: cada vista se construye una vez aunque haya hilos
+        if nombre not in self._vistas:
+            with self._lock:
+                if nombre not in self._vistas:
+                    self._vistas[nombre] = construir()
+        return self._vistas[nombre]
+
+    @property
+    def texto(self) -> str:
+        return self._vista('texto', lambda: self.path.read_text(encoding='utf-8'))
+
+    @property
+    def num_lineas(self) -> int:
+        def contar():
+            texto = self.texto
+            return texto.count('\n') + (1 if texto and not texto.endswith('\n') else 0)
+        return self._vista('num_lineas', contar)
+
+    def _dict_reader(self):
+        lector = csv.DictReader(io.StringIO(self.texto, newline=''))
+        return lector.fieldnames or [], list(lector)
+
+    @property
+    def columnas(self) -> List[str]:
+        return self._vista('dict_reader', self._dict_reader)[0]
+
+    @property
+    def filas(self) -> List[Dict[str, str]]:
+        return self._vista('dict_reader', self._dict_reader)[1]
+
+    @property
+    def crudo(self) -> pd.DataFrame:
+        return self._vista('crudo', lambda: pd.read_csv(
+            io.StringIO(self.texto), dtype=str, keep_default_na=False))
+
+    @property
+    def inferido(self) -> pd.DataFrame:
+        return self._vista('inferido', lambda: pd.read_csv(io.StringIO(self.texto)))
+
+    def tipado(self, esquema: EsquemaCSV) -> pd.DataFrame:
+        return self._vista(f'tipado:{esquema.huella()}',
+                           lambda: aplicar_esquema(self.inferido, esquema))
+
+
+_INSTANTANEAS: Dict[Path, InstantaneaCSV] = {}
+_INSTANTANEAS_LOCK = threading.Lock()
+
+
+def instantanea(path: Path) -> InstantaneaCSV:
+    """Instantánea memorizada de `path`; se renueva si cambia mtime o tamaño.
+
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    clave = (stat.st_mtime_ns, stat.st_size)
+    with _INSTANTANEAS_LOCK:
+        actual = _INSTANTANEAS.get(path)
+        if actual is None or actual.clave != clave:
+            actual = _INSTANTANEAS[path] = InstantaneaCSV(path, clave)
+        return actual
+
+
+def limpiar_instantaneas():
+    """Descarta todas las instantáneas memorizadas"""
+    with _INSTANTANEAS_LOCK:
+        _INSTANTANEAS.clear()
+
+
+# ================================================================================
+# 💾 CARGADOR CON CACHÉ
+# ================================================================================
+
+class CargadorTipado:
+    """Carga CSV con su esquema y mantiene una caché Parquet por archivo"""
+
+    def __init__(self, csv_path: Path, cache_path: Optional[Path] = None,
+                 esquemas: Optional[Dict[str, EsquemaCSV]] = None):
+        self.csv_path = Path(csv_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.esquemas = esquemas if esquemas is not None else ESQUEMAS
+        self.estadisticas = {'cache_hits': 0, 'parseados': 0}
+
+        if self.cache_path and PARQUET_DISPONIBLE:
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+
+    def _clave(self, path: Path, esquema: EsquemaCSV) -> str:
+        stat = path.stat()
+        return f"{stat.st_mtime_ns}-{stat.st_size}-{esquema.huella()}"
+
+    def _archivo_cache(self, nombre: str, clave: str) -> Path:
+        return self.cache_path / f"{Path(nombre).stem}.{clave}.parquet"
+
+    def _limpiar_cache_obsoleta(self, nombre: str, vigente: Path):
+        for viejo in self.cache_path.glob(f"{Path(nombre).stem}.*.parquet"):
+            if viejo != vigente:
+                viejo.unlink(missing_ok=True)
+
+    def cargar(self, nombre: str) -> pd.DataFrame:
+        """Devuelve el DataFrame tipado de un CSV (vacío si no existe)"""
+        path = self.csv_path / nombre
+        if not path.exists():
+            print(f"⚠️ Archivo no encontrado: {path}")
+            return pd.DataFrame()
+
+        esquema = self.esquemas.get(nombre, EsquemaCSV())
+        usar_cache = self.cache_path is not None and PARQUET_DISPONIBLE
+
+        if usar_cache:
+            archivo_cache = self._archivo_cache(nombre, self._clave(path, esquema))
+            if archivo_cache.exists():
+                try:
+                    df = pd.read_parquet(archivo_cache)
+                    self.estadisticas['cache_hits'] += 1
+                    return df
+                except Exception as e:
+                    print(f"⚠️ Caché inválida para {nombre}, se vuelve a parsear: {e}")
+
+        # La vista tipada es compartida por todo el proceso: se entrega una copia
+        df = instantanea(path).tipado(esquema).copy()
+        self.estadisticas['parseados'] += 1
+
+        if usar_cache:
+            try:
+                df.to_parquet(archivo_cache, index=False)
+                self._limpiar_cache_obsoleta(nombre, archivo_cache)
+            except Exception as e:
+                # Columnas con tipos mixtos que Parquet no acepta: se omite la caché
+                archivo_cache.unlink(missing_ok=True)
+                print(f"⚠️ No se pudo cachear {nombre}: {e}")
+
+        return df
+
+    def iterar_bloques(self, nombre: str, filas_por_bloque: int = 500_000) -> Iterator[pd.DataFrame]:
+        """Lee un CSV por bloques ya tipados, sin materializar el archivo completo"""
+        path = self.csv_path / nombre
+        if not path.exists():
+            print(f"⚠️ Archivo no encontrado: {path}")
+            return
+        esquema = self.esquemas.get(nombre, EsquemaCSV())
+        for bloque in pd.read_csv(path, encoding='utf-8', chunksize=filas_por_bloque):
+            yield aplicar_esquema(bloque, esquema)
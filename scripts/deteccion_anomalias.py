@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+🚨 DETECCIÓN DE ANOMALÍAS - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Detectores vectorizados sobre una columna numérica de ventas:
+- IQR (fuera de Q1 - k·IQR, Q3 + k·IQR)
+- MAD (z-score modificado de Iglewicz-Hoaglin)
+- z-score móvil (contra la media/desviación de las N operaciones previas)
+
+Cada detector puede aplicarse a todo el historial o por grupo (cliente, semana).
+Las detecciones salen como registros vía to_dict('records').
+
+DetectorStreaming procesa ventas nuevas por ventanas: conserva solo los últimos
+`ventana_dias` de historial como contexto y reporta anomalías únicamente de las
+filas nuevas, para correr de forma continua sobre ventas.csv.
+================================================================================
+"""
+
+import hashlib
+import io
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Agrupaciones soportadas: nombre -> función que deriva la clave desde el DataFrame
+AGRUPACIONES = {
+    'cliente': lambda df: df['cliente'],
+    'semana': lambda df: df['fecha'].dt.to_period('W').astype(str),
+}
+
+COLUMNAS_REGISTRO = ['fecha', 'cliente', 'ingreso', 'tipo', 'detector', 'grupo', 'puntaje']
+
+
+def _claves(df: pd.DataFrame, por: Optional[str]) -> Optional[pd.Series]:
+    if por is None:
+        return None
+    if por not in AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: '{por}'. Válidas: {list(AGRUPACIONES)}")
+    return AGRUPACIONES[por](df)
+
+
+def _agrupar(serie: pd.Series, claves: Optional[pd.Series]):
+    if claves is None:
+        # Un único grupo: se reutiliza la misma API de transform
+        claves = pd.Series(0, index=serie.index)
+    return serie.groupby(claves, observed=True, sort=False)
+
+
+# ================================================================================
+# 🔍 DETECTORES
+# ================================================================================
+
+def _grupo_suficiente(g, min_grupo: int) -> pd.Series:
+    return g.transform('size') >= min_grupo
+
+
+def puntaje_iqr(serie: pd.Series, claves: Optional[pd.Series] = None, k: float = 1.5,
+                min_grupo: int = 4) -> pd.Series:
+    """Distancia al rango intercuartílico en unidades de IQR; 0 si no supera k"""
+    g = _agrupar(serie, claves)
+    q1 = g.transform('quantile', 0.25)
+    q3 = g.transform('quantile', 0.75)
+    iqr = (q3 - q1).replace(0, np.nan)
+    debajo = (q1 - serie) / iqr
+    encima = (serie - q3) / iqr
+    puntaje = np.fmax(debajo, encima).clip(lower=0)
+    # Anomalía si está a más de k·IQR del rango, en grupos con datos suficientes
+    return puntaje.where((puntaje > k) & _grupo_suficiente(g, min_grupo), 0.0).fillna(0.0)
+
+
+def puntaje_mad(serie: pd.Series, claves: Optional[pd.Series] = None, umbral: float = 3.5,
+                min_grupo: int = 4) -> pd.Series:
+    """|z modificado| = 0.6745·|x - mediana| / MAD; 0 si no supera el umbral"""
+    g = _agrupar(serie, claves)
+    desvio = (serie - g.transform('median')).abs()
+    mad = _agrupar(desvio, claves).transform('median').replace(0, np.nan)
+    z = 0.6745 * desvio / mad
+    return z.where((z > umbral) & _grupo_suficiente(g, min_grupo), 0.0).fillna(0.0)
+
+
+def puntaje_zscore_movil(serie: pd.Series, claves: Optional[pd.Series] = None,
+                         ventana: int = 10, min_periodos: int = 3,
+                         umbral: float = 3.0) -> pd.Series:
+    """|z| contra las `ventana` observaciones previas del mismo grupo.
+
+    La serie debe venir ordenada por fecha.
+    """
+    if claves is None:
+        claves = pd.Series(0, index=serie.index)
+    previo = _agrupar(serie, claves).shift()
+    rolling = previo.groupby(claves, observed=True, sort=False).rolling(ventana, min_periods=min_periodos)
+    media = rolling.mean().reset_index(level=0, drop=True).reindex(serie.index)
+    desviacion = rolling.std().reset_index(level=0, drop=True).reindex(serie.index)
+    z = ((serie - media) / desviacion.replace(0, np.nan)).abs()
+    return z.where(z > umbral, 0.0).fillna(0.0)
+
+
+DETECTORES = {
+    'iqr': puntaje_iqr,
+    'mad': puntaje_mad,
+    'zscore_movil': puntaje_zscore_movil,
+}
+
+# (detector, agrupación) ejecutados por defecto
+CONFIGURACION_POR_DEFECTO = [
+    ('iqr', 'cliente'),
+    ('iqr', 'semana'),
+    ('mad', 'cliente'),
+    ('mad', 'semana'),
+    ('zscore_movil', 'cliente'),
+]
+
+
+def _preparar(df: pd.DataFrame) -> pd.DataFrame:
+    return df.dropna(subset=['fecha']).sort_values('fecha', kind='stable')
+
+
+def detectar(df: pd.DataFrame, columna: str = 'ingreso',
+             configuracion: Sequence = CONFIGURACION_POR_DEFECTO,
+             parametros: Optional[Dict[str, dict]] = None) -> pd.DataFrame:
+    """Ejecuta los detectores configurados y devuelve un DataFrame de anomalías.
+
+    `parametros` permite ajustar cada detector, p. ej. {'iqr': {'k': 3}}.
+    """
+    parametros = parametros or {}
+    base = _preparar(df)
+    if base.empty:
+        return pd.DataFrame(columns=COLUMNAS_REGISTRO)
+
+    serie = base[columna].astype(float)
+    hallazgos = []
+    for detector, por in configuracion:
+        puntaje = DETECTORES[detector](serie, _claves(base, por), **parametros.get(detector, {}))
+        mascara = puntaje.to_numpy() > 0
+        if not mascara.any():
+            continue
+        hallazgos.append(pd.DataFrame({
+            'fecha': base['fecha'].to_numpy()[mascara],
+            'cliente': base['cliente'].astype(str).to_numpy()[mascara],
+            columna: serie.to_numpy()[mascara],
+            'tipo': f'{columna}_atipico',
+            'detector': detector,
+            'grupo': por or 'global',
+            'puntaje': puntaje.to_numpy()[mascara].round(4),
+        }, index=base.index[mascara]))
+
+    if not hallazgos:
+        return pd.DataFrame(columns=COLUMNAS_REGISTRO)
+    return pd.concat(hallazgos)
+
+
+def a_registros(anomalias: pd.DataFrame) -> List[dict]:
+    """Registros serializables (fecha como texto)"""
+    if anomalias.empty:
+        return []
+    return anomalias.assign(
+        fecha=anomalias['fecha'].dt.strftime('%Y-%m-%d')
+    ).to_dict('records')
+
+
+# ================================================================================
+# 🌊 MODO STREAMING
+# ================================================================================
+
+class DetectorStreaming:
+    """Detección continua sobre lotes de ventas nuevas.
+
+    El historial se limita a los últimos `ventana_dias` respecto a la venta más
+    reciente, así el costo por lote depende del tamaño de la ventana y no del
+    historial completo.
+    """
+
+    def __init__(self, ventana_dias: int = 90, columna: str = 'ingreso',
+                 configuracion: Sequence = CONFIGURACION_POR_DEFECTO,
+                 parametros: Optional[Dict[str, dict]] = None):
+        self.ventana = pd.Timedelta(days=ventana_dias)
+        self.columna = columna
+        self.configuracion = configuracion
+        self.parametros = parametros
+        self.historial = pd.DataFrame()
+        # Estado para la lectura incremental de un CSV: offset procesado, sha1
+        # de ese prefijo y (mtime_ns, tamaño) del archivo en la última lectura
+        self._offset_csv = 0
+        self._encabezado_csv: Optional[List[str]] = None
+        self._hash_csv = hashlib.sha1()
+        self._stat_csv: Optional[tuple] = None
+
+    def procesar(self, nuevas: pd.DataFrame) -> List[dict]:
+        """Procesa un lote de ventas tipadas y devuelve las anomalías de ese lote"""
+        nuevas = nuevas.dropna(subset=['fecha'])
+        if nuevas.empty:
+            return []
+
+        contexto = pd.concat(
+            [self.historial.assign(_nueva=False), nuevas.assign(_nueva=True)],
+            ignore_index=True
+        ) if not self.historial.empty else nuevas.assign(_nueva=True).reset_index(drop=True)
+        # Las categorías de cada lote pueden diferir
+        contexto['cliente'] = contexto['cliente'].astype(str)
+
+        anomalias = detectar(contexto, self.columna, self.configuracion, self.parametros)
+        if not anomalias.empty:
+            anomalias = anomalias[contexto.loc[anomalias.index, '_nueva'].to_numpy()]
+
+        limite = contexto['fecha'].max() - self.ventana
+        self.historial = contexto.loc[contexto['fecha'] >= limite].drop(columns='_nueva').reset_index(drop=True)
+        return a_registros(anomalias)
+
+    def procesar_csv_incremental(self, path: Path, aplicar_tipos=None) -> List[dict]:
+        """Lee solo las filas agregadas a `path` desde la última llamada.
+
+        `aplicar_tipos(df)` convierte las columnas (p. ej. carga_tipada.aplicar_esquema).
+        Igual que RollupsVentas.actualizar_desde_csv: sin cambios de mtime_ns ni
+        tamaño no se lee nada; si no, se compara el hash de todo el prefijo ya
+        procesado y, si el archivo se truncó, reescribió o editó, se vuelve a
+        leer desde el inicio con el historial vacío.
+        """
+        path = Path(path)
+        stat = path.stat()
+        if self._offset_csv and (stat.st_mtime_ns, stat.st_size) == self._stat_csv:
+            return []
+
+        with open(path, 'rb') as f:
+            if self._offset_csv:
+                h = hashlib.sha1()
+                restante = self._offset_csv
+                while restante:
+                    parte = f.read(min(restante, 1 << 20))
+                    if not parte:
+                        break
+                    h.update(parte)
+                    restante -= len(parte)
+                if restante or h.hexdigest() != self._hash_csv.hexdigest():
+                    self._offset_csv, self._encabezado_csv = 0, None
+                    self._hash_csv = hashlib.sha1()
+                    self.historial = pd.DataFrame()
+            f.seek(self._offset_csv)
+            bloque = f.read()
+
+        # Solo líneas completas; el resto se lee en la próxima llamada
+        fin = bloque.rfind(b'\n') + 1
+        if fin == 0:
+            return []
+        self._offset_csv += fin
+        self._hash_csv.update(bloque[:fin])
+        self._stat_csv = (stat.st_mtime_ns, stat.st_size)
+        texto = bloque[:fin].decode('utf-8')
+
+        if self._encabezado_csv is None:
+            df = pd.read_csv(io.StringIO(texto))
+            self._encabezado_csv = list(df.columns)
+        else:
+            df = pd.read_csv(io.StringIO(texto), header=None, names=self._encabezado_csv)
+
+        if aplicar_tipos is not None:
+            df = aplicar_tipos(df)
+        return self.procesar(df)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+📗 ESCRITURA DE HOJAS - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Escritores de reportes tabulares a partir de hojas declaradas como iteradores
+de filas:
+- Excel con xlsxwriter en modo `constant_memory`: cada fila se escribe y se
+  libera, la memoria no crece con el número de filas de la hoja
+- Formatos creados una sola vez por libro y referenciados por nombre
+- Alternativa rápida: un CSV por hoja en un directorio
+
+Las hojas se consumen una sola vez y en orden (requisito de constant_memory).
+================================================================================
+"""
+
+import csv
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import pandas as pd
+
+FILAS_POR_BLOQUE = 10_000
+
+# Formatos del libro: nombre -> propiedades de xlsxwriter
+FORMATOS = {
+    'encabezado': {
+        'bold': True, 'bg_color': '#4F81BD', 'font_color': 'white',
+        'border': 1, 'align': 'center'
+    },
+    'moneda': {'num_format': '$#,##0.00'},
+    'porcentaje': {'num_format': '0.00%'},
+}
+
+
+@dataclass
+class Hoja:
+    """Hoja de un reporte: encabezados y filas (iterables, se consumen una vez)"""
+    nombre: str
+    columnas: List[str]
+    filas: Iterable[Sequence]
+    # índice de columna -> nombre de formato en FORMATOS
+    formatos_columna: Dict[int, str] = field(default_factory=dict)
+
+
+def _celda(valor):
+    # NaN/NaT/None se dejan en blanco, igual que to_excel(na_rep='')
+    if valor is None or valor is pd.NaT:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def filas_dataframe(df: pd.DataFrame, incluir_indice: bool = False,
+                    filas_por_bloque: int = FILAS_POR_BLOQUE) -> Iterator[tuple]:
+    """Filas de un DataFrame como tuplas nativas, convertidas bloque a bloque"""
+    for inicio in range(0, len(df), filas_por_bloque):
+        bloque = df.iloc[inicio:inicio + filas_por_bloque]
+        bloque = bloque.astype(object).where(bloque.notna(), None)
+        yield from bloque.itertuples(index=incluir_indice, name=None)
+
+
+def hoja_desde_registros(nombre: str, registros: List[dict]) -> Hoja:
+    """Hoja a partir de una lista de dicts (columnas en orden de aparición)"""
+    columnas: List[str] = []
+    for registro in registros:
+        columnas.extend(c for c in registro if c not in columnas)
+    return Hoja(nombre, columnas, ([r.get(c) for c in columnas] for r in registros))
+
+
+def escribir_xlsx(archivo: Path, hojas: Iterable[Hoja], memoria_constante: bool = True) -> Path:
+    """Escribe las hojas en un .xlsx; con `memoria_constante` se usa el modo de xlsxwriter"""
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(str(archivo), {'constant_memory': memoria_constante})
+    formatos = {nombre: libro.add_format(props) for nombre, props in FORMATOS.items()}
+    try:
+        for hoja in hojas:
+            hoja_xlsx = libro.add_worksheet(hoja.nombre)
+            hoja_xlsx.write_row(0, 0, hoja.columnas, formatos['encabezado'])
+            por_columna = {c: formatos[f] for c, f in hoja.formatos_columna.items()}
+            fila_num = 0
+            for fila_num, fila in enumerate(hoja.filas, start=1):
+                for col, valor in enumerate(fila):
+                    valor = _celda(valor)
+                    if valor is not None:
+                        hoja_xlsx.write(fila_num, col, valor, por_columna.get(col))
+    finally:
+        libro.close()
+    return Path(archivo)
+
+
+def escribir_csv_por_hoja(directorio: Path, hojas: Iterable[Hoja]) -> Path:
+    """Escribe cada hoja como `<directorio>/<hoja>.csv`"""
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    for hoja in hojas:
+        with open(directorio / f'{hoja.nombre}.csv', 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(hoja.columnas)
+            escritor.writerows([_celda(v) for v in fila] for fila in hoja.filas)
+    return directorio
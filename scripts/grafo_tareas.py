@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+🧩 GRAFO DE TAREAS - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Ejecutor mínimo de tareas con dependencias declaradas:
+- Las tareas sin dependencias pendientes corren en paralelo en un pool de procesos
+- Una tarea recibe los resultados de sus dependencias en `entradas`
+- Se registra la duración de cada etapa (medida dentro del worker)
+- Con max_workers=1 todo corre en el proceso actual, en orden topológico
+================================================================================
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class Tarea:
+    """Unidad de trabajo del grafo.
+
+    `funcion` debe ser una función de nivel de módulo (se envía a otro proceso).
+    Si la tarea tiene dependencias se llama como
+    `funcion(*args, entradas={dep: resultado}, tiempos={dep: segundos})`.
+    """
+    nombre: str
+    funcion: Callable
+    args: Tuple = ()
+    dependencias: Tuple[str, ...] = ()
+
+
+@dataclass
+class ResultadoGrafo:
+    """Resultados y tiempos de una ejecución del grafo"""
+    resultados: Dict[str, Any] = field(default_factory=dict)
+    tiempos: Dict[str, float] = field(default_factory=dict)
+    errores: Dict[str, str] = field(default_factory=dict)
+    duracion_total: float = 0.0
+
+
+def _ejecutar_medido(funcion: Callable, args: Tuple, kwargs: Dict) -> Tuple[Any, float]:
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+class EjecutorGrafo:
+    """Ejecuta un conjunto de tareas respetando sus dependencias"""
+
+    def __init__(self, tareas: Iterable[Tarea], max_workers: Optional[int] = None,
+                 inicializador: Optional[Callable] = None, initargs: Tuple = ()):
+        self.tareas: Dict[str, Tarea] = {}
+        for tarea in tareas:
+            if tarea.nombre in self.tareas:
+                raise ValueError(f"Tarea duplicada: {tarea.nombre}")
+            self.tareas[tarea.nombre] = tarea
+        self.max_workers = max_workers
+        self.inicializador = inicializador
+        self.initargs = initargs
+        self._validar()
+
+    def _validar(self):
+        for tarea in self.tareas.values():
+            faltantes = [d for d in tarea.dependencias if d not in self.tareas]
+            if faltantes:
+                raise ValueError(f"Tarea '{tarea.nombre}' depende de tareas inexistentes: {faltantes}")
+        self.orden_topologico()  # detecta ciclos
+
+    def orden_topologico(self) -> List[str]:
+        """Orden de ejecución válido (estable respecto al orden de declaración)"""
+        orden, visitadas, en_curso = [], set(), set()
+
+        def visitar(nombre: str):
+            if nombre in visitadas:
+                return
+            if nombre in en_curso:
+                raise ValueError(f"Ciclo de dependencias en '{nombre}'")
+            en_curso.add(nombre)
+            for dep in self.tareas[nombre].dependencias:
+                visitar(dep)
+            en_curso.discard(nombre)
+            visitadas.add(nombre)
+            orden.append(nombre)
+
+        for nombre in self.tareas:
+            visitar(nombre)
+        return orden
+
+    def _kwargs(self, tarea: Tarea, estado: ResultadoGrafo) -> Dict:
+        if not tarea.dependencias:
+            return {}
+        return {
+            'entradas': {d: estado.resultados[d] for d in tarea.dependencias},
+            'tiempos': {d: estado.tiempos[d] for d in tarea.dependencias},
+        }
+
+    def ejecutar(self, al_completar: Optional[Callable[[str, float], None]] = None) -> ResultadoGrafo:
+        """Ejecuta el grafo. `al_completar(nombre, segundos)` se llama en el proceso padre."""
+        inicio = time.perf_counter()
+        if self.max_workers == 1:
+            estado = self._ejecutar_secuencial(al_completar)
+        else:
+            estado = self._ejecutar_pool(al_completar)
+        estado.duracion_total = time.perf_counter() - inicio
+        return estado
+
+    def _ejecutar_secuencial(self, al_completar) -> ResultadoGrafo:
+        estado = ResultadoGrafo()
+        if self.inicializador:
+            self.inicializador(*self.initargs)
+        for nombre in self.orden_topologico():
+            tarea = self.tareas[nombre]
+            if any(d in estado.errores for d in tarea.dependencias):
+                estado.errores[nombre] = "dependencia fallida"
+                continue
+            try:
+                resultado, segundos = _ejecutar_medido(tarea.funcion, tarea.args, self._kwargs(tarea, estado))
+            except Exception as e:
+                estado.errores[nombre] = f"{type(e).__name__}: {e}"
+                continue
+            estado.resultados[nombre] = resultado
+            estado.tiempos[nombre] = segundos
+            if al_completar:
+                al_completar(nombre, segundos)
+        return estado
+
+    def _ejecutar_pool(self, al_completar) -> ResultadoGrafo:
+        estado = ResultadoGrafo()
+        pendientes = dict(self.tareas)
+        en_vuelo = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=self.inicializador,
+                                 initargs=self.initargs) as pool:
+            while pendientes or en_vuelo:
+                # Descartar tareas cuyas dependencias fallaron
+                for nombre in [n for n, t in pendientes.items()
+                               if any(d in estado.errores for d in t.dependencias)]:
+                    estado.errores[nombre] = "dependencia fallida"
+                    del pendientes[nombre]
+
+                listas = [t for t in pendientes.values()
+                          if all(d in estado.resultados for d in t.dependencias)]
+                for tarea in listas:
+                    futuro = pool.submit(_ejecutar_medido, tarea.funcion, tarea.args,
+                                         self._kwargs(tarea, estado))
+                    en_vuelo[futuro] = tarea.nombre
+                    del pendientes[tarea.nombre]
+
+                if not en_vuelo:
+                    break
+
+                hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    nombre = en_vuelo.pop(futuro)
+                    try:
+                        resultado, segundos = futuro.result()
+                    except Exception as e:
+                        estado.errores[nombre] = f"{type(e).__name__}: {e}"
+                        continue
+                    estado.resultados[nombre] = resultado
+                    estado.tiempos[nombre] = segundos
+                    if al_completar:
+                        al_completar(nombre, segundos)
+
+        return estado
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+📅 ROLLUPS INCREMENTALES DE VENTAS - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Tablas persistidas (Parquet) de agregados diarios, semanales y mensuales:
+- cantidad, ingreso, utilidad (sumas) y número de ventas
+- clientes únicos aproximados con HyperLogLog (registros fusionables por max)
+
+Las filas nuevas de ventas.csv se leen desde el último offset procesado y se
+fusionan en las tres tablas: el costo de actualizar depende de los días nuevos,
+no del historial completo. Si el archivo no cambió (mtime_ns y tamaño) no se lee;
+si cambió, se compara el hash del prefijo ya procesado completo y, si difiere
+(edición en cualquier punto, aun del mismo largo), se reconstruye todo.
+
+Las tendencias (pct_change, medias móviles) y la estacionalidad se derivan de
+estas tablas en AnalizadorTendencias.
+================================================================================
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (motor de Parquet)
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+
+# ================================================================================
+# 🔢 HYPERLOGLOG
+# ================================================================================
+
+HLL_PRECISION = 14
+HLL_REGISTROS = 1 << HLL_PRECISION
+_HLL_BITS_RESTO = 64 - HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTROS)
+
+
+def hll_observaciones(valores: pd.Series) -> pd.DataFrame:
+    """(registro, rango) de cada valor, vectorizado.
+
+    hash_pandas_object usa una clave fija: los hashes son estables entre
+    procesos y ejecuciones, condición para fusionar registros persistidos.
+    """
+    h = pd.util.hash_pandas_object(valores.astype(str), index=False).to_numpy(np.uint64)
+    registro = (h >> np.uint64(_HLL_BITS_RESTO)).astype(np.int64)
+    resto = h & np.uint64((1 << _HLL_BITS_RESTO) - 1)
+    # bit_length exacto vía frexp (resto < 2**53 se representa sin pérdida)
+    _, bit_length = np.frexp(resto.astype(np.float64))
+    rango = np.where(resto == 0, _HLL_BITS_RESTO + 1, _HLL_BITS_RESTO - bit_length + 1)
+    return pd.DataFrame({'registro': registro, 'rango': rango.astype(np.uint8)}, index=valores.index)
+
+
+def hll_estimar(registros: np.ndarray) -> float:
+    """Estimación de cardinalidad con corrección de rango pequeño"""
+    estimacion = _HLL_ALPHA * HLL_REGISTROS ** 2 / np.sum(np.exp2(-registros.astype(np.float64)))
+    ceros = int(np.count_nonzero(registros == 0))
+    if estimacion <= 2.5 * HLL_REGISTROS and ceros:
+        return HLL_REGISTROS * np.log(HLL_REGISTROS / ceros)
+    return float(estimacion)
+
+
+def _registros_vacios() -> np.ndarray:
+    return np.zeros(HLL_REGISTROS, dtype=np.uint8)
+
+
+# ================================================================================
+# 📊 TABLAS DE ROLLUP
+# ================================================================================
+
+METRICAS = ['cantidad', 'ingreso', 'utilidad']
+
+# nombre de tabla -> cómo derivar la clave de periodo desde la fecha
+GRANOS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    'diario': lambda fecha: fecha.dt.normalize(),
+    'semanal': lambda fecha: fecha.dt.to_period('W').dt.start_time,
+    'mensual': lambda fecha: fecha.dt.to_period('M').dt.start_time,
+}
+
+
+def _agregar_grano(df: pd.DataFrame, clave: pd.Series) -> pd.DataFrame:
+    """Agregado de un lote de ventas para un grano (periodo = inicio del periodo)"""
+    metricas = [m for m in METRICAS if m in df.columns]
+    tabla = df.groupby(clave.rename('periodo'))[metricas].sum()
+    tabla['ventas'] = df.groupby(clave.rename('periodo')).size()
+
+    obs = hll_observaciones(df['cliente']).assign(periodo=clave.to_numpy())
+    maximos = obs.groupby(['periodo', 'registro'])['rango'].max()
+    hll = {}
+    for periodo, grupo in maximos.groupby(level=0):
+        registros = _registros_vacios()
+        registros[grupo.index.get_level_values('registro').to_numpy()] = grupo.to_numpy()
+        hll[periodo] = registros
+    tabla['hll'] = pd.Series(hll)
+    return tabla
+
+
+def _fusionar(tabla: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Suma métricas y fusiona registros HLL (máximo por registro)"""
+    if tabla.empty:
+        return delta
+    numericas = [c for c in delta.columns if c != 'hll']
+    fusion = tabla[numericas].add(delta[numericas], fill_value=0)
+    hll = tabla['hll'].to_dict()
+    for periodo, registros in delta['hll'].items():
+        previo = hll.get(periodo)
+        hll[periodo] = registros if previo is None else np.maximum(previo, registros)
+    fusion['hll'] = pd.Series(hll)
+    return fusion.sort_index()
+
+
+class RollupsVentas:
+    """Rollups diario/semanal/mensual persistidos y actualizados incrementalmente"""
+
+    VERSION = 2
+
+    def __init__(self, directorio: Optional[Path] = None):
+        self.directorio = Path(directorio) if directorio else None
+        self.tablas: Dict[str, pd.DataFrame] = {}
+        self.reiniciar()
+        if self.directorio and PARQUET_DISPONIBLE:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            self._cargar()
+
+    # ---------------------------------------------------------------- persistencia
+
+    def _archivo_estado(self) -> Path:
+        return self.directorio / 'estado.json'
+
+    def _cargar(self):
+        if not self._archivo_estado().exists():
+            return
+        estado = json.loads(self._archivo_estado().read_text(encoding='utf-8'))
+        if estado.get('version') != self.VERSION:
+            return
+        try:
+            for grano in GRANOS:
+                tabla = pd.read_parquet(self.directorio / f'{grano}.parquet')
+                tabla['hll'] = [np.frombuffer(b, dtype=np.uint8).copy() for b in tabla['hll']]
+                self.tablas[grano] = tabla.set_index('periodo')
+        except Exception as e:
+            print(f"⚠️ Rollups inválidos, se reconstruyen: {e}")
+            self.reiniciar()
+            return
+        self.estado = estado
+
+    def guardar(self):
+        if not (self.directorio and PARQUET_DISPONIBLE):
+            return
+        for grano, tabla in self.tablas.items():
+            if tabla.empty:
+                continue
+            salida = tabla.assign(hll=[r.tobytes() for r in tabla['hll']]).reset_index()
+            salida.to_parquet(self.directorio / f'{grano}.parquet', index=False)
+        self._archivo_estado().write_text(json.dumps(self.estado), encoding='utf-8')
+
+    def reiniciar(self):
+        self.tablas = {g: pd.DataFrame() for g in GRANOS}
+        self.estado = {'version': self.VERSION, 'offset': 0, 'encabezado': None, 'huella': None,
+                       'mtime_ns': None, 'tamano': None}
+
+    # ---------------------------------------------------------------- ingesta
+
+    def agregar(self, ventas: pd.DataFrame) -> int:
+        """Fusiona un lote de ventas tipadas en las tres tablas. Devuelve filas usadas."""
+        ventas = ventas.dropna(subset=['fecha'])
+        if ventas.empty:
+            return 0
+        for grano, periodo in GRANOS.items():
+            delta = _agregar_grano(ventas, periodo(ventas['fecha']))
+            self.tablas[grano] = _fusionar(self.tablas[grano], delta)
+        return len(ventas)
+
+    @staticmethod
+    def _hash_prefijo(f, offset: int):
+        """sha1 de los primeros `offset` bytes (lectura secuencial, sin parseo);
+        None si el archivo quedó más corto."""
+        h = hashlib.sha1()
+        f.seek(0)
+        restante = offset
+        while restante:
+            bloque = f.read(min(restante, 1 << 20))
+            if not bloque:
+                return None
+            h.update(bloque)
+            restante -= len(bloque)
+        return h
+
+    def actualizar_desde_csv(self, path: Path, aplicar_tipos: Callable[[pd.DataFrame], pd.DataFrame]) -> int:
+        """Ingiere solo las líneas agregadas a `path` desde la última actualización.
+
+        Con el mismo mtime_ns y tamaño que en la última actualización no hay
+        nada que leer. Si no, se guarda y compara el hash de todo el prefijo
+        procesado: cualquier cambio dentro de él (archivo reescrito o editado)
+        reconstruye los rollups desde cero.
+        """
+        path = Path(path)
+        stat = path.stat()
+        if self.estado['offset'] and (stat.st_mtime_ns, stat.st_size) == (
+                self.estado['mtime_ns'], self.estado['tamano']):
+            return 0
+        with open(path, 'rb') as f:
+            offset = self.estado['offset']
+            h = self._hash_prefijo(f, offset)
+            if offset and (h is None or h.hexdigest() != self.estado['huella']):
+                print("⚠️ ventas.csv cambió fuera del modo append: se reconstruyen los rollups")
+                self.reiniciar()
+                offset, h = 0, hashlib.sha1()
+            f.seek(offset)
+            nuevo = f.read()
+
+        fin = nuevo.rfind(b'\n') + 1
+        if fin == 0:
+            return 0
+        texto = nuevo[:fin].decode('utf-8')
+
+        if self.estado['encabezado'] is None:
+            df = pd.read_csv(io.StringIO(texto))
+            self.estado['encabezado'] = list(df.columns)
+        else:
+            df = pd.read_csv(io.StringIO(texto), header=None, names=self.estado['encabezado'])
+
+        filas = self.agregar(aplicar_tipos(df))
+
+        h.update(nuevo[:fin])
+        self.estado.update(offset=offset + fin, huella=h.hexdigest(),
+                           mtime_ns=stat.st_mtime_ns, tamano=stat.st_size)
+        self.guardar()
+        return filas
+
+    # ---------------------------------------------------------------- consultas
+
+    def tabla(self, grano: str) -> pd.DataFrame:
+        """Tabla de un grano con clientes_unicos estimado (sin la columna hll)"""
+        tabla = self.tablas[grano]
+        if tabla.empty:
+            return pd.DataFrame(columns=METRICAS + ['ventas', 'clientes_unicos'])
+        return tabla.drop(columns='hll').assign(
+            clientes_unicos=[int(round(hll_estimar(r))) for r in tabla['hll']]
+        )
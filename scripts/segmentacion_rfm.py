@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+🎯 SEGMENTACIÓN RFM VECTORIZADA - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Segmentación RFM (Recency, Frequency, Monetary) sin llamadas Python por cliente:
+- Agregación por cliente con groupby().max()/count()/sum()
+- Scores R/F/M como enteros (códigos de qcut reescalados a 1-5)
+- Segmentos con np.select sobre reglas configurables
+- Modo por bloques: agregados parciales por bloque de ventas que se combinan
+  al final, para bases de clientes que no caben en un solo DataFrame de ventas
+================================================================================
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Regla: (segmento, {'R'|'F'|'M': (mínimo, máximo)}) con límites inclusivos.
+# Se evalúan en orden; la primera que se cumple asigna el segmento.
+ReglaRFM = Tuple[str, Dict[str, Tuple[int, int]]]
+
+REGLAS_SEGMENTO_RFM: List[ReglaRFM] = [
+    ('Champions', {'R': (4, 5), 'F': (4, 5), 'M': (4, 5)}),
+    ('Loyal Customers', {'R': (3, 5), 'F': (3, 5), 'M': (4, 5)}),
+    ('New Customers', {'R': (4, 5), 'F': (1, 2)}),
+    ('At Risk', {'R': (1, 2), 'F': (3, 5)}),
+    ('Lost', {'R': (1, 2), 'F': (1, 2)}),
+]
+SEGMENTO_POR_DEFECTO = 'Potential Loyalists'
+
+N_CUANTILES = 5
+
+COLUMNAS_PARCIALES = ['fecha_max', 'frequency', 'monetary']
+
+
+def agregar_parcial(df: pd.DataFrame) -> pd.DataFrame:
+    """Agregado RFM de un bloque de ventas (fecha ya tipada, sin NaT)"""
+    parcial = df.groupby('cliente', observed=True).agg(
+        fecha_max=('fecha', 'max'),
+        frequency=('ingreso', 'count'),
+        monetary=('ingreso', 'sum'),
+    )
+    # Los bloques pueden traer categorías distintas: se normaliza a texto
+    parcial.index = parcial.index.astype(str)
+    return parcial
+
+
+# Parciales acumulados antes de plegarlos en el agregado global
+PARCIALES_POR_PLIEGUE = 16
+
+
+def _plegar(parciales: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(parciales) == 1:
+        return parciales[0]
+    return pd.concat(parciales).groupby(level=0).agg(
+        fecha_max=('fecha_max', 'max'),
+        frequency=('frequency', 'sum'),
+        monetary=('monetary', 'sum'),
+    )
+
+
+def combinar_parciales(parciales: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Combina agregados parciales de varios bloques en uno por cliente.
+
+    Se pliega cada PARCIALES_POR_PLIEGUE bloques, así la memoria queda acotada
+    por el número de clientes y no por el número de ventas.
+    """
+    pendientes: List[pd.DataFrame] = []
+    for parcial in parciales:
+        if parcial.empty:
+            continue
+        pendientes.append(parcial)
+        if len(pendientes) >= PARCIALES_POR_PLIEGUE:
+            pendientes = [_plegar(pendientes)]
+    if not pendientes:
+        return pd.DataFrame(columns=COLUMNAS_PARCIALES)
+    return _plegar(pendientes)
+
+
+def _scores(valores: pd.Series, invertir: bool = False) -> pd.Series:
+    """Score entero 1..N_CUANTILES por cuantiles de `valores`.
+
+    Con valores repetidos o pocos clientes qcut(duplicates='drop') produce
+    menos intervalos que N_CUANTILES: los códigos se reescalan a 1..N según
+    los intervalos obtenidos, en vez de desplazarse. Sin variación el score
+    es el central; los NaN (sin datos) reciben el peor.
+    """
+    scores = pd.Series(1, index=valores.index, dtype=np.int8)
+    validos = valores.dropna()
+    if validos.nunique() < 2:
+        scores[validos.index] = (N_CUANTILES + 1) // 2
+        return scores
+
+    codigos, bordes = pd.qcut(validos, N_CUANTILES, labels=False, retbins=True, duplicates='drop')
+    n_intervalos = len(bordes) - 1
+    if n_intervalos < 2:
+        escalados = np.full(len(validos), (N_CUANTILES + 1) // 2)
+    else:
+        escalados = 1 + np.rint(codigos.to_numpy() * (N_CUANTILES - 1) / (n_intervalos - 1))
+        if invertir:
+            escalados = N_CUANTILES + 1 - escalados
+    scores[validos.index] = escalados.astype(np.int8)
+    return scores
+
+
+def puntuar(agregado: pd.DataFrame, fecha_ref: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Calcula recency y los scores enteros R/F/M (1-5) a partir del agregado"""
+    if agregado.empty:
+        return pd.DataFrame({
+            'recency': pd.Series(dtype=float), 'frequency': pd.Series(dtype=float),
+            'monetary': pd.Series(dtype=float), 'R_score': pd.Series(dtype=np.int8),
+            'F_score': pd.Series(dtype=np.int8), 'M_score': pd.Series(dtype=np.int8),
+            'RFM_score': pd.Series(dtype=np.int16),
+        }, index=agregado.index)
+
+    fechas = pd.to_datetime(agregado['fecha_max'])
+    if fecha_ref is None:
+        fecha_ref = fechas.max()
+
+    rfm = pd.DataFrame({
+        'recency': (fecha_ref - fechas).dt.days,
+        'frequency': agregado['frequency'],
+        'monetary': agregado['monetary'],
+    }, index=agregado.index)
+
+    # recency menor = mejor score; rank('first') separa empates de F y M
+    rfm['R_score'] = _scores(rfm['recency'], invertir=True)
+    rfm['F_score'] = _scores(rfm['frequency'].rank(method='first'))
+    rfm['M_score'] = _scores(rfm['monetary'].rank(method='first'))
+    rfm['RFM_score'] = (rfm['R_score'].astype(np.int16) * 100
+                        + rfm['F_score'] * 10 + rfm['M_score'])
+    return rfm
+
+
+def clasificar(rfm: pd.DataFrame, reglas: Optional[List[ReglaRFM]] = None,
+               por_defecto: str = SEGMENTO_POR_DEFECTO) -> pd.Series:
+    """Asigna segmentos evaluando las reglas en orden con np.select"""
+    reglas = REGLAS_SEGMENTO_RFM if reglas is None else reglas
+    scores = {
+        'R': rfm['R_score'].to_numpy(),
+        'F': rfm['F_score'].to_numpy(),
+        'M': rfm['M_score'].to_numpy(),
+    }
+
+    condiciones = []
+    for _, limites in reglas:
+        mascara = np.ones(len(rfm), dtype=bool)
+        for eje, (minimo, maximo) in limites.items():
+            mascara &= (scores[eje] >= minimo) & (scores[eje] <= maximo)
+        condiciones.append(mascara)
+
+    segmentos = np.select(condiciones, [nombre for nombre, _ in reglas],
+                          default=por_defecto).astype(object)
+    return pd.Series(segmentos, index=rfm.index, name='segmento')
+
+
+def segmentar(agregado: pd.DataFrame, reglas: Optional[List[ReglaRFM]] = None,
+              fecha_ref: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Agregado por cliente -> scores y segmento"""
+    rfm = puntuar(agregado, fecha_ref)
+    rfm['segmento'] = clasificar(rfm, reglas)
+    return rfm
+
+
+def resumen(rfm: pd.DataFrame) -> dict:
+    """Estructura de resultados usada en los reportes.
+    
+    `detalle_clientes` (una fila por cliente) se deja como DataFrame: los
+    reportes lo vuelcan por bloques sin materializar un dict por cliente.
+    """
+    return {
+        'distribucion_segmentos': rfm['segmento'].value_counts().to_dict(),
+        'detalle_clientes': rfm[['recency', 'frequency', 'monetary', 'segmento']],
+        'metricas_segmento': rfm.groupby('segmento').agg({
+            'monetary': ['mean', 'sum'],
+            'frequency': 'mean'
+        }).to_dict()
+    }
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+================================================================================
+🧾 SERIALIZACIÓN JSON DE RESULTADOS - SISTEMA CHRONOS/FLOWDISTRIBUTOR
+================================================================================
+Escritura de los resultados del análisis sin reconstruir el árbol completo:
+- orjson con OPT_SERIALIZE_NUMPY: escalares y arrays NumPy nativos, NaN -> null
+- Hook `default` para Period/Timestamp/NaT/DataFrame/Series
+- Secciones escritas una a una; los DataFrame/Series de primer y segundo nivel
+  se vuelcan por bloques de filas directamente desde el frame
+- Modos: indentado (2 espacios), compacto y gzip
+
+Sin orjson se usa json de la biblioteca estándar con la conversión previa de
+hojas (más lenta, mismo resultado).
+================================================================================
+"""
+
+import gzip
+import json
+import math
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    ORJSON_DISPONIBLE = True
+except ImportError:
+    ORJSON_DISPONIBLE = False
+
+FILAS_POR_BLOQUE = 5_000
+
+# Orientación con la que se vuelca cada tipo de frame (misma forma que to_dict)
+ORIENT_DATAFRAME = 'index'
+
+
+# ================================================================================
+# 🔄 CONVERSIÓN
+# ================================================================================
+
+def _default(obj: Any):
+    """Tipos que orjson no serializa por sí mismo"""
+    if isinstance(obj, (pd.Period, pd.Timestamp)):
+        return str(obj)
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(ORIENT_DATAFRAME)
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def _clave(k: Any) -> Any:
+    # Las claves se escriben como str(k), igual que el reporte original
+    return k if isinstance(k, str) else str(k)
+
+
+def _normalizar_claves(obj: Any) -> Any:
+    """Convierte claves no-str (Period, Timestamp, int) a texto.
+
+    Solo recorre contenedores; los dicts que ya tienen claves str se reutilizan.
+    """
+    if isinstance(obj, dict):
+        valores = {k: _normalizar_claves(v) for k, v in obj.items()}
+        if all(isinstance(k, str) for k in valores):
+            return valores
+        return {_clave(k): v for k, v in valores.items()}
+    if isinstance(obj, list):
+        return [_normalizar_claves(v) for v in obj]
+    return obj
+
+
+def _limpiar_estandar(obj: Any) -> Any:
+    """Conversión completa para el respaldo con json estándar (NaN -> null)"""
+    if isinstance(obj, dict):
+        return {_clave(k): _limpiar_estandar(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_limpiar_estandar(v) for v in obj]
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return _limpiar_estandar(_default(obj))
+    if isinstance(obj, np.ndarray):
+        return _limpiar_estandar(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, (pd.Period, pd.Timestamp)) or obj is pd.NaT or obj is pd.NA:
+        return _default(obj)
+    return obj
+
+
+def dumps(obj: Any, indentado: bool = False) -> bytes:
+    """Serializa un valor a bytes UTF-8"""
+    if ORJSON_DISPONIBLE:
+        opciones = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_NON_STR_KEYS)
+        if indentado:
+            opciones |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=opciones)
+        except TypeError:
+            # Claves que OPT_NON_STR_KEYS no admite (Period) o que formatearía
+            # distinto (Timestamp en ISO con 'T')
+            return orjson.dumps(_normalizar_claves(obj), default=_default, option=opciones)
+    texto = json.dumps(_limpiar_estandar(obj), indent=2 if indentado else None,
+                       ensure_ascii=False, default=str)
+    return texto.encode('utf-8')
+
+
+# ================================================================================
+# 🌊 ESCRITURA POR SECCIONES
+# ================================================================================
+
+def _filas(frame, filas_por_bloque: int) -> Iterator[tuple]:
+    """Pares (clave, fila) de un DataFrame/Series, convertidos bloque a bloque"""
+    for inicio in range(0, len(frame), filas_por_bloque):
+        bloque = frame.iloc[inicio:inicio + filas_por_bloque]
+        contenido = bloque.to_dict(ORIENT_DATAFRAME) if isinstance(bloque, pd.DataFrame) else bloque.to_dict()
+        yield from contenido.items()
+
+
+class _Escritor:
+    def __init__(self, salida: BinaryIO, indentado: bool, filas_por_bloque: int):
+        self.salida = salida
+        self.indentado = indentado
+        self.filas_por_bloque = filas_por_bloque
+
+    def _salto(self, nivel: int) -> bytes:
+        return b'\n' + b'  ' * nivel if self.indentado else b''
+
+    def _valor(self, valor: Any, nivel: int) -> bytes:
+        contenido = dumps(valor, self.indentado)
+        if self.indentado and nivel:
+            contenido = contenido.replace(b'\n', self._salto(nivel))
+        return contenido
+
+    def _pares(self, pares, nivel: int, profundidad: int):
+        """Escribe un objeto JSON a partir de pares (clave, valor)"""
+        separador = b': ' if self.indentado else b':'
+        self.salida.write(b'{')
+        vacio = True
+        for clave, valor in pares:
+            self.salida.write((b',' if not vacio else b'') + self._salto(nivel + 1))
+            self.salida.write(dumps(_clave(clave)) + separador)
+            self.escribir(valor, nivel + 1, profundidad - 1)
+            vacio = False
+        if not vacio:
+            self.salida.write(self._salto(nivel))
+        self.salida.write(b'}')
+
+    def escribir(self, valor: Any, nivel: int = 0, profundidad: int = 2):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            # Filas individuales: se serializan completas, sin más recursión
+            self._pares(_filas(valor, self.filas_por_bloque), nivel, 0)
+        elif isinstance(valor, dict) and profundidad > 0:
+            self._pares(valor.items(), nivel, profundidad)
+        else:
+            self.salida.write(self._valor(valor, nivel))
+
+
+def escribir_json(resultados: dict, archivo: Path, compacto: bool = False,
+                  comprimir: bool = False, filas_por_bloque: int = FILAS_POR_BLOQUE) -> Path:
+    """Escribe `resultados` en `archivo` (se agrega .gz si `comprimir`).
+
+    Las secciones y sus claves directas se escriben una por una; cualquier
+    DataFrame/Series en esos niveles se vuelca por bloques de filas.
+    """
+    archivo = Path(archivo)
+    if comprimir and archivo.suffix != '.gz':
+        archivo = archivo.with_name(archivo.name + '.gz')
+
+    abrir = gzip.open if comprimir else open
+    with abrir(archivo, 'wb') as salida:
+        _Escritor(salida, not compacto, filas_por_bloque).escribir(resultados)
+        if not compacto:
+            salida.write(b'\n')
+    return archivo